@@ -1,148 +1,37 @@
-import json
-import os
-import uuid
 from datetime import datetime, timedelta
 from tabulate import tabulate
-from collections import deque
+from inventory_store import (
+    store, load_data, terapkan, mutasi_set, mutasi_hapus, mutasi_pindah_ke_toko
+)
+from order_queue import antrean
+from order_archive import arsip, epoch, epoch_pesanan, potong_rentang
+from product_sort import urutkan_items, input_urutan, tampilkan_berhalaman
+from product_search import pilih_dari_saran
+from sweeper import sapu_kadaluarsa, sapu_pesanan_kedaluwarsa
+from sales_rollup import peringkat_produk, JUMLAH_PERINGKAT
+from report_cache import cache_laporan
+from sales_report import pilih_rentang_waktu, ambil_ringkasan, lihat_produk_terlaris
 
 # Folder dan File paths
 DATA_FOLDER = "Data"
-FILE_PATH = os.path.join(DATA_FOLDER, "inv.json")
-ANTREAN_PATH = os.path.join(DATA_FOLDER, "antrean.json")
 KATEGORI_OPSI = ["Makanan", "Minuman", "Elektronik"]
 
 # -------------------- FUNGSI FILE HANDLING --------------------
-def init_file():
-    if not os.path.exists(DATA_FOLDER):
-        os.makedirs(DATA_FOLDER)
-    if not os.path.exists(FILE_PATH):
-        with open(FILE_PATH, 'w') as f:
-            json.dump({"gudang": {}, "toko": {}}, f, indent=4)
-
-def load_data():
-    init_file()
-    with open(FILE_PATH, 'r') as f:
-        return json.load(f)
-
-def save_data(data):
-    with open(FILE_PATH, 'w') as f:
-        json.dump(data, f, indent=4)
-
-def cari_nama_produk(koleksi, nama):
-    nama_lower = nama.lower()
-    return any(nama_lower == key.lower() for key in koleksi)
-
-def dapatkan_nama_asli(koleksi, nama):
-    nama_lower = nama.lower()
-    for key in koleksi:
-        if key.lower() == nama_lower:
-            return key
-    return None
-
-# -------------------- CLASS QUEQUE --------------------
-class FIFOQueue:
-    """
-    A FIFO (First In, First Out) queue implementation using deque.
-    """
-    def __init__(self):
-        self.queue = deque()
-    
-    def enqueue(self, item):
-        """Add an item to the rear of the queue."""
-        self.queue.append(item)
-    
-    def dequeue(self):
-        """Remove and return an item from the front of the queue."""
-        if self.is_empty():
-            raise IndexError("Queue is empty")
-        return self.queue.popleft()
-    
-    def peek(self):
-        """Return the front item without removing it."""
-        if self.is_empty():
-            raise IndexError("Queue is empty")
-        return self.queue[0]
-    
-    def is_empty(self):
-        """Check if the queue is empty."""
-        return len(self.queue) == 0
-    
-    def size(self):
-        """Return the number of items in the queue."""
-        return len(self.queue)
-    
-    def to_list(self):
-        """Convert queue to list for JSON serialization."""
-        return list(self.queue)
-    
-    def from_list(self, items):
-        """Load queue from a list."""
-        self.queue = deque(items)
-    
-    def find_and_update(self, condition_func, update_func):
-        """
-        Find item in queue based on condition and update it.
-        Returns True if item was found and updated, False otherwise.
-        """
-        for i, item in enumerate(self.queue):
-            if condition_func(item):
-                updated_item = update_func(item)
-                self.queue[i] = updated_item
-                return True
-        return False
-    
-    def find_index(self, condition_func):
-        """Find the index of the first item that matches the condition."""
-        for i, item in enumerate(self.queue):
-            if condition_func(item):
-                return i
-        return -1
-
-# Global queue instance
-antrean_queue = FIFOQueue()
-
-# -------------------- QUICK SORT --------------------
-def quick_sort(arr, ascending=True):
-    if len(arr) <= 1:
-        return arr
-    pivot = arr[0]
-    pivot_key = pivot[0].lower()
-    left = [item for item in arr[1:] if (item[0].lower() <= pivot_key) == ascending]
-    right = [item for item in arr[1:] if (item[0].lower() > pivot_key) == ascending]
-    return quick_sort(left, ascending) + [pivot] + quick_sort(right, ascending)
+def cari_nama_produk(lokasi, nama):
+    return store.cari_nama_asli(lokasi, nama) is not None
+
+def dapatkan_nama_asli(lokasi, nama):
+    return store.cari_nama_asli(lokasi, nama)
 
 # -------------------- CEK KADALUARSA --------------------
 
 def cek_dan_bersihkan_kadaluarsa():
     """Cek produk yang sudah kadaluarsa dan hapus dari gudang dan toko"""
-    data = load_data()
-    hari_ini = datetime.now().strftime('%Y-%m-%d')
-    
-    # Cek di gudang
-    gudang_untuk_dihapus = []
-    for produk, info in data["gudang"].items():
-        if "tanggal_kadaluarsa" in info and info["tanggal_kadaluarsa"] <= hari_ini:
-            gudang_untuk_dihapus.append(produk)
-    
-    # Cek di toko
-    toko_untuk_dihapus = []
-    for produk, info in data["toko"].items():
-        if "tanggal_kadaluarsa" in info and info["tanggal_kadaluarsa"] <= hari_ini:
-            toko_untuk_dihapus.append(produk)
-    
-    # Hapus produk kadaluarsa
-    for produk in gudang_untuk_dihapus:
-        del data["gudang"][produk]
-        print(f"Produk '{produk}' di gudang telah kadaluarsa dan dihapus dari sistem.")
-    
-    for produk in toko_untuk_dihapus:
-        del data["toko"][produk]
-        print(f"Produk '{produk}' di toko telah kadaluarsa dan dihapus dari sistem.")
-    
-    if gudang_untuk_dihapus or toko_untuk_dihapus:
-        save_data(data)
-        return True
-    return False
+    dihapus = sapu_kadaluarsa()
+    for lokasi, daftar in dihapus.items():
+        for produk in daftar:
+            print(f"Produk '{produk}' di {lokasi} telah kadaluarsa dan dihapus dari sistem.")
+    return any(dihapus.values())
 
 
 # -------------------- TAMBAHKAN PRODUK KE TOKO --------------------
@@ -159,10 +48,9 @@ def tambah_produk_ke_toko(nama, jumlah, diskon=None):
     try:
         data = load_data()
         gudang = data["gudang"]
-        toko = data["toko"]
         
         # Cari nama asli produk di gudang
-        nama_asli = dapatkan_nama_asli(gudang, nama)
+        nama_asli = dapatkan_nama_asli("gudang", nama)
         
         # Pengecekan keberadaan produk di gudang - STOP di sini jika tidak ada
         if not nama_asli:
@@ -175,11 +63,11 @@ def tambah_produk_ke_toko(nama, jumlah, diskon=None):
             return False
         
         # Cek apakah produk sudah ada di toko
-        if cari_nama_produk(toko, nama):
+        if cari_nama_produk("toko", nama):
             # Produk sudah ada di toko, tambah stok saja
-            nama_toko = dapatkan_nama_asli(toko, nama)
+            nama_toko = dapatkan_nama_asli("toko", nama)
             print(f"Produk '{nama_toko}' sudah ada di toko. Menambah stok tanpa mengubah diskon.")
-            toko[nama_toko]["stok"] += jumlah
+            mutasi = mutasi_pindah_ke_toko(nama_asli, nama_toko, jumlah)
         else:
             # Produk baru di toko
             if diskon is None:
@@ -192,7 +80,7 @@ def tambah_produk_ke_toko(nama, jumlah, diskon=None):
                 return False
             
             # Salin atribut dari gudang ke toko
-            toko[nama_asli] = {
+            info_toko = {
                 "stok": jumlah,
                 "kategori": gudang[nama_asli]["kategori"],
                 "harga_modal": gudang[nama_asli]["harga_modal"],
@@ -200,17 +88,16 @@ def tambah_produk_ke_toko(nama, jumlah, diskon=None):
                 "diskon": diskon,
                 "tanggal_input": gudang[nama_asli]["tanggal_input"]
             }
-            
+
             # Salin tanggal kadaluarsa jika ada
             if "tanggal_kadaluarsa" in gudang[nama_asli]:
-                toko[nama_asli]["tanggal_kadaluarsa"] = gudang[nama_asli]["tanggal_kadaluarsa"]
+                info_toko["tanggal_kadaluarsa"] = gudang[nama_asli]["tanggal_kadaluarsa"]
                 print(f"Produk '{nama_asli}' akan kadaluarsa pada: {gudang[nama_asli]['tanggal_kadaluarsa']}")
-        
-        # Kurangi stok gudang
-        gudang[nama_asli]["stok"] -= jumlah
-        
-        # Simpan data
-        save_data(data)
+
+            mutasi = mutasi_pindah_ke_toko(nama_asli, nama_asli, jumlah, info_toko)
+
+        # Kurangi stok gudang dan tambah stok toko dalam satu transaksi
+        terapkan(mutasi)
         print(f"{jumlah} unit produk '{nama_asli}' berhasil dipindahkan ke toko.")
         return True
         
@@ -222,57 +109,35 @@ def tambah_produk_ke_toko(nama, jumlah, diskon=None):
 def hitung_harga_diskon(harga, diskon):
     return harga * (1 - diskon / 100)
 
-def tampilkan_produk(lokasi="gudang", ascending=True, filter_kategori=None):
+def tampilkan_produk(lokasi="gudang", ascending=True, filter_kategori=None, kriteria="nama"):
     data = load_data()
     if lokasi not in data:
         print("Lokasi tidak valid.")
         return
 
-    produk_list = data[lokasi]
-    filtered = {
-        k: v for k, v in produk_list.items()
-        if filter_kategori is None or v["kategori"] == filter_kategori
-    }
-
-    produk_items = list(filtered.items())
-    sorted_produk = quick_sort(produk_items, ascending)
-
-    if not sorted_produk:
-        print("Tidak ada produk yang ditemukan.")
-        return
-
-    tabel = []
-    for nama, info in sorted_produk:
-        if lokasi == "toko":
+    if lokasi == "toko":
+        def format_baris(nama, info):
             harga_jual = info['harga_jual']
             diskon = info.get('diskon', 0)
             harga_diskon = hitung_harga_diskon(harga_jual, diskon)
-            tabel.append([
+            return [
                 nama, info['stok'], f"Rp {harga_jual:,.2f}", info['kategori'],
                 f"{diskon}%", f"Rp {harga_diskon:,.2f}"
-            ])
-        else:  # lokasi == "gudang"
-            tabel.append([
+            ]
+        headers = ["Nama", "Stok", "Harga Jual", "Kategori", "Diskon", "Harga Setelah Diskon"]
+    else:  # lokasi == "gudang"
+        def format_baris(nama, info):
+            return [
                 nama,
                 info['stok'],
                 f"Rp {info['harga_modal']:,.2f}",
                 f"Rp {info['harga_jual']:,.2f}",
                 info['kategori']
-            ])
+            ]
+        headers = ["Nama", "Stok", "Harga Modal", "Harga Jual", "Kategori"]
 
-    print(f"\nProduk di {lokasi.upper()}:")
-    if lokasi == "toko":
-        print(tabulate(
-            tabel,
-            headers=["Nama", "Stok", "Harga Jual", "Kategori", "Diskon", "Harga Setelah Diskon"],
-            tablefmt="grid"
-        ))
-    else:
-        print(tabulate(
-            tabel,
-            headers=["Nama", "Stok", "Harga Modal", "Harga Jual", "Kategori"],
-            tablefmt="grid"
-        ))
+    tampilkan_berhalaman(lokasi, f"Produk di {lokasi.upper()}:", headers, format_baris,
+                         kriteria, ascending, kategori=filter_kategori)
 
 def menu_tampilkan_produk(lokasi):
     print(f"\n=== Tampilkan Produk di {lokasi.upper()} ===")
@@ -282,23 +147,24 @@ def menu_tampilkan_produk(lokasi):
 
     filter_kategori = None
     if opsi == "2":
+        # Kategori standar ditambah kategori lama yang masih dipakai produk
+        kategori_opsi = KATEGORI_OPSI + [k for k in store.daftar_kategori(lokasi) if k not in KATEGORI_OPSI]
         print("Pilih kategori:")
-        for i, kategori in enumerate(KATEGORI_OPSI):
+        for i, kategori in enumerate(kategori_opsi):
             print(f"{i+1}. {kategori}")
         try:
             idx = int(input("Masukkan nomor kategori: ")) - 1
-            if idx < 0 or idx >= len(KATEGORI_OPSI):
+            if idx < 0 or idx >= len(kategori_opsi):
                 print("Kategori tidak valid.")
                 return
-            filter_kategori = KATEGORI_OPSI[idx]
+            filter_kategori = kategori_opsi[idx]
         except ValueError:
             print("Input tidak valid.")
             return
 
-    urutan = input("Urutkan ascending (a) atau descending (d)? [a/d]: ").lower()
-    ascending = (urutan != "d")
+    kriteria, ascending = input_urutan()
 
-    tampilkan_produk(lokasi=lokasi, ascending=ascending, filter_kategori=filter_kategori)
+    tampilkan_produk(lokasi=lokasi, ascending=ascending, filter_kategori=filter_kategori, kriteria=kriteria)
 
 def menu_tampilan_produk_utama():
     while True:
@@ -321,7 +187,8 @@ def menu_tampilan_produk_utama():
 
 # -------------------- CETAK TOTAL STOK --------------------
 def cetak_total_stok():
-    data = load_data()
+    # Salinan per lokasi: penyapu latar bisa menghapus produk selama tabel dibangun
+    data = {lokasi: store.salinan(lokasi) for lokasi in ("gudang", "toko")}
     gabungan = {}
 
     # Proses data gudang
@@ -359,7 +226,7 @@ def cetak_total_stok():
         return
 
     produk_items = [(v["nama_asli"], v) for v in gabungan.values()]
-    sorted_produk = quick_sort(produk_items, True)
+    sorted_produk = urutkan_items(produk_items)
 
     tabel = []
     for nama, item in sorted_produk:
@@ -381,21 +248,15 @@ def cetak_total_stok():
         tablefmt="grid"
     ))
 
-# -------------------- SEQUENTIAL SEARCH --------------------
-def sequential_search(data_dict, produk_dicari):
-    for nama_produk in data_dict:
-        if nama_produk.lower() == produk_dicari.lower():
-            return data_dict[nama_produk]
-    return None
-
+# -------------------- PENCARIAN PRODUK --------------------
 def cari_produk_toko():
     data = load_data()
     produk_dicari = input("Masukkan nama produk yang ingin dicari di TOKO: ").strip()
-    hasil = sequential_search(data.get("toko", {}), produk_dicari)
+    nama_asli = dapatkan_nama_asli("toko", produk_dicari) or pilih_dari_saran("toko", produk_dicari)
     
-    if hasil:
-        print(f"\nProduk '{produk_dicari}' ditemukan di TOKO:")
-        for k, v in hasil.items():
+    if nama_asli:
+        print(f"\nProduk '{nama_asli}' ditemukan di TOKO:")
+        for k, v in data["toko"][nama_asli].items():
             print(f"  {k}: {v}")
     else:
         print(f"\nProduk '{produk_dicari}' tidak ditemukan di TOKO.")
@@ -406,7 +267,7 @@ def update_produk_toko():
     toko = data["toko"]
 
     nama = input("Masukkan nama produk yang ingin diupdate: ").strip()
-    nama_asli = dapatkan_nama_asli(toko, nama)
+    nama_asli = dapatkan_nama_asli("toko", nama)
 
     if not nama_asli:
         print(f"Produk '{nama}' tidak ditemukan di toko.")
@@ -418,80 +279,47 @@ def update_produk_toko():
     print(f"Diskon saat ini: {produk.get('diskon', 0.0)}%")
 
     try:
+        mutasi = []
         harga_baru = input("Masukkan harga jual baru (tekan Enter jika tidak ingin mengubah): ").strip()
         if harga_baru:
-            produk["harga_jual"] = float(harga_baru)
+            mutasi.append(mutasi_set("toko", nama_asli, "harga_jual", float(harga_baru)))
 
         diskon_input = input("Masukkan diskon baru (%): (tekan Enter jika tidak ingin mengubah) ").strip()
         if diskon_input:
-            produk["diskon"] = float(diskon_input)
+            mutasi.append(mutasi_set("toko", nama_asli, "diskon", float(diskon_input)))
 
-        save_data(data)
+        terapkan(mutasi)
         print(f"Produk '{nama_asli}' di toko berhasil diperbarui.")
     except ValueError:
         print("Input tidak valid. Pastikan harga dan diskon berupa angka.")
 
 
 # -------------------- KONFIRMASI PESANAN --------------------
-def init_antrean_file():
-    if not os.path.exists(ANTREAN_PATH):
-        with open(ANTREAN_PATH, 'w') as f:
-            json.dump([], f, indent=4)
-
-def load_antrean():
-    """
-    Memuat data antrean dari file ke FIFO queue.
-    """
-    global antrean_queue
-    init_antrean_file()
-    with open(ANTREAN_PATH, 'r') as f:
-        content = f.read().strip()
-        if not content:
-            antrean_queue = FIFOQueue()
-        else:
-            data = json.loads(content)
-            antrean_queue = FIFOQueue()
-            antrean_queue.from_list(data)
-    return antrean_queue
-
-def save_antrean():
-    """
-    Menyimpan data antrean dari FIFO queue ke file.
-    """
-    global antrean_queue
-    with open(ANTREAN_PATH, 'w') as f:
-        json.dump(antrean_queue.to_list(), f, indent=4)
-
 def konfirmasi_pesanan():
     """
     Automatically confirm the first (oldest) unconfirmed order in the queue.
     This follows true FIFO principle - first in, first confirmed.
+    An order can also be picked directly by its ID Pesanan.
     """
-    global antrean_queue
-    load_antrean()
     data = load_data()
     clean_expired_orders()
 
-    if antrean_queue.is_empty():
-        print("Tidak ada pesanan dalam antrean.")
-        return
-
-    # Find the first unconfirmed order (maintaining FIFO)
-    queue_list = antrean_queue.to_list()
-    first_unconfirmed = None
-    first_unconfirmed_index = -1
-
-    for idx, order in enumerate(queue_list):
-        if order['status'] == "not confirmed":
-            first_unconfirmed = order
-            first_unconfirmed_index = idx + 1  # Human-readable position
-            break
-
-    if not first_unconfirmed:
+    first = antrean.peek_pending()
+    if first is None:
         print("Tidak ada pesanan yang belum dikonfirmasi.")
         return
 
-    print(f"Mengkonfirmasi pesanan pertama dalam antrean (posisi {first_unconfirmed_index}):")
+    id_pesanan = input("ID Pesanan (Enter untuk pesanan tertua): ").strip()
+    if id_pesanan:
+        seq = antrean.cari_id(id_pesanan)
+        if seq is None:
+            print(f"Pesanan dengan ID '{id_pesanan}' tidak ditemukan atau sudah diproses.")
+            return
+        first_unconfirmed = antrean.lihat(seq)
+        print("Mengkonfirmasi pesanan:")
+    else:
+        seq, first_unconfirmed = first
+        print("Mengkonfirmasi pesanan pertama dalam antrean (posisi 1):")
     print(f"ID Antrean: {first_unconfirmed.get('id_antrean', '(tidak tersedia)')}")
     print(f"Nama Pembeli: {first_unconfirmed['nama_pembeli']}")
     print(f"Waktu: {first_unconfirmed['waktu']}")
@@ -505,75 +333,136 @@ def konfirmasi_pesanan():
         print(f" - {item['produk']} | Jumlah: {item['jumlah']} | Harga: {item['harga_satuan']} | Diskon: {item['diskon']}% | Setelah Diskon: {harga_diskon:.2f} | Subtotal: {subtotal:.2f}")
     print(f"Total Harga: {total_harga:.2f}")
 
-    # Confirm the order automatically
-    def find_order(order):
-        return (order['nama_pembeli'] == first_unconfirmed['nama_pembeli'] and 
-                order['waktu'] == first_unconfirmed['waktu'] and
-                order['status'] == "not confirmed")
-
-    def update_status(order):
-        order['status'] = "confirmed"
-        return order
-
-    if antrean_queue.find_and_update(find_order, update_status):
-        save_antrean()
-
-        # Remove products with zero stock
-        produk_dihapus = []
-        for item in first_unconfirmed['pesanan']:
-            nama_produk = item['produk']
-            if nama_produk in data["toko"] and data["toko"][nama_produk]["stok"] == 0:
-                produk_dihapus.append(nama_produk)
-                del data["toko"][nama_produk]
-
-        save_data(data)
-        print("Pesanan berhasil dikonfirmasi secara otomatis!")
-
-        if produk_dihapus:
-            print("\nBeberapa produk telah otomatis dihapus karena stok habis:")
-            for produk in produk_dihapus:
-                print(f"- {produk}")
+    # Confirm the order automatically and move it to the archive
+    try:
+        antrean.konfirmasi(seq)
+    except (IndexError, OSError):
+        print("Gagal memperbarui status pesanan.")
+        return
+
+    # Remove products with zero stock
+    produk_dihapus = []
+    for item in first_unconfirmed['pesanan']:
+        nama_produk = item['produk']
+        if nama_produk in data["toko"] and data["toko"][nama_produk]["stok"] == 0:
+            produk_dihapus.append(nama_produk)
+
+    terapkan([mutasi_hapus("toko", nama_produk) for nama_produk in produk_dihapus])
+    print("Pesanan berhasil dikonfirmasi secara otomatis!")
+
+    if produk_dihapus:
+        print("\nBeberapa produk telah otomatis dihapus karena stok habis:")
+        for produk in produk_dihapus:
+            print(f"- {produk}")
+
+# -------------------- KONFIRMASI PESANAN SEKALIGUS --------------------
+def konfirmasi_pesanan_batch():
+    """
+    Konfirmasi banyak pesanan sekaligus: N pesanan tertua, semua pesanan satu
+    pelanggan, atau semua pesanan sebelum waktu tertentu. Arsip, antrean, dan
+    inventaris masing-masing hanya ditulis satu kali.
+    """
+    clean_expired_orders()
+    if antrean.jumlah_pending() == 0:
+        print("Tidak ada pesanan yang belum dikonfirmasi.")
+        return
+
+    print("\n=== KONFIRMASI PESANAN SEKALIGUS ===")
+    print("1. N pesanan tertua")
+    print("2. Semua pesanan satu pelanggan")
+    print("3. Semua pesanan sebelum waktu tertentu")
+    opsi = input("Pilih opsi (1-3): ").strip()
+
+    if opsi == "1":
+        try:
+            jumlah = int(input("Jumlah pesanan yang dikonfirmasi: "))
+        except ValueError:
+            print("Input tidak valid.")
+            return
+        if jumlah <= 0:
+            print("Jumlah harus lebih dari 0.")
+            return
+        seqs = antrean.pending_tertua(jumlah)
+    elif opsi == "2":
+        nama_pembeli = input("Nama pembeli: ").strip()
+        seqs = antrean.pending_pelanggan(nama_pembeli)
+    elif opsi == "3":
+        try:
+            batas = datetime.strptime(input("Sebelum waktu (DD-MM-YYYY HH:MM): ").strip(), "%d-%m-%Y %H:%M")
+        except ValueError:
+            print("Format waktu tidak valid.")
+            return
+        seqs = antrean.pending_sebelum(epoch(batas))
     else:
+        print("Opsi tidak valid.")
+        return
+
+    if not seqs:
+        print("Tidak ada pesanan yang cocok.")
+        return
+    if input(f"Konfirmasi {len(seqs)} pesanan? (y/n): ").strip().lower() != "y":
+        print("Konfirmasi dibatalkan.")
+        return
+
+    try:
+        terkonfirmasi = antrean.konfirmasi_banyak(seqs)
+    except OSError:
         print("Gagal memperbarui status pesanan.")
+        return
+
+    # Hapus produk yang stoknya habis, sekali untuk seluruh batch
+    toko = load_data()["toko"]
+    produk_dihapus = sorted({
+        item['produk'] for pesanan in terkonfirmasi for item in pesanan['pesanan']
+        if item['produk'] in toko and toko[item['produk']]["stok"] == 0
+    })
+    terapkan([mutasi_hapus("toko", nama_produk) for nama_produk in produk_dihapus])
+
+    tabel = []
+    total_semua = 0
+    for idx, pesanan in enumerate(terkonfirmasi, 1):
+        total_harga = sum(item['harga_satuan'] * (1 - item['diskon']/100) * item['jumlah']
+                          for item in pesanan['pesanan'])
+        total_semua += total_harga
+        tabel.append([idx, pesanan.get('id_pesanan', '-'), pesanan['nama_pembeli'], pesanan['waktu'],
+                      len(pesanan['pesanan']), f"Rp {total_harga:,.2f}"])
+
+    print(f"\n{len(terkonfirmasi)} pesanan berhasil dikonfirmasi:")
+    print(tabulate(tabel, headers=["No", "ID Pesanan", "Nama Pembeli", "Waktu", "Jumlah Item", "Total"],
+                   tablefmt="grid"))
+    print(f"Total nilai pesanan: Rp {total_semua:,.2f}")
+
+    if produk_dihapus:
+        print("\nBeberapa produk telah otomatis dihapus karena stok habis:")
+        for produk in produk_dihapus:
+            print(f"- {produk}")
 
 # -------------------- LIHAT ANTREAN LENGKAP --------------------
 def lihat_antrean_lengkap():
     """
     View complete queue with detailed information.
+    Confirmed orders live in the archive, so only pending orders are listed.
     """
-    global antrean_queue
     clean_expired_orders()
-    load_antrean()
+    queue_list = [pesanan for _, pesanan in antrean.pending()]
 
-    if antrean_queue.is_empty():
+    if not queue_list:
         print("Tidak ada pesanan dalam antrean.")
         return
 
-    print(f"\n=== ANTREAN LENGKAP (Total: {antrean_queue.size()} pesanan) ===")
+    print(f"\n=== ANTREAN LENGKAP (Total: {len(queue_list)} pesanan) ===")
     print("Urutan berdasarkan FIFO (First In, First Out):")
 
-    queue_list = antrean_queue.to_list()
-    unconfirmed_count = 0
-    confirmed_count = 0
     total_pending_revenue = 0
-    total_confirmed_revenue = 0
 
     for idx, pesanan in enumerate(queue_list, 1):
-        status_text = "Menunggu konfirmasi" if pesanan['status'] == "not confirmed" else "Dikonfirmasi"
+        status_text = "Menunggu konfirmasi ⏳"
         order_total = 0
         for item in pesanan['pesanan']:
             harga_diskon = item['harga_satuan'] * (1 - item['diskon']/100)
             subtotal = harga_diskon * item['jumlah']
             order_total += subtotal
-
-        if pesanan['status'] == "not confirmed":
-            unconfirmed_count += 1
-            total_pending_revenue += order_total
-            status_text += " ⏳"
-        else:
-            confirmed_count += 1
-            total_confirmed_revenue += order_total
-            status_text += " ✅"
+        total_pending_revenue += order_total
 
         print(f"\n{idx}. ID: {pesanan.get('id_antrean', '-')}, {pesanan['nama_pembeli']} - {pesanan['waktu']}")
         print(f"   Status: {status_text}")
@@ -585,127 +474,36 @@ def lihat_antrean_lengkap():
         print(f"   Items: {items_text}")
 
     print(f"\n📊 Ringkasan:")
-    print(f"   Pesanan belum dikonfirmasi: {unconfirmed_count} (Pending revenue: {total_pending_revenue:.2f})")
-    print(f"   Pesanan sudah dikonfirmasi: {confirmed_count} (Confirmed revenue: {total_confirmed_revenue:.2f})")
-    print(f"   Total revenue: {total_pending_revenue + total_confirmed_revenue:.2f}")
-
-    if unconfirmed_count > 0:
-        first_unconfirmed_pos = next((idx + 1 for idx, order in enumerate(queue_list) if order['status'] == 'not confirmed'), None)
-        print(f"   Pesanan tertua yang belum dikonfirmasi: Posisi {first_unconfirmed_pos}")
+    print(f"   Pesanan belum dikonfirmasi: {len(queue_list)} (Pending revenue: {total_pending_revenue:.2f})")
+    print("   Pesanan terkonfirmasi tersimpan di arsip (lihat laporan penjualan).")
 
 # -------------------- PENGHAPUSAN PESANAN KEDALUARSA --------------------
 def clean_expired_orders():
     """
     Remove orders that haven't been confirmed within 12 hours.
-    Uses a temporary queue to maintain FIFO order while filtering.
+    Stops at the first pending order that is still valid; reserved stock is returned to the store.
     """
-    global antrean_queue
-    load_antrean()
-    current_time = datetime.now()
-
-    # Create a new queue for valid orders
-    new_queue = FIFOQueue()
-    expired_count = 0
-
-    # Process each order in FIFO order
-    temp_list = antrean_queue.to_list()
-    for order in temp_list:
-        if order['status'] == "not confirmed":
-            try:
-                order_time = datetime.strptime(order['waktu'], "%Y-%m-%d %H:%M:%S")
-                if current_time - order_time > timedelta(hours=12):
-                    expired_count += 1
-                    print(f"Pesanan kedaluwarsa dihapus: {order['nama_pembeli']} - {order['waktu']}")
-                    continue
-            except:
-                continue
-        new_queue.enqueue(order)
-
-    antrean_queue = new_queue
+    expired = sapu_pesanan_kedaluwarsa()
+    expired_count = len(expired)
+    for order in expired:
+        print(f"Pesanan kedaluwarsa dihapus: {order['nama_pembeli']} - {order['waktu']}")
 
     if expired_count > 0:
-        save_antrean()
         print(f"{expired_count} pesanan kedaluwarsa telah dihapus dari antrean.")
 
     return expired_count
-def pilih_rentang_waktu():
-    while True:
-        print("\n=== PILIH RENTANG WAKTU ===")
-        print("1. Hari ini")
-        print("2. Kemarin")
-        print("3. 7 hari terakhir")
-        print("4. 30 hari terakhir")
-        print("5. Bulan ini")
-        print("6. Bulan lalu")
-        print("7. Rentang tanggal kustom")
-        print("8. Semua waktu")
-        print("0. Kembali")
-        
-        pilihan = input("Pilih opsi (0-8): ").strip()
-        
-        today = datetime.now()
-        today_start = datetime(today.year, today.month, today.day)
-        
-        if pilihan == "0":
-            return None, None
-        elif pilihan == "1":  # Hari ini
-            return today_start, today_start + timedelta(days=1)
-        elif pilihan == "2":  # Kemarin
-            yesterday = today_start - timedelta(days=1)
-            return yesterday, today_start
-        elif pilihan == "3":  # 7 hari terakhir
-            return today_start - timedelta(days=7), today_start + timedelta(days=1)
-        elif pilihan == "4":  # 30 hari terakhir
-            return today_start - timedelta(days=30), today_start + timedelta(days=1)
-        elif pilihan == "5":  # Bulan ini
-            start_of_month = datetime(today.year, today.month, 1)
-            return start_of_month, today_start + timedelta(days=1)
-        elif pilihan == "6":  # Bulan lalu
-            if today.month == 1:
-                start_of_last_month = datetime(today.year - 1, 12, 1)
-                end_of_last_month = datetime(today.year, 1, 1)
-            else:
-                start_of_last_month = datetime(today.year, today.month - 1, 1)
-                end_of_last_month = datetime(today.year, today.month, 1)
-            return start_of_last_month, end_of_last_month
-        elif pilihan == "7":  # Rentang tanggal kustom
-            try:
-                print("\nMasukkan rentang tanggal (format: DD-MM-YYYY)")
-                tanggal_awal = input("Tanggal awal: ").strip()
-                tanggal_akhir = input("Tanggal akhir: ").strip()
-                
-                start_date = datetime.strptime(tanggal_awal, "%d-%m-%Y")
-                end_date = datetime.strptime(tanggal_akhir, "%d-%m-%Y") + timedelta(days=1)  # Include the end date
-                
-                return start_date, end_date
-            except ValueError:
-                print("\nFormat tanggal tidak valid. Gunakan format DD-MM-YYYY.")
-                continue
-        elif pilihan == "8":  # Semua waktu
-            return None, None
-        else:
-            print("Pilihan tidak valid. Silakan coba lagi.")
-
 def filter_pesanan_by_date_range(pesanan_list, start_date, end_date):
     if start_date is None and end_date is None:
-        return pesanan_list
-        
-    filtered_pesanan = []
-    for pesanan in pesanan_list:
-        try:
-            pesanan_date = datetime.strptime(pesanan['waktu'], "%Y-%m-%d %H:%M:%S")
-            if (start_date is None or pesanan_date >= start_date) and (end_date is None or pesanan_date < end_date):
-                filtered_pesanan.append(pesanan)
-        except (ValueError, KeyError):
-            # Skip pesanan if it doesn't have a valid date
-            continue
-            
-    return filtered_pesanan
+        return list(pesanan_list)
+
+    # Rentang dipotong dengan bisect atas field ts (detik epoch), tanpa parsing string
+    return potong_rentang([pesanan for pesanan in pesanan_list if pesanan.get('waktu')], start_date, end_date)
 
 # -------------------- HITUNG KEUNTUNGAN --------------------
-def hitung_profit_loss(total_per_produk, produk_toko):
+def hitung_profit_loss(total_per_produk):
     """
-    Menghitung keuntungan/kerugian secara riil berdasarkan harga modal, harga jual, diskon, dan jumlah terjual.
+    Menghitung keuntungan/kerugian secara riil dari rollup penjualan: penjualan setelah
+    diskon dan modal yang dicatat di setiap baris pesanan saat checkout.
     """
 
     hasil = {
@@ -720,29 +518,16 @@ def hitung_profit_loss(total_per_produk, produk_toko):
         'total_penjualan': 0
     }
 
-    for produk, info in total_per_produk.items():
-        jumlah_terjual = info['jumlah']
-        hasil['total_produk_terjual'] += jumlah_terjual
-
-        nama_asli = dapatkan_nama_asli(produk_toko, produk)
-        if not nama_asli:
-            continue
-
-        data_produk = produk_toko.get(nama_asli, {})
-        harga_modal = data_produk.get('harga_modal', 0)
-        harga_jual = data_produk.get('harga_jual', 0)
-        diskon = data_produk.get('diskon', 0)
+    # Satu penjumlahan per produk; produk yang sudah habis dan dihapus tetap terhitung
+    for info in total_per_produk.values():
+        hasil['total_produk_terjual'] += info['jumlah']
+        hasil['total_modal'] += info['modal']
+        hasil['total_penjualan'] += info['total_harga']
+        hasil['nominal_profit_loss'] += info['margin']
 
-        harga_setelah_diskon = harga_jual * (1 - diskon / 100)
-        subtotal_penjualan = jumlah_terjual * harga_setelah_diskon
-        subtotal_modal = jumlah_terjual * harga_modal
-
-        hasil['total_modal'] += subtotal_modal
-        hasil['total_penjualan'] += subtotal_penjualan
-
-    # Hitung total stok tersedia
-    for produk_info in produk_toko.values():
-        hasil['total_produk_tersedia'] += produk_info.get('stok', 0)
+    # Hitung total stok tersedia dari ringkasan indeks kategori
+    for ringkasan in store.ringkasan_kategori("toko").values():
+        hasil['total_produk_tersedia'] += ringkasan['stok']
 
     hasil['target_penjualan'] = hasil['total_produk_tersedia'] * 0.75
 
@@ -750,7 +535,6 @@ def hitung_profit_loss(total_per_produk, produk_toko):
         hasil['persentase_terjual'] = (hasil['total_produk_terjual'] / hasil['total_produk_tersedia']) * 100
 
     # Hitung profit atau loss
-    hasil['nominal_profit_loss'] = hasil['total_penjualan'] - hasil['total_modal']
     if hasil['nominal_profit_loss'] >= 0:
         hasil['status'] = 'PROFIT'
         hasil['persentase_profit_loss'] = (hasil['nominal_profit_loss'] / hasil['total_modal']) * 100 if hasil['total_modal'] > 0 else 0
@@ -765,10 +549,11 @@ def lihat_laporan_penjualan():
     print("\n=== LAPORAN PENJUALAN ===")
     
     # Pilih rentang waktu
-    start_date, end_date = pilih_rentang_waktu()
-    if start_date is None and end_date is None and not isinstance(start_date, datetime):
+    rentang = pilih_rentang_waktu()
+    if rentang is None:
         print("Kembali ke menu utama.")
         return
+    start_date, end_date = rentang
     
     # Tampilkan rentang waktu yang dipilih
     if start_date is None and end_date is None:
@@ -776,13 +561,11 @@ def lihat_laporan_penjualan():
     else:
         print(f"\nMenampilkan laporan untuk periode: {start_date.strftime('%d-%m-%Y')} hingga {(end_date - timedelta(days=1)).strftime('%d-%m-%Y')}")
     
-    # Fix: Get the queue object and convert to list
-    antrean_queue = load_antrean()
-    antrean_list = antrean_queue.to_list()
-    antrean_confirmed = [p for p in antrean_list if p['status'] == "confirmed"]
-    
-    # Filter berdasarkan rentang tanggal
-    filtered_pesanan = filter_pesanan_by_date_range(antrean_confirmed, start_date, end_date)
+    # Pesanan terkonfirmasi dibaca dari arsip; hanya partisi yang beririsan dengan rentang dibuka.
+    # Hasil di-cache per rentang sampai ada pesanan baru dikonfirmasi atau inventaris berubah
+    filtered_pesanan = cache_laporan.ambil(
+        "transaksi", start_date, end_date,
+        lambda: filter_pesanan_by_date_range(arsip.baca_rentang(start_date, end_date), start_date, end_date))
     
     if not filtered_pesanan:
         print("Tidak ada pesanan terkonfirmasi dalam rentang waktu yang dipilih.")
@@ -814,49 +597,11 @@ def lihat_laporan_penjualan():
     print("----------------------------------")
     print(f"Jumlah Transaksi: {len(filtered_pesanan)}")
     
-    total_per_produk = {}
-    total_per_kategori = {}
-    total_keseluruhan = 0
-    
-    # Load data untuk mendapatkan informasi kategori produk
-    data = load_data()
-    produk_toko = data.get("toko", {})
-    
-    for pesanan in filtered_pesanan:
-        subtotal_transaksi = 0
-        for item in pesanan['pesanan']:
-            nama_produk = item['produk']
-            jumlah = item['jumlah']
-            harga_satuan = item['harga_satuan']
-            diskon = item['diskon']
-            harga_diskon = harga_satuan * (1 - diskon/100)
-            subtotal = jumlah * harga_diskon
-            subtotal_transaksi += subtotal
-            
-            # Catat total per produk
-            if nama_produk not in total_per_produk:
-                total_per_produk[nama_produk] = {
-                    'jumlah': 0,
-                    'total_harga': 0
-                }
-            total_per_produk[nama_produk]['jumlah'] += jumlah
-            total_per_produk[nama_produk]['total_harga'] += subtotal
-            
-            # Catat total per kategori
-            kategori = "Tidak terkategori"
-            nama_asli = dapatkan_nama_asli(produk_toko, nama_produk)
-            if nama_asli and 'kategori' in produk_toko.get(nama_asli, {}):
-                kategori = produk_toko[nama_asli]['kategori']
-                
-            if kategori not in total_per_kategori:
-                total_per_kategori[kategori] = {
-                    'jumlah': 0,
-                    'total_harga': 0
-                }
-            total_per_kategori[kategori]['jumlah'] += jumlah
-            total_per_kategori[kategori]['total_harga'] += subtotal
-        
-        total_keseluruhan += subtotal_transaksi
+    # Ringkasan dijumlahkan dari rollup harian, bukan dari setiap baris pesanan
+    ringkasan = ambil_ringkasan(start_date, end_date)
+    total_per_produk = ringkasan['produk']
+    total_per_kategori = ringkasan['kategori']
+    total_keseluruhan = ringkasan['total']['total_harga']
     
     # Tampilkan ringkasan per produk
     print("\nRINGKASAN PENJUALAN PER PRODUK:")
@@ -869,11 +614,14 @@ def lihat_laporan_penjualan():
     
     # Tampilkan ringkasan per kategori
     print("\nRINGKASAN PENJUALAN PER KATEGORI:")
-    header = ["Kategori", "Jumlah Terjual", "Total Penjualan", "Persentase"]
+    header = ["Kategori", "Jumlah Terjual", "Total Penjualan", "Persentase", "Stok Toko", "Nilai Stok (Modal)"]
     table_data = []
+    stok_kategori = store.ringkasan_kategori("toko")
     for kategori, info in total_per_kategori.items():
         persentase = (info['total_harga'] / total_keseluruhan * 100) if total_keseluruhan > 0 else 0
-        table_data.append([kategori, info['jumlah'], f"Rp {info['total_harga']:,.2f}", f"{persentase:.2f}%"])
+        stok = stok_kategori.get(None if kategori == "Tidak terkategori" else kategori, {})
+        table_data.append([kategori, info['jumlah'], f"Rp {info['total_harga']:,.2f}", f"{persentase:.2f}%",
+                           stok.get('stok', 0), f"Rp {stok.get('nilai_modal', 0):,.2f}"])
     
     print(tabulate(table_data, headers=header, tablefmt="grid"))
     print(f"\nTOTAL PENJUALAN KESELURUHAN: Rp {total_keseluruhan:,.2f}")
@@ -887,7 +635,7 @@ def lihat_laporan_penjualan():
     
     # MULAI FITUR PROFIT DAN LOSS
     # Hitung profit/loss berdasarkan target penjualan 75%
-    profit_loss = hitung_profit_loss(total_per_produk, produk_toko)
+    profit_loss = hitung_profit_loss(total_per_produk)
     
     # Tampilkan hasil perhitungan profit/loss
     print("\nC. ANALISIS TARGET PENJUALAN")
@@ -937,6 +685,14 @@ def export_laporan_to_csv(pesanan_list, total_per_produk, total_per_kategori, to
         period = "all_time"
     
     filename = f"laporan_penjualan_{period}_{timestamp}.csv"
+
+    # Daftar produk terlaris / paling lambat untuk ekspor, dipilih dengan heap (lihat peringkat_produk)
+    produk_toko = store.salinan("toko")
+    daftar_peringkat = [
+        (f"{JUMLAH_PERINGKAT} PRODUK TERLARIS", peringkat_produk(total_per_produk)),
+        (f"{JUMLAH_PERINGKAT} PRODUK PALING LAMBAT",
+         peringkat_produk(total_per_produk, terbawah=True, produk_lain=produk_toko)),
+    ]
     
     try:
         # Try to generate an Excel file first if xlsxwriter is available
@@ -1060,12 +816,7 @@ def export_laporan_to_csv(pesanan_list, total_per_produk, total_per_kategori, to
                         subtotal = harga_diskon * item['jumlah']
                         
                         # Format date from string if needed
-                        waktu = pesanan['waktu']
-                        if isinstance(waktu, str):
-                            try:
-                                waktu = datetime.strptime(waktu, "%Y-%m-%d %H:%M:%S")
-                            except:
-                                pass
+                        waktu = datetime.fromtimestamp(epoch_pesanan(pesanan))
                         
                         worksheet.write(row, 0, transaction_idx, text_format)
                         worksheet.write(row, 1, pesanan['nama_pembeli'], text_format)
@@ -1105,6 +856,22 @@ def export_laporan_to_csv(pesanan_list, total_per_produk, total_per_kategori, to
                     row += 1
                 
                 row += 1  # Add extra space
+
+                # Produk terlaris dan paling lambat (berdasarkan jumlah terjual)
+                for judul, peringkat in daftar_peringkat:
+                    worksheet.write(row, 0, judul, subheader_format)
+                    row += 1
+                    for col, header in enumerate(['No.', 'Produk', 'Jumlah Terjual', 'Total Penjualan', 'Keuntungan']):
+                        worksheet.write(row, col, header, header_format)
+                    row += 1
+                    for idx, (produk, info) in enumerate(peringkat, 1):
+                        worksheet.write(row, 0, idx, text_format)
+                        worksheet.write(row, 1, produk, text_format)
+                        worksheet.write(row, 2, info['jumlah'], number_format)
+                        worksheet.write(row, 3, info['total_harga'], currency_format)
+                        worksheet.write(row, 4, info['margin'], currency_format)
+                        row += 1
+                    row += 1
                 
                 # Ringkasan Per Kategori section
                 worksheet.write(row, 0, 'RINGKASAN PER KATEGORI', subheader_format)
@@ -1239,15 +1006,8 @@ def export_laporan_to_csv(pesanan_list, total_per_produk, total_per_kategori, to
                     subtotal = harga_diskon * item['jumlah']
                     
                     # Format date properly for CSV
-                    waktu = pesanan['waktu']
-                    if isinstance(waktu, str):
-                        try:
-                            dt = datetime.strptime(waktu, "%Y-%m-%d %H:%M:%S")
-                            waktu_formatted = f'"{dt.strftime("%d-%m-%Y %H:%M:%S")}"'
-                        except:
-                            waktu_formatted = f'"{waktu}"'
-                    else:
-                        waktu_formatted = f'"{waktu}"'
+                    dt = datetime.fromtimestamp(epoch_pesanan(pesanan))
+                    waktu_formatted = f'"{dt.strftime("%d-%m-%Y %H:%M:%S")}"'
                     
                     writer.writerow([
                         transaction_idx,
@@ -1275,6 +1035,21 @@ def export_laporan_to_csv(pesanan_list, total_per_produk, total_per_kategori, to
                 ])
             
             writer.writerow([])  # Empty row for spacing
+
+            # Produk terlaris dan paling lambat (berdasarkan jumlah terjual)
+            for judul, peringkat in daftar_peringkat:
+                writer.writerow([judul, "", "", "", "", "", "", ""])
+                writer.writerow(["No.", "Produk", "Jumlah Terjual", "Total Penjualan", "Keuntungan", "", "", ""])
+                for idx, (produk, info) in enumerate(peringkat, 1):
+                    writer.writerow([
+                        idx,
+                        produk,
+                        info['jumlah'],
+                        format_number(info['total_harga']),
+                        format_number(info['margin']),
+                        "", "", ""
+                    ])
+                writer.writerow([])
             
             # Ringkasan per kategori
             writer.writerow(["RINGKASAN PER KATEGORI", "", "", "", "", "", "", ""])
@@ -1356,9 +1131,11 @@ def menu_admin():
         print("6. Lihat laporan penjualan")
         print("7. Konfirmasi pesanan")
         print("8. Periksa produk kadaluarsa")
+        print("9. Konfirmasi pesanan sekaligus")
+        print("10. Produk terlaris & paling lambat")
         print("0. Kembali ke menu utama")
         
-        pilihan = input("Pilih menu (0-8): ").strip()
+        pilihan = input("Pilih menu (0-10): ").strip()
         
         if pilihan == "1":
             nama = input("Nama produk yang dipindah: ").strip()
@@ -1371,9 +1148,8 @@ def menu_admin():
             try:
                 data = load_data()
                 gudang = data["gudang"]
-                toko = data["toko"]
                 
-                nama_asli = dapatkan_nama_asli(gudang, nama)
+                nama_asli = dapatkan_nama_asli("gudang", nama)
                 
                 # Jika produk TIDAK ADA di gudang, langsung berhenti
                 if not nama_asli:
@@ -1397,7 +1173,7 @@ def menu_admin():
                     continue
                 
                 # Cek apakah produk sudah ada di TOKO (untuk menentukan perlu diskon atau tidak)
-                if cari_nama_produk(toko, nama):
+                if cari_nama_produk("toko", nama):
                     # Produk sudah ada di toko, tidak perlu diskon
                     print("Produk sudah ada di toko. Menambah stok tanpa diskon baru.")
                     tambah_produk_ke_toko(nama, jumlah)
@@ -1446,10 +1222,14 @@ def menu_admin():
                 print("Pemeriksaan kadaluarsa selesai.")
             else:
                 print("Tidak ada produk yang kadaluarsa.")
+        elif pilihan == "9":
+            konfirmasi_pesanan_batch()
+        elif pilihan == "10":
+            lihat_produk_terlaris()
         elif pilihan == "0":
             break
         else:
-            print("Pilihan tidak valid. Silakan pilih menu 1-8.")
+            print("Pilihan tidak valid. Silakan pilih menu 0-10.")
 
 # This allows the file to be imported without running the menu
 if __name__ == "__main__":
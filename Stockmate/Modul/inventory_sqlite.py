@@ -0,0 +1,327 @@
+import json
+import os
+import sqlite3
+import sys
+import threading
+
+from inventory_store import DATA_FOLDER, FILE_PATH, InventoryStore, terapkan_mutasi_terindeks
+from product_index import IndeksProduk, kunci_nama
+
+DB_PATH = os.path.join(DATA_FOLDER, "inv.db")
+LOKASI = ("gudang", "toko")
+
+# Kolom tetap per produk; atribut lain disimpan sebagai JSON di kolom "extra"
+KOLOM = ["stok", "kategori", "harga_modal", "harga_jual", "diskon", "tanggal_input", "tanggal_kadaluarsa"]
+
+# PRAGMA user_version; 1 = nama_lower berisi kunci_nama (casefold), bukan lower()
+VERSI_SKEMA = 1
+
+SKEMA = """
+CREATE TABLE IF NOT EXISTS {lokasi} (
+    nama TEXT PRIMARY KEY,
+    nama_lower TEXT NOT NULL,
+    stok INTEGER NOT NULL DEFAULT 0,
+    kategori TEXT,
+    harga_modal REAL,
+    harga_jual REAL,
+    diskon REAL,
+    tanggal_input TEXT,
+    tanggal_kadaluarsa TEXT,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_{lokasi}_nama_lower ON {lokasi} (nama_lower);
+CREATE INDEX IF NOT EXISTS idx_{lokasi}_kategori ON {lokasi} (kategori);
+CREATE INDEX IF NOT EXISTS idx_{lokasi}_kadaluarsa ON {lokasi} (tanggal_kadaluarsa)
+    WHERE tanggal_kadaluarsa IS NOT NULL;
+"""
+
+
+# -------------------- KONVERSI BARIS <-> DICT --------------------
+def _baris_dari_info(nama, info):
+    extra = {k: v for k, v in info.items() if k not in KOLOM}
+    return [nama, kunci_nama(nama)] + [info.get(k) for k in KOLOM] + [json.dumps(extra) if extra else None]
+
+def _info_dari_baris(row):
+    info = {}
+    for k in KOLOM:
+        if row[k] is not None:
+            info[k] = row[k]
+    if row["extra"]:
+        info.update(json.loads(row["extra"]))
+    return info
+
+
+# -------------------- SQLITE INVENTORY STORE --------------------
+class SQLiteInventoryStore:
+    """
+    Backend SQLite (mode WAL) untuk stok gudang dan toko.
+
+    Antarmukanya sama dengan InventoryStore sehingga menu admin, superAdmin,
+    dan user berjalan tanpa perubahan. Dokumen hasil load() tetap di-cache dan
+    hanya dibangun ulang jika PRAGMA data_version menunjukkan koneksi lain
+    telah menulis ke database.
+
+    Lookup nama, kategori, dan kadaluarsa dijawab langsung dengan query SQL di
+    atas indeks nama_lower, kategori, dan tanggal_kadaluarsa, tanpa memuat
+    seluruh tabel. Hanya pencarian typeahead/fuzzy yang memakai indeks di memori.
+    """
+    def __init__(self, db_path=DB_PATH):
+        self.db_path = db_path
+        self.lock = threading.RLock()
+        self._conn = None
+        self._data = None
+        self._data_version = None
+        self.indeks = IndeksProduk()
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+
+    def init_file(self):
+        with self.lock:
+            if self._conn is not None:
+                return
+            folder = os.path.dirname(self.db_path)
+            if folder and not os.path.exists(folder):
+                os.makedirs(folder)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            for lokasi in LOKASI:
+                conn.executescript(SKEMA.format(lokasi=lokasi))
+            if conn.execute("PRAGMA user_version").fetchone()[0] < VERSI_SKEMA:
+                # nama_lower lama diisi dengan lower(); samakan dengan kunci_nama backend JSON
+                for lokasi in LOKASI:
+                    rows = conn.execute(f"SELECT nama FROM {lokasi}").fetchall()
+                    conn.executemany(f"UPDATE {lokasi} SET nama_lower = ? WHERE nama = ?",
+                                     [(kunci_nama(row["nama"]), row["nama"]) for row in rows])
+                conn.execute(f"PRAGMA user_version = {VERSI_SKEMA}")
+            conn.commit()
+            self._conn = conn
+
+    @property
+    def conn(self):
+        self.init_file()
+        return self._conn
+
+    def _current_data_version(self):
+        return self.conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def load(self):
+        """Dokumen {"gudang": {...}, "toko": {...}} dari cache atau database."""
+        with self.lock:
+            data_version = self._current_data_version()
+            if self._data is not None and data_version == self._data_version:
+                self.hits += 1
+                return self._data
+
+            self.misses += 1
+            data = {}
+            for lokasi in LOKASI:
+                rows = self.conn.execute(f"SELECT * FROM {lokasi} ORDER BY rowid")
+                data[lokasi] = {row["nama"]: _info_dari_baris(row) for row in rows}
+            self.indeks.bangun(data)
+            self._data = data
+            self._data_version = data_version
+            self.version += 1
+            return self._data
+
+    def save(self, data):
+        """Ganti seluruh isi tabel dengan dokumen dalam satu transaksi."""
+        with self.lock:
+            placeholder = ", ".join("?" * (len(KOLOM) + 3))
+            with self.conn:
+                for lokasi in LOKASI:
+                    self.conn.execute(f"DELETE FROM {lokasi}")
+                    self.conn.executemany(
+                        f"INSERT INTO {lokasi} (nama, nama_lower, {', '.join(KOLOM)}, extra) VALUES ({placeholder})",
+                        [_baris_dari_info(nama, info) for nama, info in data.get(lokasi, {}).items()]
+                    )
+            self.indeks.bangun(data)
+            self._data = data
+            self._data_version = self._current_data_version()
+            self.version += 1
+
+    def _jalankan_mutasi(self, mutasi):
+        op = mutasi["op"]
+        lokasi = mutasi["lokasi"]
+        if lokasi not in LOKASI:
+            raise ValueError(f"Lokasi tidak valid: {lokasi}")
+        nama = mutasi["nama"]
+        if op == "stok":
+            self.conn.execute(f"UPDATE {lokasi} SET stok = stok + ? WHERE nama = ?", (mutasi["delta"], nama))
+        elif op == "set":
+            field = mutasi["field"]
+            if field in KOLOM:
+                self.conn.execute(f"UPDATE {lokasi} SET {field} = ? WHERE nama = ?", (mutasi["nilai"], nama))
+            else:
+                row = self.conn.execute(f"SELECT extra FROM {lokasi} WHERE nama = ?", (nama,)).fetchone()
+                if row is None:
+                    return
+                extra = json.loads(row["extra"]) if row["extra"] else {}
+                if mutasi["nilai"] is None:
+                    extra.pop(field, None)
+                else:
+                    extra[field] = mutasi["nilai"]
+                self.conn.execute(f"UPDATE {lokasi} SET extra = ? WHERE nama = ?",
+                                  (json.dumps(extra) if extra else None, nama))
+        elif op == "tambah":
+            placeholder = ", ".join("?" * (len(KOLOM) + 3))
+            self.conn.execute(
+                f"INSERT OR REPLACE INTO {lokasi} (nama, nama_lower, {', '.join(KOLOM)}, extra) VALUES ({placeholder})",
+                _baris_dari_info(nama, mutasi["info"])
+            )
+        elif op == "hapus":
+            self.conn.execute(f"DELETE FROM {lokasi} WHERE nama = ?", (nama,))
+        elif op == "ganti_nama":
+            nama_baru = mutasi["nama_baru"]
+            if nama_baru == nama or self.conn.execute(
+                    f"SELECT 1 FROM {lokasi} WHERE nama = ?", (nama,)).fetchone() is None:
+                return
+            # Sama seperti InventoryStore: produk yang sudah bernama nama_baru ditimpa
+            self.conn.execute(f"DELETE FROM {lokasi} WHERE nama = ?", (nama_baru,))
+            self.conn.execute(f"UPDATE {lokasi} SET nama = ?, nama_lower = ? WHERE nama = ?",
+                              (nama_baru, kunci_nama(nama_baru), nama))
+        else:
+            raise ValueError(f"Mutasi tidak dikenal: {op}")
+
+    def terapkan(self, *mutasi):
+        """Terapkan mutasi sebagai satu transaksi SQL dan perbarui cache."""
+        if len(mutasi) == 1 and isinstance(mutasi[0], list):
+            mutasi = mutasi[0]
+        if not mutasi:
+            return
+        with self.lock:
+            data = self.load()
+            with self.conn:
+                for m in mutasi:
+                    self._jalankan_mutasi(m)
+            for m in mutasi:
+                terapkan_mutasi_terindeks(data, m, self.indeks)
+            self._data_version = self._current_data_version()
+            self.version += 1
+
+    def compact(self):
+        """Checkpoint WAL ke file database utama."""
+        with self.lock:
+            self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            return True
+
+    # -------------------- LOOKUP --------------------
+    def _tabel(self, lokasi):
+        if lokasi not in LOKASI:
+            raise ValueError(f"Lokasi tidak valid: {lokasi}")
+        return lokasi
+
+    def cari_nama_asli(self, lokasi, nama):
+        """Nama produk sebagaimana tersimpan (tidak peka huruf besar/kecil), lewat indeks nama_lower."""
+        with self.lock:
+            row = self.conn.execute(
+                f"SELECT nama FROM {self._tabel(lokasi)} WHERE nama_lower = ? ORDER BY rowid LIMIT 1",
+                (kunci_nama(nama),)
+            ).fetchone()
+            return row["nama"] if row else None
+
+    def cari_produk(self, lokasi, teks, batas=10):
+        with self.lock:
+            self.load()
+            return self.indeks.pencarian.cari(lokasi, teks, batas)
+
+    def produk_per_kategori(self, lokasi, kategori):
+        """Nama produk dengan kategori tertentu (None = tanpa kategori), lewat indeks kategori."""
+        with self.lock:
+            rows = self.conn.execute(f"SELECT nama FROM {self._tabel(lokasi)} WHERE kategori IS ?", (kategori,))
+            return [row["nama"] for row in rows]
+
+    def daftar_kategori(self, lokasi):
+        with self.lock:
+            rows = self.conn.execute(
+                f"SELECT DISTINCT kategori FROM {self._tabel(lokasi)} WHERE kategori IS NOT NULL ORDER BY kategori")
+            return [row["kategori"] for row in rows]
+
+    def ringkasan_kategori(self, lokasi):
+        """{kategori: {"jumlah_produk", "stok", "nilai_modal", "nilai_jual"}} dengan GROUP BY di atas indeks kategori."""
+        with self.lock:
+            rows = self.conn.execute(f"""
+                SELECT kategori, COUNT(*) AS jumlah_produk, TOTAL(stok) AS stok,
+                       TOTAL(stok * COALESCE(harga_modal, 0)) AS nilai_modal,
+                       TOTAL(stok * COALESCE(harga_jual, 0)) AS nilai_jual
+                FROM {self._tabel(lokasi)} GROUP BY kategori
+            """)
+            return {
+                row["kategori"]: {
+                    "stok": int(row["stok"]),
+                    "nilai_modal": row["nilai_modal"],
+                    "nilai_jual": row["nilai_jual"],
+                    "jumlah_produk": row["jumlah_produk"],
+                }
+                for row in rows
+            }
+
+    def produk_kadaluarsa(self, lokasi, hari_ini):
+        """Nama produk dengan tanggal_kadaluarsa <= hari_ini, lewat indeks parsial kadaluarsa."""
+        with self.lock:
+            rows = self.conn.execute(
+                f"SELECT nama FROM {self._tabel(lokasi)} WHERE tanggal_kadaluarsa IS NOT NULL "
+                f"AND tanggal_kadaluarsa != '' AND tanggal_kadaluarsa <= ? ORDER BY tanggal_kadaluarsa, nama",
+                (hari_ini,)
+            )
+            return [row["nama"] for row in rows]
+
+    def salinan(self, lokasi):
+        """
+        Salinan dangkal produk di satu lokasi, diambil di bawah lock. Pakai ini
+        untuk iterasi: dokumen bersama bisa berubah ukuran saat penyapu latar
+        menghapus produk dari thread lain.
+        """
+        with self.lock:
+            return dict(self.load().get(lokasi, {}))
+
+    def invalidate(self):
+        with self.lock:
+            self._data = None
+            self._data_version = None
+
+    def penanda(self):
+        """Penanda persisten isi inventaris (stat file database dan WAL), sama antar proses."""
+        signature = []
+        for path in (self.db_path, self.db_path + "-wal"):
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                signature.append(None)
+                continue
+            signature.append((st.st_mtime_ns, st.st_size))
+        return tuple(signature)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": (self.hits / total) if total else 0.0,
+            "version": self.version,
+        }
+
+
+# -------------------- MIGRASI --------------------
+def migrasi_dari_json(json_path=FILE_PATH, db_path=DB_PATH):
+    """
+    Impor inv.json (beserta jurnal yang belum dikompaksi) ke database SQLite.
+    Isi database sebelumnya diganti.
+    """
+    sumber = InventoryStore(file_path=json_path, journal_path=os.path.splitext(json_path)[0] + ".journal")
+    data = sumber.load()
+    tujuan = SQLiteInventoryStore(db_path)
+    tujuan.save(data)
+    jumlah = {lokasi: len(data.get(lokasi, {})) for lokasi in LOKASI}
+    print(f"Migrasi selesai: {jumlah['gudang']} produk gudang, {jumlah['toko']} produk toko -> {db_path}")
+    return jumlah
+
+
+if __name__ == "__main__":
+    # Penggunaan: python inventory_sqlite.py migrasi [inv.json] [inv.db]
+    if len(sys.argv) >= 2 and sys.argv[1] == "migrasi":
+        migrasi_dari_json(*sys.argv[2:4])
+    else:
+        print("Penggunaan: python inventory_sqlite.py migrasi [path_inv.json] [path_inv.db]")
@@ -0,0 +1,402 @@
+import json
+import os
+import threading
+
+from product_index import IndeksProduk
+
+# Folder dan File paths
+DATA_FOLDER = "Data"
+FILE_PATH = os.path.join(DATA_FOLDER, "inv.json")
+JOURNAL_PATH = os.path.join(DATA_FOLDER, "inv.journal")
+
+# Backend penyimpanan: "json" (inv.json + jurnal) atau "sqlite" (inv.db)
+BACKEND_INVENTARIS = "json"
+
+# Mode jurnal: setiap mutasi ditambahkan ke inv.journal sebagai satu baris,
+# inv.json hanya ditulis ulang saat kompaksi.
+JURNAL_AKTIF = True
+KOMPAKSI_MAKS_RECORD = 500      # kompaksi segera jika jurnal sepanjang ini
+KOMPAKSI_INTERVAL_DETIK = 60    # kompaksi berkala oleh thread latar belakang
+
+
+# -------------------- MUTASI --------------------
+def mutasi_stok(lokasi, nama, delta):
+    """Tambah/kurangi stok produk sebesar delta."""
+    return {"op": "stok", "lokasi": lokasi, "nama": nama, "delta": delta}
+
+def mutasi_set(lokasi, nama, field, nilai):
+    """Ubah satu atribut produk (harga, diskon, ...). nilai None menghapus atribut."""
+    return {"op": "set", "lokasi": lokasi, "nama": nama, "field": field, "nilai": nilai}
+
+def mutasi_tambah(lokasi, nama, info):
+    """Tambah produk baru beserta seluruh atributnya."""
+    return {"op": "tambah", "lokasi": lokasi, "nama": nama, "info": info}
+
+def mutasi_hapus(lokasi, nama):
+    """Hapus produk dari lokasi."""
+    return {"op": "hapus", "lokasi": lokasi, "nama": nama}
+
+def mutasi_ganti_nama(lokasi, nama, nama_baru):
+    """Ganti nama produk tanpa mengubah atributnya."""
+    return {"op": "ganti_nama", "lokasi": lokasi, "nama": nama, "nama_baru": nama_baru}
+
+def mutasi_pindah_ke_toko(nama_gudang, nama_toko, jumlah, info_baru=None):
+    """
+    Pindahkan stok dari gudang ke toko. Jika info_baru diberikan, produk
+    dibuat baru di toko; jika tidak, stok toko yang sudah ada ditambah.
+    """
+    ops = [mutasi_stok("gudang", nama_gudang, -jumlah)]
+    if info_baru is not None:
+        ops.append(mutasi_tambah("toko", nama_toko, info_baru))
+    else:
+        ops.append(mutasi_stok("toko", nama_toko, jumlah))
+    return ops
+
+def terapkan_mutasi(data, mutasi):
+    """Terapkan satu mutasi ke dokumen inventaris di memori."""
+    op = mutasi["op"]
+    koleksi = data.setdefault(mutasi["lokasi"], {})
+    nama = mutasi["nama"]
+    if op == "stok":
+        if nama in koleksi:
+            koleksi[nama]["stok"] += mutasi["delta"]
+    elif op == "set":
+        if nama in koleksi:
+            if mutasi["nilai"] is None:
+                koleksi[nama].pop(mutasi["field"], None)
+            else:
+                koleksi[nama][mutasi["field"]] = mutasi["nilai"]
+    elif op == "tambah":
+        koleksi[nama] = dict(mutasi["info"])
+    elif op == "hapus":
+        koleksi.pop(nama, None)
+    elif op == "ganti_nama":
+        if nama in koleksi:
+            koleksi[mutasi["nama_baru"]] = koleksi.pop(nama)
+    else:
+        raise ValueError(f"Mutasi tidak dikenal: {op}")
+
+def produk_tersentuh(mutasi):
+    """Pasangan (lokasi, nama) yang isinya bisa berubah oleh mutasi."""
+    tersentuh = [(mutasi["lokasi"], mutasi["nama"])]
+    if mutasi["op"] == "ganti_nama":
+        tersentuh.append((mutasi["lokasi"], mutasi["nama_baru"]))
+    return tersentuh
+
+def terapkan_mutasi_terindeks(data, mutasi, indeks):
+    """Terapkan mutasi lalu perbarui indeks produk hanya untuk produk yang tersentuh."""
+    tersentuh = produk_tersentuh(mutasi)
+    lama = []
+    for lokasi, nama in tersentuh:
+        info = data.get(lokasi, {}).get(nama)
+        lama.append(dict(info) if info is not None else None)
+    terapkan_mutasi(data, mutasi)
+    for (lokasi, nama), info_lama in zip(tersentuh, lama):
+        indeks.perbarui(data, lokasi, nama, info_lama, data.get(lokasi, {}).get(nama))
+
+
+# -------------------- INVENTORY STORE --------------------
+class InventoryStore:
+    """
+    Penyimpanan inventaris bersama untuk modul admin, superAdmin, dan user.
+
+    Dokumen {"gudang": {...}, "toko": {...}} disimpan di memori setelah
+    dibaca pertama kali. File hanya di-parse ulang jika mtime, ukuran, atau
+    inode-nya berubah (misalnya diedit oleh proses lain).
+
+    Dalam mode jurnal, inv.json adalah snapshot dan inv.journal berisi
+    mutasi sesudahnya, satu transaksi per baris. Saat dimuat, snapshot
+    dibaca lalu jurnal diputar ulang di atasnya.
+
+    Snapshot baru ditulis ke inv.json.tmp lalu di-rename menjadi inv.json.baru,
+    jurnal dikosongkan, baru kemudian inv.json.baru menggantikan inv.json.
+    inv.json.baru yang tersisa setelah crash selalu sudah memuat isi jurnal,
+    sehingga load() menyelesaikan penggantian itu tanpa memutar ulang jurnal.
+
+    Indeks produk (lihat product_index) dibangun ulang setiap dokumen dibaca
+    dari disk atau disimpan penuh, dan diperbarui per produk oleh terapkan().
+    """
+    def __init__(self, file_path=FILE_PATH, journal_path=JOURNAL_PATH, jurnal_aktif=JURNAL_AKTIF):
+        self.file_path = file_path
+        self.journal_path = journal_path
+        self.jurnal_aktif = jurnal_aktif
+        self.lock = threading.RLock()
+        self._data = None
+        self._signature = None
+        self._journal_records = 0
+        self._compactor = None
+        self._compact_event = threading.Event()
+        self.indeks = IndeksProduk()
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+
+    def init_file(self):
+        folder = os.path.dirname(self.file_path)
+        if folder and not os.path.exists(folder):
+            os.makedirs(folder)
+        if not os.path.exists(self.file_path):
+            with open(self.file_path, 'w') as f:
+                json.dump({"gudang": {}, "toko": {}}, f, indent=4)
+
+    def _stat_signature(self):
+        signature = []
+        for path in (self.file_path, self.journal_path):
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                signature.append(None)
+                continue
+            signature.append((st.st_mtime_ns, st.st_size, st.st_ino))
+        return tuple(signature)
+
+    def _replay_journal(self, data):
+        """
+        Putar ulang jurnal di atas snapshot. Baris terakhir yang terpotong
+        (crash saat menulis) dibuang dari file, agar transaksi berikutnya tidak
+        ditulis di belakangnya. Mengembalikan (jumlah transaksi, True jika jurnal dipotong).
+        """
+        count = 0
+        valid = 0
+        if not os.path.exists(self.journal_path):
+            return count, False
+        with open(self.journal_path, 'r+b') as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                if line.strip():
+                    try:
+                        transaksi = json.loads(line)
+                    except ValueError:
+                        break
+                    for mutasi in transaksi:
+                        terapkan_mutasi(data, mutasi)
+                    count += 1
+                valid += len(line)
+            dipotong = f.seek(0, os.SEEK_END) != valid
+            if dipotong:
+                f.truncate(valid)
+        return count, dipotong
+
+    def _kosongkan_jurnal(self):
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, 'r+b') as f:
+                f.truncate(0)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _pulihkan_snapshot(self):
+        """Selesaikan penggantian snapshot yang terhenti (inv.json.baru sudah memuat isi jurnal)."""
+        baru_path = self.file_path + ".baru"
+        if os.path.exists(baru_path):
+            self._kosongkan_jurnal()
+            os.replace(baru_path, self.file_path)
+
+    def load(self):
+        """
+        Mengembalikan dokumen inventaris dari cache, membaca ulang file
+        hanya jika signature file berubah.
+
+        Dokumen yang dikembalikan adalah objek bersama: perubahan harus
+        diakhiri dengan save()/terapkan(), atau invalidate() jika
+        perubahan dibatalkan.
+        """
+        with self.lock:
+            if not os.path.exists(self.file_path):
+                self.init_file()
+            signature = self._stat_signature()
+
+            if self._data is not None and signature == self._signature:
+                self.hits += 1
+                return self._data
+
+            self.misses += 1
+            self._pulihkan_snapshot()
+            with open(self.file_path, 'r') as f:
+                data = json.load(f)
+            self._journal_records, dipotong = self._replay_journal(data)
+            if dipotong:
+                signature = self._stat_signature()
+            self.indeks.bangun(data)
+            self._data = data
+            self._signature = signature
+            self.version += 1
+            return self._data
+
+    def _write_snapshot(self, data):
+        self.init_file()
+        tmp_path = self.file_path + ".tmp"
+        baru_path = self.file_path + ".baru"
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f, indent=4)
+            f.flush()
+            os.fsync(f.fileno())
+        # Jurnal baru dikosongkan setelah snapshot lengkap ada di disk, dan snapshot
+        # baru menggantikan inv.json setelah jurnal kosong: tidak ada titik crash
+        # di mana isi jurnal diputar ulang di atas snapshot yang sudah memuatnya
+        os.replace(tmp_path, baru_path)
+        self._kosongkan_jurnal()
+        os.replace(baru_path, self.file_path)
+        self._journal_records = 0
+
+    def save(self, data):
+        """Menulis snapshot penuh ke file dan memperbarui cache tanpa parse ulang."""
+        with self.lock:
+            self._write_snapshot(data)
+            self.indeks.bangun(data)
+            self._data = data
+            self._signature = self._stat_signature()
+            self.version += 1
+
+    def terapkan(self, *mutasi):
+        """
+        Terapkan satu atau beberapa mutasi sebagai satu transaksi.
+
+        Dalam mode jurnal transaksi ditambahkan sebagai satu baris ringkas ke
+        inv.journal; tanpa mode jurnal snapshot penuh ditulis ulang.
+        """
+        if len(mutasi) == 1 and isinstance(mutasi[0], list):
+            mutasi = mutasi[0]
+        if not mutasi:
+            return
+        with self.lock:
+            data = self.load()
+            for m in mutasi:
+                terapkan_mutasi_terindeks(data, m, self.indeks)
+
+            if not self.jurnal_aktif:
+                self.save(data)
+                return
+
+            with open(self.journal_path, 'a') as f:
+                f.write(json.dumps(list(mutasi), separators=(',', ':')) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self._journal_records += 1
+            self._signature = self._stat_signature()
+            self.version += 1
+
+            self._start_compactor()
+            if self._journal_records >= KOMPAKSI_MAKS_RECORD:
+                self._compact_event.set()
+
+    def compact(self):
+        """Gabungkan jurnal ke snapshot baru inv.json lalu kosongkan jurnal."""
+        with self.lock:
+            if self._journal_records == 0:
+                return False
+            data = self.load()
+            self._write_snapshot(data)
+            self._signature = self._stat_signature()
+            return True
+
+    def _start_compactor(self):
+        if self._compactor is not None and self._compactor.is_alive():
+            return
+        self._compactor = threading.Thread(target=self._compact_loop, name="inv-compactor", daemon=True)
+        self._compactor.start()
+
+    def _compact_loop(self):
+        while True:
+            self._compact_event.wait(KOMPAKSI_INTERVAL_DETIK)
+            self._compact_event.clear()
+            try:
+                self.compact()
+            except OSError as e:
+                print(f"Kompaksi inventaris gagal: {e}")
+
+    # -------------------- LOOKUP --------------------
+    def cari_nama_asli(self, lokasi, nama):
+        """Nama produk sebagaimana tersimpan (case-insensitive), atau None."""
+        with self.lock:
+            self.load()
+            return self.indeks.nama.cari(lokasi, nama)
+
+    def cari_produk(self, lokasi, teks, batas=10):
+        """Nama produk yang cocok sebagian/fuzzy dengan teks, urut menurut relevansi."""
+        with self.lock:
+            self.load()
+            return self.indeks.pencarian.cari(lokasi, teks, batas)
+
+    def produk_per_kategori(self, lokasi, kategori):
+        """Daftar nama produk di lokasi dengan kategori tertentu."""
+        with self.lock:
+            self.load()
+            return list(self.indeks.kategori.cari(lokasi, kategori))
+
+    def daftar_kategori(self, lokasi):
+        """Kategori yang sedang dipakai produk di lokasi (termasuk kategori lama)."""
+        with self.lock:
+            self.load()
+            return self.indeks.kategori.daftar(lokasi)
+
+    def ringkasan_kategori(self, lokasi):
+        """Jumlah produk, total stok, dan nilai persediaan per kategori."""
+        with self.lock:
+            self.load()
+            return self.indeks.kategori.ringkasan(lokasi)
+
+    def produk_kadaluarsa(self, lokasi, hari_ini):
+        """Daftar nama produk yang tanggal_kadaluarsa-nya <= hari_ini (YYYY-MM-DD)."""
+        with self.lock:
+            self.load()
+            return self.indeks.kadaluarsa.kadaluarsa(lokasi, hari_ini)
+
+    def salinan(self, lokasi):
+        """
+        Salinan dangkal produk di satu lokasi, diambil di bawah lock. Pakai ini
+        untuk iterasi: dokumen bersama bisa berubah ukuran saat penyapu latar
+        menghapus produk dari thread lain.
+        """
+        with self.lock:
+            return dict(self.load().get(lokasi, {}))
+
+    def invalidate(self):
+        """Buang cache sehingga load() berikutnya membaca ulang file."""
+        with self.lock:
+            self._data = None
+            self._signature = None
+
+    def penanda(self):
+        """Penanda persisten isi inventaris (stat file snapshot dan jurnal), sama antar proses."""
+        return self._stat_signature()
+
+    def stats(self):
+        """Statistik cache untuk tuning."""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": (self.hits / total) if total else 0.0,
+            "version": self.version,
+            "journal_records": self._journal_records,
+        }
+
+
+def buat_store(backend=BACKEND_INVENTARIS):
+    """Buat store sesuai backend yang dikonfigurasi."""
+    if backend == "sqlite":
+        from inventory_sqlite import SQLiteInventoryStore
+        return SQLiteInventoryStore()
+    if backend != "json":
+        raise ValueError(f"Backend inventaris tidak dikenal: {backend}")
+    return InventoryStore()
+
+
+# Global store instance
+store = buat_store()
+
+def init_file():
+    store.init_file()
+
+def load_data():
+    return store.load()
+
+def save_data(data):
+    store.save(data)
+
+def terapkan(*mutasi):
+    store.terapkan(*mutasi)
+
+def cache_stats():
+    return store.stats()
@@ -13,6 +13,7 @@ init(autoreset=True)
 from user import menu_user
 from admin import menu_admin
 from superAdmin import super_admin_menu
+from sweeper import mulai_penyapu
 
 # Main user data file
 DATA_FOLDER = "Data"
@@ -529,6 +530,7 @@ def show_about_system():
 
 if __name__ == "__main__":
     try:
+        mulai_penyapu()
         main_menu()
     except KeyboardInterrupt:
         clear_screen()
@@ -0,0 +1,300 @@
+import json
+import os
+import shutil
+import threading
+from bisect import bisect_left
+from datetime import datetime
+
+# Folder dan File paths
+DATA_FOLDER = "Data"
+ARSIP_DIR = os.path.join(DATA_FOLDER, "arsip")
+FORMAT_WAKTU = "%Y-%m-%d %H:%M:%S"
+
+
+# -------------------- ARSIP PESANAN --------------------
+def kunci_partisi(pesanan):
+    """Partisi bulanan 'YYYY-MM' berdasarkan waktu pesanan."""
+    return pesanan["waktu"][:7]
+
+def waktu_str(tanggal):
+    """datetime -> string 'YYYY-MM-DD HH:MM:SS' yang bisa dibandingkan langsung dengan field waktu."""
+    return tanggal.strftime(FORMAT_WAKTU) if tanggal is not None else None
+
+def epoch(tanggal):
+    """datetime -> detik epoch (int) yang bisa dibandingkan langsung dengan field ts."""
+    return int(tanggal.timestamp()) if tanggal is not None else None
+
+def epoch_pesanan(pesanan):
+    """Field ts pesanan; untuk catatan lama tanpa ts dihitung sekali dari waktu lalu disimpan."""
+    ts = pesanan.get("ts")
+    if ts is None:
+        ts = pesanan["ts"] = epoch(datetime.strptime(pesanan["waktu"], FORMAT_WAKTU))
+    return ts
+
+def potong_rentang(pesanan_list, start_date, end_date):
+    """
+    Pesanan dengan start_date <= waktu < end_date (None = tanpa batas), urut
+    waktu. Daftar diurutkan menurut ts (hampir selalu sudah urut) lalu
+    rentangnya dipotong dengan bisect, tanpa parsing string per pesanan.
+    """
+    urut = sorted(pesanan_list, key=epoch_pesanan)
+    ts = [pesanan["ts"] for pesanan in urut]
+    awal = 0 if start_date is None else bisect_left(ts, epoch(start_date))
+    akhir = len(urut) if end_date is None else bisect_left(ts, epoch(end_date))
+    return urut[awal:akhir]
+
+
+class OrderArchive:
+    """
+    Arsip pesanan terkonfirmasi, dipartisi per bulan.
+
+    Setiap partisi adalah file YYYY-MM.jsonl berisi satu pesanan per baris.
+    Pesanan dipindahkan ke sini saat dikonfirmasi sehingga antrean aktif
+    hanya berisi pesanan yang masih menunggu.
+
+    manifest.json mencatat waktu terkecil/terbesar dan jumlah pesanan per
+    partisi (juga dalam detik epoch: ts_min/ts_max), sehingga query rentang
+    tanggal hanya membuka partisi yang beririsan dengan rentang tersebut, dan
+    partisi yang seluruhnya berada di dalam rentang tidak perlu disaring.
+    Partisi lama tanpa field ts diisi ulang sekali saat manifest dimuat.
+
+    Di memori, arsip menyimpan indeks nama pembeli -> pesanan per partisi
+    yang sudah pernah dibaca; indeks diperbarui saat pesanan ditambahkan
+    dan dibangun ulang jika file partisi diubah proses lain.
+
+    tambah() idempoten terhadap id_pesanan: pesanan yang id-nya sudah ada di
+    partisinya dilewati, sehingga konfirmasi yang diulang setelah crash tidak
+    mengarsipkan pesanan yang sama dua kali.
+    """
+    def __init__(self, folder=ARSIP_DIR):
+        self.folder = folder
+        self.manifest_path = os.path.join(folder, "manifest.json")
+        self.lock = threading.RLock()
+        self._manifest = None
+        self._pelanggan = {}   # kunci partisi -> (signature file, {nama casefold: [pesanan, ...]})
+        self._id = {}          # kunci partisi -> (signature file, {id_pesanan, ...})
+
+    def sudah_ada(self):
+        return os.path.isdir(self.folder)
+
+    def init_file(self):
+        if not os.path.exists(self.folder):
+            os.makedirs(self.folder)
+
+    def partisi_path(self, kunci, folder=None):
+        return os.path.join(folder or self.folder, f"{kunci}.jsonl")
+
+    # ---------- manifest ----------
+    def manifest(self):
+        """{kunci: {"min": waktu, "max": waktu, "ts_min": ts, "ts_max": ts, "jumlah": n}}; dibangun ulang jika hilang."""
+        with self.lock:
+            if self._manifest is not None:
+                return self._manifest
+            if os.path.exists(self.manifest_path):
+                try:
+                    with open(self.manifest_path, 'r') as f:
+                        self._manifest = json.load(f)
+                    self._isi_ts()
+                    return self._manifest
+                except (json.JSONDecodeError, OSError):
+                    pass
+            self._manifest = {}
+            for kunci in self.daftar_partisi():
+                self._update_manifest(self._manifest, self.baca_partisi(kunci))
+            if self.sudah_ada():
+                self._simpan_manifest(self._manifest, self.folder)
+            return self._manifest
+
+    def _isi_ts(self):
+        """
+        Migrasi satu kali: tulis ulang partisi yang dibuat sebelum ada field ts
+        dengan ts terisi di setiap pesanan, lalu catat ts_min/ts_max di manifest.
+        """
+        lama = [kunci for kunci, info in self._manifest.items() if "ts_min" not in info]
+        if not lama:
+            return
+        for kunci in lama:
+            pesanan_list = self.baca_partisi(kunci)
+            path = self.partisi_path(kunci)
+            with open(path + ".tmp", 'w') as f:
+                for pesanan in pesanan_list:
+                    epoch_pesanan(pesanan)
+                    f.write(json.dumps(pesanan, separators=(',', ':')) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(path + ".tmp", path)
+            del self._manifest[kunci]
+            self._update_manifest(self._manifest, pesanan_list)
+        self._simpan_manifest(self._manifest, self.folder)
+
+    @staticmethod
+    def _update_manifest(manifest, pesanan_list):
+        for pesanan in pesanan_list:
+            kunci = kunci_partisi(pesanan)
+            waktu = pesanan["waktu"]
+            ts = epoch_pesanan(pesanan)
+            info = manifest.get(kunci)
+            if info is None:
+                manifest[kunci] = {"min": waktu, "max": waktu, "ts_min": ts, "ts_max": ts, "jumlah": 1}
+            else:
+                info["min"] = min(info["min"], waktu)
+                info["max"] = max(info["max"], waktu)
+                info["ts_min"] = min(info["ts_min"], ts)
+                info["ts_max"] = max(info["ts_max"], ts)
+                info["jumlah"] += 1
+
+    def _simpan_manifest(self, manifest, folder):
+        path = os.path.join(folder, "manifest.json")
+        with open(path + ".tmp", 'w') as f:
+            json.dump(manifest, f, indent=4, sort_keys=True)
+        os.replace(path + ".tmp", path)
+
+    def _tulis(self, pesanan_list, folder, manifest):
+        per_partisi = {}
+        for pesanan in pesanan_list:
+            epoch_pesanan(pesanan)
+            per_partisi.setdefault(kunci_partisi(pesanan), []).append(pesanan)
+        for kunci, daftar in per_partisi.items():
+            with open(self.partisi_path(kunci, folder), 'a') as f:
+                for pesanan in daftar:
+                    f.write(json.dumps(pesanan, separators=(',', ':')) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+        self._update_manifest(manifest, pesanan_list)
+        self._simpan_manifest(manifest, folder)
+
+    def tambah(self, *pesanan):
+        """
+        Tambahkan pesanan terkonfirmasi ke partisinya. Pesanan dengan id_pesanan
+        yang sudah terarsip dilewati. Mengembalikan pesanan yang benar-benar ditulis.
+        """
+        with self.lock:
+            self.init_file()
+            baru = []
+            dilihat = set()
+            for item in pesanan:
+                id_pesanan = item.get("id_pesanan")
+                if id_pesanan is not None:
+                    if id_pesanan in dilihat or id_pesanan in self._id_partisi(kunci_partisi(item)):
+                        continue
+                    dilihat.add(id_pesanan)
+                baru.append(item)
+            if not baru:
+                return baru
+            self._tulis(baru, self.folder, self.manifest())
+            for item in baru:
+                kunci = kunci_partisi(item)
+                if item.get("id_pesanan") is not None:
+                    self._id[kunci][1].add(item["id_pesanan"])
+                if kunci in self._pelanggan:
+                    _, indeks = self._pelanggan[kunci]
+                    indeks.setdefault(item["nama_pembeli"].casefold(), []).append(item)
+            for kunci in {kunci_partisi(item) for item in baru}:
+                signature = self._partisi_signature(kunci)
+                for cache in (self._pelanggan, self._id):
+                    if kunci in cache:
+                        cache[kunci] = (signature, cache[kunci][1])
+            return baru
+
+    def buat_awal(self, pesanan_list):
+        """Buat arsip baru sekaligus (dipakai saat migrasi), secara atomik."""
+        with self.lock:
+            tmp_folder = self.folder + ".tmp"
+            if os.path.exists(tmp_folder):
+                shutil.rmtree(tmp_folder)
+            os.makedirs(tmp_folder)
+            manifest = {}
+            self._tulis(pesanan_list, tmp_folder, manifest)
+            os.replace(tmp_folder, self.folder)
+            self._manifest = manifest
+            self._pelanggan = {}
+            self._id = {}
+
+    def daftar_partisi(self):
+        """Kunci partisi yang tersedia, urut dari yang terlama."""
+        if not self.sudah_ada():
+            return []
+        return sorted(nama[:-len(".jsonl")] for nama in os.listdir(self.folder) if nama.endswith(".jsonl"))
+
+    def baca_partisi(self, kunci):
+        path = self.partisi_path(kunci)
+        if not os.path.exists(path):
+            return []
+        with open(path, 'r') as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def _partisi_signature(self, kunci):
+        try:
+            st = os.stat(self.partisi_path(kunci))
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def _id_partisi(self, kunci):
+        """Himpunan id_pesanan di partisi kunci, di-cache sampai file partisi berubah."""
+        signature = self._partisi_signature(kunci)
+        cache = self._id.get(kunci)
+        if cache is None or cache[0] != signature:
+            ids = {pesanan.get("id_pesanan") for pesanan in self.baca_partisi(kunci)}
+            ids.discard(None)
+            cache = self._id[kunci] = (signature, ids)
+        return cache[1]
+
+    def pesanan_pelanggan(self, kunci, nama_pembeli):
+        """Pesanan terarsip milik satu pelanggan di partisi kunci (nama tidak peka huruf besar/kecil)."""
+        with self.lock:
+            signature = self._partisi_signature(kunci)
+            cache = self._pelanggan.get(kunci)
+            if cache is None or cache[0] != signature:
+                indeks = {}
+                for pesanan in self.baca_partisi(kunci):
+                    indeks.setdefault(pesanan["nama_pembeli"].casefold(), []).append(pesanan)
+                cache = self._pelanggan[kunci] = (signature, indeks)
+            return list(cache[1].get(nama_pembeli.casefold(), []))
+
+    def riwayat_pelanggan(self, nama_pembeli):
+        """Seluruh pesanan terarsip milik satu pelanggan dari setiap partisi di manifest, urut terlama."""
+        with self.lock:
+            hasil = []
+            for kunci in sorted(self.manifest()):
+                hasil += self.pesanan_pelanggan(kunci, nama_pembeli)
+            return hasil
+
+    def semua(self):
+        """Seluruh pesanan terarsip, partisi demi partisi."""
+        return list(self.baca_rentang(None, None))
+
+    def partisi_dalam_rentang(self, start_date, end_date):
+        """
+        Kunci partisi yang mungkin berisi pesanan dengan start_date <= waktu < end_date,
+        berdasarkan ts_min/ts_max di manifest (partition pruning).
+        """
+        return [kunci for kunci, _ in self._partisi_rentang(epoch(start_date), epoch(end_date))]
+
+    def _partisi_rentang(self, start, end):
+        """(kunci, seluruhnya_di_dalam_rentang) untuk partisi yang beririsan dengan [start, end)."""
+        hasil = []
+        for kunci, info in sorted(self.manifest().items()):
+            if start is not None and info["ts_max"] < start:
+                continue
+            if end is not None and info["ts_min"] >= end:
+                continue
+            penuh = (start is None or info["ts_min"] >= start) and (end is None or info["ts_max"] < end)
+            hasil.append((kunci, penuh))
+        return hasil
+
+    def baca_rentang(self, start_date, end_date):
+        """
+        Stream pesanan dengan start_date <= waktu < end_date, satu partisi
+        sekaligus. Partisi yang seluruhnya di dalam rentang dikirim utuh;
+        hanya partisi di tepi rentang yang dipotong (bisect atas ts).
+        """
+        for kunci, penuh in self._partisi_rentang(epoch(start_date), epoch(end_date)):
+            if penuh:
+                yield from self.baca_partisi(kunci)
+            else:
+                yield from potong_rentang(self.baca_partisi(kunci), start_date, end_date)
+
+
+# Global archive instance
+arsip = OrderArchive()
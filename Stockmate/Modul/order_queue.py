@@ -0,0 +1,559 @@
+import json
+import os
+import threading
+from collections import OrderedDict
+from itertools import islice
+
+from order_archive import arsip as arsip_pesanan, epoch_pesanan
+from sales_rollup import rollup as rollup_penjualan
+
+# Folder dan File paths
+DATA_FOLDER = "Data"
+ANTREAN_PATH = os.path.join(DATA_FOLDER, "antrean.json")
+ANTREAN_DIR = os.path.join(DATA_FOLDER, "antrean")
+POINTER_PATH = os.path.join(ANTREAN_DIR, "pointer.json")
+
+SEGMENT_SIZE = 1000  # jumlah pesanan per segmen
+
+# Status per slot, disimpan satu byte per pesanan di file .status
+STATUS_PENDING = b"P"
+STATUS_CONFIRMED = b"C"
+STATUS_DIHAPUS = b"X"
+STATUS_TEKS = {STATUS_PENDING: "not confirmed", STATUS_CONFIRMED: "confirmed"}
+STATUS_BYTE = {v: k for k, v in STATUS_TEKS.items()}
+
+
+# -------------------- POHON FENWICK --------------------
+class PohonFenwick:
+    """Binary indexed tree: ubah satu titik dan jumlah prefix dalam O(log n). Indeks mulai 1."""
+    def __init__(self, ukuran=0, posisi=()):
+        # Bangun langsung dalam O(n): setiap node meneruskan nilainya ke induknya
+        self.pohon = [0] * (ukuran + 1)
+        for i in posisi:
+            self.pohon[i] += 1
+        for i in range(1, ukuran + 1):
+            j = i + (i & -i)
+            if j <= ukuran:
+                self.pohon[j] += self.pohon[i]
+
+    def __len__(self):
+        return len(self.pohon) - 1
+
+    def tambah(self, i, delta):
+        while i < len(self.pohon):
+            self.pohon[i] += delta
+            i += i & -i
+
+    def prefix(self, i):
+        """Jumlah nilai di indeks 1..i."""
+        total = 0
+        while i > 0:
+            total += self.pohon[i]
+            i -= i & -i
+        return total
+
+
+# -------------------- SEGMENTED ORDER QUEUE --------------------
+class SegmentedOrderQueue:
+    """
+    Antrean pesanan FIFO yang disimpan dalam segmen berukuran tetap.
+
+    Setiap segmen terdiri dari seg_NNNNNN.jsonl (satu pesanan per baris,
+    hanya ditambah di akhir) dan seg_NNNNNN.status (satu byte status per
+    pesanan, diubah di tempat). pointer.json menyimpan head (pesanan pending
+    tertua) dan tail (nomor urut berikutnya). Operasi antrean hanya membaca
+    segmen mulai dari segmen head; segmen lama tidak pernah dibaca ulang.
+
+    Pesanan yang dikonfirmasi dipindahkan ke arsip bulanan (dan dijumlahkan
+    ke rollup penjualan harian), dan segmen yang
+    seluruhnya berada di belakang head dihapus, sehingga ukuran antrean
+    sebanding dengan jumlah pesanan yang masih menunggu.
+
+    Di memori, antrean menyimpan FIFO seq pesanan pending (OrderedDict) dan
+    peta id_pesanan -> seq, sehingga pesanan pending tertua maupun pesanan
+    dengan id tertentu ditemukan dalam O(1) tanpa memindai byte status.
+    Indeks nama pembeli -> seq pending dan pohon Fenwick atas seq pending
+    memberi daftar pesanan satu pelanggan beserta posisi antreannya dalam
+    O(log n) per pesanan.
+    """
+    def __init__(self, folder=ANTREAN_DIR, legacy_path=ANTREAN_PATH, segment_size=SEGMENT_SIZE,
+                 arsip=arsip_pesanan, rollup=rollup_penjualan):
+        self.folder = folder
+        self.legacy_path = legacy_path
+        self.segment_size = segment_size
+        self.arsip = arsip
+        self.rollup = rollup
+        self.pointer_path = os.path.join(folder, "pointer.json")
+        self.lock = threading.RLock()
+        self.awal = 0   # segmen tertua yang masih ada di disk
+        self.head = 0
+        self.tail = 0
+        self.versi = 0
+        self._siap = False
+        self._segments = {}   # nomor segmen -> {"orders": [...], "status": bytearray}
+        self._signature = None
+        self._pending = OrderedDict()   # seq pending, urut FIFO -> id_pesanan
+        self._posisi = {}               # id_pesanan -> seq (hanya pesanan pending)
+        self._pelanggan = {}            # nama pembeli casefold -> {seq: None} pending
+        self._rank = PohonFenwick()     # 1 di indeks seq - _basis + 1 untuk setiap seq pending
+        self._basis = 0
+
+    # ---------- file helpers ----------
+    def _seg_paths(self, seg):
+        base = os.path.join(self.folder, f"seg_{seg:06d}")
+        return base + ".jsonl", base + ".status"
+
+    def _pointer_signature(self):
+        try:
+            st = os.stat(self.pointer_path)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def _write_pointer(self):
+        self.versi += 1
+        tmp_path = self.pointer_path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({"awal": self.awal, "head": self.head, "tail": self.tail, "versi": self.versi}, f)
+        os.replace(tmp_path, self.pointer_path)
+        self._signature = self._pointer_signature()
+
+    def _read_segment(self, seg):
+        """
+        Baca satu segmen. Baris pesanan tanpa byte status (crash di antara dua
+        tulisan append) dan baris yang terpotong dibuang; "ukuran" mencatat
+        panjang byte jsonl yang valid agar _append memotong sisanya sebelum menulis.
+        """
+        jsonl_path, status_path = self._seg_paths(seg)
+        status = bytearray()
+        if os.path.exists(status_path):
+            with open(status_path, 'rb') as f:
+                status = bytearray(f.read())
+        orders = []
+        ukuran = 0
+        if os.path.exists(jsonl_path):
+            with open(jsonl_path, 'rb') as f:
+                for line in f:
+                    if len(orders) == len(status) or not line.endswith(b"\n"):
+                        break
+                    try:
+                        orders.append(json.loads(line))
+                    except ValueError:
+                        break
+                    ukuran += len(line)
+        if len(orders) < len(status):
+            del status[len(orders):]
+        return {"orders": orders, "status": status, "ukuran": ukuran}
+
+    def _segment(self, seg):
+        if seg not in self._segments:
+            self._segments[seg] = self._read_segment(seg)
+        return self._segments[seg]
+
+    # ---------- open / refresh ----------
+    def init_file(self):
+        if self._siap:
+            return
+        if not os.path.exists(self.folder):
+            os.makedirs(self.folder)
+        if not os.path.exists(self.pointer_path):
+            self._migrasi_legacy()
+        self._siap = True
+        if not self.arsip.sudah_ada():
+            self._migrasi_ke_arsip()
+
+    def _migrasi_legacy(self):
+        """
+        Impor antrean.json lama satu kali, lalu ganti namanya agar tidak dipakai lagi.
+        pointer.json ditulis paling akhir, sehingga impor yang terhenti di tengah
+        diulang dari awal saat antrean dibuka lagi.
+        """
+        if not os.path.exists(self.legacy_path):
+            self._write_pointer()
+            return
+        # Buang segmen sisa impor sebelumnya yang tidak selesai
+        for nama in os.listdir(self.folder):
+            if nama.startswith("seg_"):
+                os.remove(os.path.join(self.folder, nama))
+        self._segments = {}
+        with open(self.legacy_path, 'r') as f:
+            content = f.read().strip()
+        daftar = []
+        for pesanan in (json.loads(content) if content else []):
+            status = pesanan.pop("status", "not confirmed")
+            epoch_pesanan(pesanan)   # isi field ts untuk catatan lama
+            daftar.append((pesanan, STATUS_BYTE.get(status, STATUS_PENDING)))
+        self._append_banyak(daftar)
+        self._advance_head()
+        self._write_pointer()
+        os.replace(self.legacy_path, self.legacy_path + ".migrated")
+
+    def _migrasi_ke_arsip(self):
+        """Pindahkan pesanan terkonfirmasi yang masih ada di segmen ke arsip, satu kali."""
+        self._signature = None
+        self._refresh()
+        terkonfirmasi = []
+        for seg in range(self.awal, self.tail // self.segment_size + 1):
+            segment = self._segment(seg)
+            for slot, status_byte in enumerate(segment["status"]):
+                if bytes([status_byte]) == STATUS_CONFIRMED:
+                    pesanan = dict(segment["orders"][slot])
+                    pesanan["status"] = "confirmed"
+                    terkonfirmasi.append(pesanan)
+        self.arsip.buat_awal(terkonfirmasi)
+        self.rollup.bangun_ulang()
+        self._advance_head()
+        self._write_pointer()
+
+    def _refresh(self):
+        """Muat ulang jendela aktif jika pointer.json diubah proses lain."""
+        self.init_file()
+        signature = self._pointer_signature()
+        if signature == self._signature:
+            return
+        with open(self.pointer_path, 'r') as f:
+            pointer = json.load(f)
+        self.awal = pointer.get("awal", 0)
+        self.head = pointer.get("head", 0)
+        self.tail = pointer.get("tail", 0)
+        self.versi = pointer.get("versi", 0)
+        self._segments = {}
+        # Pulihkan tail jika proses sebelumnya berhenti sebelum pointer ditulis
+        tail_seg = self.tail // self.segment_size
+        self.tail = tail_seg * self.segment_size + len(self._segment(tail_seg)["status"])
+        self._bangun_indeks_pending()
+        self._signature = signature
+
+    def _bangun_indeks_pending(self):
+        """Bangun ulang FIFO pending dan peta id dari jendela aktif (head..tail)."""
+        self._pending = OrderedDict()
+        self._posisi = {}
+        self._pelanggan = {}
+        self._rank = None
+        for seq in range(self.head, self.tail):
+            if self._status_byte(seq) == STATUS_PENDING:
+                self._indeks_tambah(seq)
+        self._bangun_rank()
+
+    def _bangun_rank(self):
+        """Bangun ulang pohon Fenwick mulai dari pesanan pending tertua, dengan ruang untuk tumbuh."""
+        self._basis = min(self._pending, default=self.tail)
+        ukuran = max(64, 2 * (self.tail - self._basis))
+        self._rank = PohonFenwick(ukuran, [seq - self._basis + 1 for seq in self._pending])
+
+    def _nama_pembeli(self, seq):
+        seg, slot = divmod(seq, self.segment_size)
+        return self._segment(seg)["orders"][slot].get("nama_pembeli", "").casefold()
+
+    def _indeks_tambah(self, seq):
+        seg, slot = divmod(seq, self.segment_size)
+        id_pesanan = self._segment(seg)["orders"][slot].get("id_pesanan")
+        self._pending[seq] = id_pesanan
+        if id_pesanan is not None:
+            self._posisi[id_pesanan] = seq
+        self._pelanggan.setdefault(self._nama_pembeli(seq), {})[seq] = None
+        if self._rank is None:
+            return
+        if seq < self._basis or seq - self._basis + 1 > len(self._rank):
+            self._bangun_rank()
+        else:
+            self._rank.tambah(seq - self._basis + 1, 1)
+
+    def _indeks_hapus(self, seq):
+        if seq not in self._pending:
+            return
+        id_pesanan = self._pending.pop(seq)
+        if id_pesanan is not None:
+            self._posisi.pop(id_pesanan, None)
+        nama = self._nama_pembeli(seq)
+        milik = self._pelanggan.get(nama)
+        if milik is not None:
+            milik.pop(seq, None)
+            if not milik:
+                del self._pelanggan[nama]
+        self._rank.tambah(seq - self._basis + 1, -1)
+
+    # ---------- operasi dasar ----------
+    def _append(self, pesanan, status_byte):
+        return self._append_banyak([(pesanan, status_byte)])[0]
+
+    def _append_banyak(self, daftar):
+        """
+        Tambahkan banyak (pesanan, status_byte) di akhir antrean: satu tulisan
+        dan satu fsync untuk jsonl dan untuk status per segmen. Mengembalikan seq-nya.
+        """
+        seqs = []
+        awal = 0
+        while awal < len(daftar):
+            seq = self.tail
+            seg, slot = divmod(seq, self.segment_size)
+            bagian = daftar[awal:awal + self.segment_size - slot]
+            awal += len(bagian)
+            segment = self._segment(seg)
+            jsonl_path, status_path = self._seg_paths(seg)
+            baris = [(json.dumps(pesanan, separators=(',', ':')) + "\n").encode() for pesanan, _ in bagian]
+            status = b"".join(status_byte for _, status_byte in bagian)
+            # Potong sisa append yang gagal agar baris ke-N tetap berpasangan dengan byte status ke-N
+            with open(jsonl_path, 'ab') as f:
+                if f.tell() != segment["ukuran"]:
+                    f.truncate(segment["ukuran"])
+                f.write(b"".join(baris))
+                f.flush()
+                os.fsync(f.fileno())
+            with open(status_path, 'ab') as f:
+                if f.tell() != len(segment["status"]):
+                    f.truncate(len(segment["status"]))
+                f.write(status)
+                f.flush()
+                os.fsync(f.fileno())
+            segment["status"] += status
+            for i, (pesanan, status_byte) in enumerate(bagian):
+                segment["orders"].append(pesanan)
+                segment["ukuran"] += len(baris[i])
+                self.tail = seq + i + 1
+                if status_byte == STATUS_PENDING:
+                    self._indeks_tambah(seq + i)
+                seqs.append(seq + i)
+        return seqs
+
+    def _status_byte(self, seq):
+        seg, slot = divmod(seq, self.segment_size)
+        return bytes(self._segment(seg)["status"][slot:slot + 1])
+
+    def _advance_head(self):
+        # Head = pesanan pending tertua, langsung dari FIFO pending
+        self.head = next(iter(self._pending), self.tail)
+        head_seg = self.head // self.segment_size
+        for seg in [s for s in self._segments if s < head_seg]:
+            del self._segments[seg]
+        # Segmen di belakang head hanya berisi pesanan terarsip/dihapus
+        if self.arsip.sudah_ada():
+            for seg in range(self.awal, head_seg):
+                for path in self._seg_paths(seg):
+                    if os.path.exists(path):
+                        os.remove(path)
+            self.awal = max(self.awal, head_seg)
+
+    def _with_status(self, seq):
+        seg, slot = divmod(seq, self.segment_size)
+        segment = self._segment(seg)
+        pesanan = dict(segment["orders"][slot])
+        pesanan["status"] = STATUS_TEKS[bytes(segment["status"][slot:slot + 1])]
+        return pesanan
+
+    # ---------- API antrean ----------
+    def enqueue(self, pesanan):
+        """Tambahkan pesanan baru (status not confirmed) di akhir antrean."""
+        with self.lock:
+            self._refresh()
+            pesanan = {k: v for k, v in pesanan.items() if k != "status"}
+            epoch_pesanan(pesanan)
+            seq = self._append(pesanan, STATUS_PENDING)
+            self._write_pointer()
+            return seq
+
+    def _tulis_status(self, seqs, status_byte):
+        """Tulis byte status untuk banyak seq: satu open/fsync per segmen, satu tulisan pointer."""
+        per_segmen = {}
+        for seq in seqs:
+            seg, slot = divmod(seq, self.segment_size)
+            per_segmen.setdefault(seg, []).append((seq, slot))
+        for seg, daftar in per_segmen.items():
+            segment = self._segment(seg)
+            _, status_path = self._seg_paths(seg)
+            with open(status_path, 'r+b') as f:
+                for seq, slot in daftar:
+                    f.seek(slot)
+                    f.write(status_byte)
+                f.flush()
+                os.fsync(f.fileno())
+            for seq, slot in daftar:
+                segment["status"][slot:slot + 1] = status_byte
+                if status_byte == STATUS_PENDING:
+                    self._indeks_tambah(seq)
+                else:
+                    self._indeks_hapus(seq)
+        self._advance_head()
+        self._write_pointer()
+
+    def set_status(self, seq, status):
+        """Ubah status satu pesanan di tempat (satu byte di file .status)."""
+        status_byte = STATUS_BYTE.get(status, status)
+        with self.lock:
+            self._refresh()
+            seg, slot = divmod(seq, self.segment_size)
+            if slot >= len(self._segment(seg)["status"]):
+                raise IndexError(f"Pesanan #{seq} tidak ada dalam antrean")
+            self._tulis_status([seq], status_byte)
+
+    def _arsipkan(self, terkonfirmasi):
+        """
+        Tulis pesanan ke arsip lalu ke rollup. Jika sebagian sudah terarsip,
+        konfirmasi sebelumnya terhenti setelah menulis arsip (sebelum byte status
+        ditulis); rollup mungkin sudah ikut menghitungnya, jadi rollup dibangun
+        ulang dari arsip agar tidak ada pesanan yang dihitung dua kali.
+        """
+        baru = self.arsip.tambah(*terkonfirmasi)
+        if len(baru) == len(terkonfirmasi):
+            self.rollup.tambah(*baru)
+        else:
+            self.rollup.bangun_ulang()
+
+    def konfirmasi(self, seq):
+        """Pindahkan pesanan ke arsip lalu tandai sebagai terkonfirmasi."""
+        with self.lock:
+            self._refresh()
+            if self._status_byte(seq) != STATUS_PENDING:
+                raise IndexError(f"Pesanan #{seq} tidak sedang menunggu konfirmasi")
+            pesanan = self._with_status(seq)
+            pesanan["status"] = "confirmed"
+            self._arsipkan([pesanan])
+            self.set_status(seq, STATUS_CONFIRMED)
+            return pesanan
+
+    def konfirmasi_id(self, id_pesanan):
+        """Konfirmasi pesanan pending berdasarkan id_pesanan; None jika tidak ditemukan."""
+        with self.lock:
+            seq = self.cari_id(id_pesanan)
+            if seq is None:
+                return None
+            return self.konfirmasi(seq)
+
+    def konfirmasi_banyak(self, seqs):
+        """
+        Konfirmasi beberapa pesanan pending sekaligus: satu tulisan arsip,
+        satu tulisan status per segmen, dan satu tulisan pointer.
+        Seq yang tidak lagi pending dilewati. Mengembalikan pesanan terkonfirmasi.
+        """
+        with self.lock:
+            self._refresh()
+            seqs = [seq for seq in dict.fromkeys(seqs) if seq in self._pending]
+            if not seqs:
+                return []
+            terkonfirmasi = []
+            for seq in seqs:
+                pesanan = self._with_status(seq)
+                pesanan["status"] = "confirmed"
+                terkonfirmasi.append(pesanan)
+            self._arsipkan(terkonfirmasi)
+            self._tulis_status(seqs, STATUS_CONFIRMED)
+            return terkonfirmasi
+
+    def hapus(self, seq):
+        """Tandai pesanan sebagai dihapus (misalnya kedaluwarsa)."""
+        self.set_status(seq, STATUS_DIHAPUS)
+
+    def hapus_banyak(self, seqs):
+        """Tandai beberapa pesanan pending sebagai dihapus dengan satu tulisan per segmen."""
+        with self.lock:
+            self._refresh()
+            seqs = [seq for seq in dict.fromkeys(seqs) if seq in self._pending]
+            if seqs:
+                self._tulis_status(seqs, STATUS_DIHAPUS)
+            return seqs
+
+    def lihat(self, seq):
+        """Pesanan dengan seq tertentu beserta statusnya."""
+        with self.lock:
+            self._refresh()
+            return self._with_status(seq)
+
+    def cari_id(self, id_pesanan):
+        """Seq pesanan pending dengan id_pesanan tertentu, atau None."""
+        with self.lock:
+            self._refresh()
+            return self._posisi.get(id_pesanan)
+
+    def pending(self):
+        """Daftar (seq, pesanan) yang belum dikonfirmasi, urut FIFO."""
+        with self.lock:
+            self._refresh()
+            return [(seq, self._with_status(seq)) for seq in self._pending]
+
+    def pending_tertua(self, jumlah):
+        """Seq dari `jumlah` pesanan pending tertua."""
+        with self.lock:
+            self._refresh()
+            return list(islice(self._pending, jumlah))
+
+    def _ts(self, seq):
+        seg, slot = divmod(seq, self.segment_size)
+        return epoch_pesanan(self._segment(seg)["orders"][slot])
+
+    def pending_sebelum(self, ts):
+        """
+        Seq pesanan pending dengan ts < ts (detik epoch).
+        Pesanan ditambahkan urut waktu, jadi iterasi berhenti di pesanan
+        pertama yang tidak lebih lama dari batas.
+        """
+        with self.lock:
+            self._refresh()
+            hasil = []
+            for seq in self._pending:
+                if self._ts(seq) >= ts:
+                    break
+                hasil.append(seq)
+            return hasil
+
+    def pending_pelanggan(self, nama_pembeli):
+        """Seq pesanan pending milik satu pelanggan (nama tidak peka huruf besar/kecil), urut FIFO."""
+        with self.lock:
+            self._refresh()
+            return sorted(self._pelanggan.get(nama_pembeli.casefold(), ()))
+
+    def posisi(self, seq):
+        """Posisi pesanan pending dalam antrean (mulai 1), atau None jika tidak pending."""
+        with self.lock:
+            self._refresh()
+            if seq not in self._pending:
+                return None
+            return self._rank.prefix(seq - self._basis + 1)
+
+    def peek_pending(self):
+        """Pesanan pending tertua sebagai (seq, pesanan), atau None."""
+        with self.lock:
+            self._refresh()
+            seq = next(iter(self._pending), None)
+            if seq is None:
+                return None
+            return seq, self._with_status(seq)
+
+    def ts_pending_tertua(self):
+        """ts (detik epoch) pesanan pending tertua, atau None jika tidak ada yang menunggu."""
+        with self.lock:
+            self._refresh()
+            seq = next(iter(self._pending), None)
+            return None if seq is None else self._ts(seq)
+
+    def versi_terkini(self):
+        """Versi antrean (naik setiap kali antrean atau statusnya ditulis), termasuk tulisan proses lain."""
+        with self.lock:
+            self._refresh()
+            return self.versi
+
+    def jumlah_pending(self):
+        with self.lock:
+            self._refresh()
+            return len(self._pending)
+
+    def semua(self):
+        """
+        Isi antrean aktif sebagai (seq, pesanan), termasuk pesanan terkonfirmasi
+        yang segmennya belum dibuang. Riwayat lengkap ada di arsip.
+        """
+        with self.lock:
+            self._refresh()
+            hasil = []
+            for seg in range(self.awal, self.tail // self.segment_size + 1):
+                segment = self._segments.get(seg) or self._read_segment(seg)
+                for slot, status_byte in enumerate(segment["status"]):
+                    status_byte = bytes([status_byte])
+                    if status_byte in STATUS_TEKS:
+                        pesanan = dict(segment["orders"][slot])
+                        pesanan["status"] = STATUS_TEKS[status_byte]
+                        hasil.append((seg * self.segment_size + slot, pesanan))
+            return hasil
+
+
+# Global queue instance
+antrean = SegmentedOrderQueue()
@@ -0,0 +1,386 @@
+import heapq
+from collections import Counter
+
+LOKASI = ("gudang", "toko")
+
+AKHIR = "\0"                 # penanda di node trie: himpunan produk yang token-nya berakhir di node ini
+BATAS_KANDIDAT_PREFIX = 200  # jumlah kandidat prefix yang diperingkat per query
+AMBANG_FUZZY = 0.25          # kemiripan trigram minimum untuk hasil fuzzy
+
+
+def kunci_nama(nama):
+    """Kunci pencarian nama produk yang tidak peka huruf besar/kecil."""
+    return nama.casefold()
+
+def trigram(teks):
+    """Himpunan trigram dari teks (casefold, diberi spasi pembatas)."""
+    teks = f"  {kunci_nama(teks)} "
+    return {teks[i:i + 3] for i in range(len(teks) - 2)}
+
+
+# -------------------- INDEKS NAMA --------------------
+class IndeksNama:
+    """
+    Indeks casefold(nama) -> nama asli per lokasi.
+
+    Menggantikan pemindaian seluruh key gudang/toko di dapatkan_nama_asli dan
+    cari_nama_produk dengan lookup dict O(1). Semua nama dengan kunci yang
+    sama juga dicatat (urut saat ditambahkan), sehingga menghapus produk
+    tetap O(1) tanpa memindai lokasi untuk mencari penggantinya.
+    """
+    def __init__(self):
+        self.nama = {lokasi: {} for lokasi in LOKASI}
+        self.varian = {lokasi: {} for lokasi in LOKASI}   # kunci -> {nama: None}
+
+    def bangun(self, data):
+        self.nama = {lokasi: {} for lokasi in LOKASI}
+        self.varian = {lokasi: {} for lokasi in LOKASI}
+        for lokasi in LOKASI:
+            indeks = self.nama[lokasi]
+            varian = self.varian[lokasi]
+            for nama in data.get(lokasi, {}):
+                kunci = kunci_nama(nama)
+                indeks.setdefault(kunci, nama)
+                varian.setdefault(kunci, {})[nama] = None
+
+    def perbarui(self, data, lokasi, nama, info_lama, info_baru):
+        indeks = self.nama.setdefault(lokasi, {})
+        varian = self.varian.setdefault(lokasi, {})
+        kunci = kunci_nama(nama)
+        if info_baru is not None:
+            indeks.setdefault(kunci, nama)
+            varian.setdefault(kunci, {})[nama] = None
+            return
+        sama = varian.get(kunci)
+        if sama is None:
+            return
+        sama.pop(nama, None)
+        if not sama:
+            del varian[kunci]
+            indeks.pop(kunci, None)
+        elif indeks.get(kunci) == nama:
+            # Produk dihapus; pakai nama lain dengan kunci sama yang masih ada
+            indeks[kunci] = next(iter(sama))
+
+    def cari(self, lokasi, nama):
+        return self.nama.get(lokasi, {}).get(kunci_nama(nama))
+
+
+# -------------------- INDEKS PENCARIAN --------------------
+class IndeksPencarian:
+    """
+    Indeks pencarian typeahead per lokasi.
+
+    Trie menyimpan token casefold (setiap kata pada nama, dan kategori) dengan
+    himpunan produk di node akhir token, sehingga pencarian awalan hanya
+    menelusuri cabang yang cocok. Indeks trigram atas token yang sama dipakai
+    sebagai cadangan fuzzy untuk salah ketik. Nama yang sama persis dijawab
+    oleh IndeksNama.
+    """
+    def __init__(self, indeks_nama):
+        self.indeks_nama = indeks_nama
+        self._kosongkan()
+
+    def _kosongkan(self):
+        self.trie = {lokasi: {} for lokasi in LOKASI}
+        self.gram = {lokasi: {} for lokasi in LOKASI}          # trigram -> {token}
+        self.jumlah_gram = {lokasi: {} for lokasi in LOKASI}   # token -> jumlah trigram
+
+    @staticmethod
+    def _token(nama, info):
+        token = {kunci_nama(kata) for kata in nama.split()}
+        if info.get("kategori"):
+            token.add(kunci_nama(info["kategori"]))
+        return token
+
+    def _tambah(self, lokasi, nama, info):
+        trie = self.trie.setdefault(lokasi, {})
+        for token in self._token(nama, info):
+            node = trie
+            for huruf in token:
+                node = node.setdefault(huruf, {})
+            produk = node.setdefault(AKHIR, set())
+            if not produk:
+                self._tambah_gram(lokasi, token)
+            produk.add(nama)
+
+    def _tambah_gram(self, lokasi, token):
+        gram = trigram(token)
+        indeks_gram = self.gram.setdefault(lokasi, {})
+        for g in gram:
+            indeks_gram.setdefault(g, set()).add(token)
+        self.jumlah_gram.setdefault(lokasi, {})[token] = len(gram)
+
+    def _hapus_gram(self, lokasi, token):
+        indeks_gram = self.gram.get(lokasi, {})
+        for g in trigram(token):
+            postings = indeks_gram.get(g)
+            if postings is not None:
+                postings.discard(token)
+                if not postings:
+                    del indeks_gram[g]
+        self.jumlah_gram.get(lokasi, {}).pop(token, None)
+
+    def _hapus(self, lokasi, nama, info):
+        trie = self.trie.get(lokasi, {})
+        for token in self._token(nama, info):
+            jalur = [trie]
+            for huruf in token:
+                node = jalur[-1].get(huruf)
+                if node is None:
+                    break
+                jalur.append(node)
+            else:
+                produk = jalur[-1].get(AKHIR)
+                if produk is None:
+                    continue
+                produk.discard(nama)
+                if produk:
+                    continue
+                # Token tidak dipakai produk lain: buang dari trie dan indeks trigram
+                del jalur[-1][AKHIR]
+                self._hapus_gram(lokasi, token)
+                for i in range(len(token), 0, -1):
+                    if jalur[i]:
+                        break
+                    del jalur[i - 1][token[i - 1]]
+
+    def bangun(self, data):
+        self._kosongkan()
+        for lokasi in LOKASI:
+            for nama, info in data.get(lokasi, {}).items():
+                self._tambah(lokasi, nama, info)
+
+    def perbarui(self, data, lokasi, nama, info_lama, info_baru):
+        if info_lama is not None and info_baru is not None \
+                and info_lama.get("kategori") == info_baru.get("kategori"):
+            return  # hanya stok/harga yang berubah; token tetap sama
+        if info_lama is not None:
+            self._hapus(lokasi, nama, info_lama)
+        if info_baru is not None:
+            self._tambah(lokasi, nama, info_baru)
+
+    def _produk_token(self, lokasi, token):
+        node = self.trie.get(lokasi, {})
+        for huruf in token:
+            node = node.get(huruf)
+            if node is None:
+                return set()
+        return node.get(AKHIR, set())
+
+    def _cari_prefix(self, lokasi, awalan):
+        """Produk yang punya token berawalan awalan, maksimal BATAS_KANDIDAT_PREFIX."""
+        node = self.trie.get(lokasi, {})
+        for huruf in awalan:
+            node = node.get(huruf)
+            if node is None:
+                return set()
+        # Telusuri per tingkat agar token terpendek (paling mirip) ditemukan dulu
+        hasil = set()
+        tingkat = [node]
+        while tingkat:
+            berikut = []
+            for n in tingkat:
+                for huruf, anak in n.items():
+                    if huruf != AKHIR:
+                        berikut.append(anak)
+                        continue
+                    for nama in anak:
+                        hasil.add(nama)
+                        if len(hasil) >= BATAS_KANDIDAT_PREFIX:
+                            return hasil
+            tingkat = berikut
+        return hasil
+
+    def _cari_fuzzy(self, lokasi, kata):
+        """Token yang mirip dengan kata menurut kemiripan Jaccard trigram."""
+        gram_query = trigram(kata)
+        indeks_gram = self.gram.get(lokasi, {})
+        jumlah_gram = self.jumlah_gram.get(lokasi, {})
+        sama = Counter()
+        for g in gram_query:
+            sama.update(indeks_gram.get(g, ()))
+        skor = {}
+        for token, n in sama.items():
+            kemiripan = n / (len(gram_query) + jumlah_gram[token] - n)
+            if kemiripan >= AMBANG_FUZZY:
+                skor[token] = kemiripan
+        return skor
+
+    def cari(self, lokasi, teks, batas=10):
+        """
+        Nama produk yang cocok dengan teks, urut dari yang paling relevan:
+        nama sama persis, awalan nama, setiap kata teks menjadi awalan kata
+        nama/kategori, lalu kemiripan trigram (salah ketik).
+        """
+        kunci = kunci_nama(" ".join(teks.split()))
+        if not kunci:
+            return []
+        kata_query = kunci.split()
+        # Kata terpanjang paling selektif; kata lain dicek pada kandidatnya
+        utama = max(kata_query, key=len)
+        peringkat = {}
+        persis = self.indeks_nama.cari(lokasi, kunci)
+        if persis is not None:
+            peringkat[persis] = (0, 0.0)
+        for nama in self._cari_prefix(lokasi, utama):
+            nama_cf = kunci_nama(nama)
+            if nama_cf == kunci:
+                peringkat[nama] = (0, 0.0)
+            elif nama_cf.startswith(kunci):
+                peringkat[nama] = (1, 0.0)
+            else:
+                token = nama_cf.split()
+                if all(any(t.startswith(k) for t in token) for k in kata_query if k != utama):
+                    peringkat[nama] = (2, 0.0)
+        if len(peringkat) < batas and len(utama) >= 2:
+            kemiripan_token = sorted(self._cari_fuzzy(lokasi, utama).items(), key=lambda x: -x[1])
+            for token, kemiripan in kemiripan_token:
+                for nama in self._produk_token(lokasi, token):
+                    if len(peringkat) >= BATAS_KANDIDAT_PREFIX:
+                        break
+                    peringkat.setdefault(nama, (3, -kemiripan))
+        urut = sorted(peringkat, key=lambda nama: (peringkat[nama], len(nama), kunci_nama(nama)))
+        return urut[:batas]
+
+
+# -------------------- INDEKS KATEGORI --------------------
+class IndeksKategori:
+    """
+    Indeks kategori -> {nama} per lokasi, beserta total stok dan nilai
+    persediaan (stok x harga modal / harga jual) per kategori. Produk tanpa
+    kategori dikelompokkan di bawah None.
+    """
+    def __init__(self):
+        self._kosongkan()
+
+    def _kosongkan(self):
+        self.produk = {lokasi: {} for lokasi in LOKASI}
+        self.total = {lokasi: {} for lokasi in LOKASI}
+
+    def _ubah(self, lokasi, nama, info, arah):
+        kategori = info.get("kategori")
+        produk = self.produk.setdefault(lokasi, {}).setdefault(kategori, set())
+        total = self.total.setdefault(lokasi, {}).setdefault(
+            kategori, {"stok": 0, "nilai_modal": 0, "nilai_jual": 0})
+        if arah > 0:
+            produk.add(nama)
+        else:
+            produk.discard(nama)
+        stok = info.get("stok", 0)
+        total["stok"] += arah * stok
+        total["nilai_modal"] += arah * stok * info.get("harga_modal", 0)
+        total["nilai_jual"] += arah * stok * info.get("harga_jual", 0)
+        if not produk:
+            del self.produk[lokasi][kategori]
+            del self.total[lokasi][kategori]
+
+    def bangun(self, data):
+        self._kosongkan()
+        for lokasi in LOKASI:
+            for nama, info in data.get(lokasi, {}).items():
+                self._ubah(lokasi, nama, info, 1)
+
+    def perbarui(self, data, lokasi, nama, info_lama, info_baru):
+        if info_lama is not None:
+            self._ubah(lokasi, nama, info_lama, -1)
+        if info_baru is not None:
+            self._ubah(lokasi, nama, info_baru, 1)
+
+    def cari(self, lokasi, kategori):
+        return self.produk.get(lokasi, {}).get(kategori, set())
+
+    def daftar(self, lokasi):
+        """Kategori yang dipakai minimal satu produk di lokasi."""
+        return sorted(k for k in self.produk.get(lokasi, {}) if k is not None)
+
+    def ringkasan(self, lokasi):
+        """{kategori: {"jumlah_produk", "stok", "nilai_modal", "nilai_jual"}}"""
+        return {
+            kategori: dict(total, jumlah_produk=len(self.produk[lokasi][kategori]))
+            for kategori, total in self.total.get(lokasi, {}).items()
+        }
+
+
+# -------------------- INDEKS KADALUARSA --------------------
+class IndeksKadaluarsa:
+    """
+    Min-heap (tanggal_kadaluarsa, nama) per lokasi.
+
+    Entri lama tidak dicari di dalam heap: perubahan tanggal atau penghapusan
+    produk cukup memperbarui peta tanggal, dan entri yang tidak lagi cocok
+    dibuang saat muncul di puncak heap. Heap dibangun ulang jika entri usang
+    sudah terlalu banyak.
+    """
+    def __init__(self):
+        self._kosongkan()
+
+    def _kosongkan(self):
+        self.heap = {lokasi: [] for lokasi in LOKASI}
+        self.tanggal = {lokasi: {} for lokasi in LOKASI}   # nama -> tanggal_kadaluarsa saat ini
+
+    def bangun(self, data):
+        self._kosongkan()
+        for lokasi in LOKASI:
+            tanggal = self.tanggal[lokasi]
+            for nama, info in data.get(lokasi, {}).items():
+                if info.get("tanggal_kadaluarsa"):
+                    tanggal[nama] = info["tanggal_kadaluarsa"]
+            self.heap[lokasi] = [(tgl, nama) for nama, tgl in tanggal.items()]
+            heapq.heapify(self.heap[lokasi])
+
+    def perbarui(self, data, lokasi, nama, info_lama, info_baru):
+        tanggal = self.tanggal.setdefault(lokasi, {})
+        tgl_baru = info_baru.get("tanggal_kadaluarsa") if info_baru is not None else None
+        if tanggal.get(nama) == tgl_baru:
+            return
+        if tgl_baru:
+            tanggal[nama] = tgl_baru
+            heapq.heappush(self.heap.setdefault(lokasi, []), (tgl_baru, nama))
+        else:
+            tanggal.pop(nama, None)
+        heap = self.heap.setdefault(lokasi, [])
+        if len(heap) > 2 * len(tanggal) + 64:
+            self.heap[lokasi] = [(tgl, n) for n, tgl in tanggal.items()]
+            heapq.heapify(self.heap[lokasi])
+
+    def kadaluarsa(self, lokasi, hari_ini):
+        """
+        Nama produk dengan tanggal_kadaluarsa <= hari_ini, dalam O(k log n).
+        Produk tetap ada di heap sampai benar-benar dihapus dari inventaris.
+        """
+        heap = self.heap.get(lokasi, [])
+        tanggal = self.tanggal.get(lokasi, {})
+        valid = []
+        while heap and heap[0][0] <= hari_ini:
+            tgl, nama = heapq.heappop(heap)
+            if tanggal.get(nama) == tgl:
+                valid.append((tgl, nama))
+        for entri in valid:
+            heapq.heappush(heap, entri)
+        return [nama for _, nama in valid]
+
+
+# -------------------- KUMPULAN INDEKS --------------------
+class IndeksProduk:
+    """
+    Kumpulan indeks sekunder di atas dokumen inventaris.
+
+    Dibangun sekali setiap dokumen dibaca dari disk, lalu diperbarui secara
+    inkremental untuk setiap produk yang disentuh mutasi.
+    """
+    def __init__(self):
+        self.nama = IndeksNama()
+        self.pencarian = IndeksPencarian(self.nama)
+        self.kategori = IndeksKategori()
+        self.kadaluarsa = IndeksKadaluarsa()
+        self.semua = [self.nama, self.pencarian, self.kategori, self.kadaluarsa]
+
+    def bangun(self, data):
+        for indeks in self.semua:
+            indeks.bangun(data)
+
+    def perbarui(self, data, lokasi, nama, info_lama, info_baru):
+        """Beritahu setiap indeks bahwa produk berubah dari info_lama menjadi info_baru (None = tidak ada)."""
+        for indeks in self.semua:
+            indeks.perbarui(data, lokasi, nama, info_lama, info_baru)
@@ -0,0 +1,28 @@
+from tabulate import tabulate
+
+from inventory_store import store as inventory_store
+
+
+# -------------------- PILIH DARI SARAN --------------------
+def pilih_dari_saran(lokasi, teks, store=inventory_store):
+    """
+    Tampilkan produk yang mirip dengan teks (awalan atau salah ketik) dan
+    minta pengguna memilih salah satu. Mengembalikan nama asli atau None.
+    """
+    saran = store.cari_produk(lokasi, teks)
+    if not saran:
+        return None
+    # Hanya produk yang disarankan yang dibaca, di bawah lock store karena
+    # penyapu latar bisa menghapus produk dari thread lain
+    with store.lock:
+        koleksi = store.load().get(lokasi, {})
+        baris = [(nama, koleksi[nama].get('kategori', '-'), koleksi[nama].get('stok', 0))
+                 for nama in saran if nama in koleksi]
+    saran = [nama for nama, _, _ in baris]
+    tabel = [[i + 1, nama, kategori, stok] for i, (nama, kategori, stok) in enumerate(baris)]
+    print(f"\nProduk '{teks}' tidak ditemukan persis. Mungkin maksud Anda:")
+    print(tabulate(tabel, headers=["No", "Nama", "Kategori", "Stok"], tablefmt="grid"))
+    pilihan = input("Pilih nomor untuk melihat detail (Enter untuk batal): ").strip()
+    if pilihan.isdigit() and 1 <= int(pilihan) <= len(saran):
+        return saran[int(pilihan) - 1]
+    return None
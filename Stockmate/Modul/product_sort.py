@@ -0,0 +1,239 @@
+import threading
+from bisect import bisect_left, bisect_right
+from tabulate import tabulate
+
+from inventory_store import store as inventory_store
+
+# Tanggal pengganti untuk produk tanpa kadaluarsa agar selalu di akhir urutan
+TANPA_KADALUARSA = "9999-12-31"
+
+UKURAN_HALAMAN = 20  # jumlah baris per halaman katalog
+
+
+# -------------------- KRITERIA URUT --------------------
+def _harga_diskon(info):
+    return info.get("harga_jual", 0) * (1 - info.get("diskon", 0) / 100)
+
+KRITERIA_URUT = {
+    "nama": ("Nama", lambda info: 0),
+    "stok": ("Stok", lambda info: info.get("stok", 0)),
+    "harga": ("Harga jual", lambda info: info.get("harga_jual", 0)),
+    "harga_diskon": ("Harga setelah diskon", _harga_diskon),
+    "kadaluarsa": ("Tanggal kadaluarsa", lambda info: info.get("tanggal_kadaluarsa") or TANPA_KADALUARSA),
+    "kategori": ("Kategori", lambda info: (info.get("kategori") or "").casefold()),
+}
+
+
+def kunci_urut(nama, info, kriteria="nama"):
+    """Kunci urut lengkap (nilai kriteria, nama casefold, nama); unik per produk."""
+    return (KRITERIA_URUT[kriteria][1](info), nama.casefold(), nama)
+
+def urutkan_items(items, kriteria="nama", ascending=True):
+    """
+    Urutkan list (nama, info) dengan Timsort. Kunci dihitung sekali per
+    produk (nama di-casefold sekali), nama menjadi pemecah seri.
+    """
+    dekorasi = [(kunci_urut(nama, info, kriteria), i) for i, (nama, info) in enumerate(items)]
+    dekorasi.sort(reverse=not ascending)
+    return [items[i] for _, i in dekorasi]
+
+
+# -------------------- PENGURUT PRODUK --------------------
+class PengurutProduk:
+    """
+    Urutan produk per (lokasi, kriteria), di-cache sampai versi inventaris
+    berubah. Urutan descending adalah kebalikan urutan ascending, dan filter
+    (kategori, stok) diterapkan di atas urutan yang sudah jadi sehingga tidak
+    memicu pengurutan ulang.
+
+    Dengan kategori, urutan dibangun hanya dari produk kategori tersebut
+    (lewat indeks kategori di store), bukan dengan menyaring seluruh katalog.
+
+    Halaman katalog memakai cursor keyset: kunci urut produk terakhir di
+    halaman sebelumnya. Awal halaman berikutnya dicari dengan bisect, sehingga
+    biaya berpindah halaman sama untuk halaman 1 maupun halaman 5000.
+    """
+    def __init__(self, store=inventory_store):
+        self.store = store
+        self.lock = threading.Lock()
+        self._cache = {}   # (lokasi, kriteria, kategori) -> (versi, [kunci_urut, ...])
+        self.hits = 0
+        self.misses = 0
+
+    def urutan_kunci(self, lokasi, kriteria="nama", kategori=None):
+        """Daftar kunci_urut produk di lokasi (opsional satu kategori), urut ascending."""
+        self.store.load()
+        with self.lock:
+            cache = self._cache.get((lokasi, kriteria, kategori))
+            if cache is not None and cache[0] == self.store.version:
+                self.hits += 1
+                return cache[1]
+        # Salinan dan versinya diambil bersamaan di bawah lock store, karena
+        # penyapu latar bisa menghapus produk dari thread lain
+        with self.store.lock:
+            koleksi = self.store.salinan(lokasi)
+            versi = self.store.version
+            nama_list = koleksi if kategori is None else self.store.produk_per_kategori(lokasi, kategori)
+        urutan = sorted(kunci_urut(nama, koleksi[nama], kriteria) for nama in nama_list if nama in koleksi)
+        with self.lock:
+            self.misses += 1
+            self._cache[(lokasi, kriteria, kategori)] = (versi, urutan)
+        return urutan
+
+    def urutan_nama(self, lokasi, kriteria="nama", kategori=None):
+        """Daftar nama produk di lokasi, urut ascending menurut kriteria."""
+        return [kunci[2] for kunci in self.urutan_kunci(lokasi, kriteria, kategori)]
+
+    def urutkan(self, lokasi, kriteria="nama", ascending=True, saring=None, kategori=None):
+        """List (nama, info) terurut; saring(info) -> bool untuk menyaring produk."""
+        koleksi = self.store.load().get(lokasi, {})
+        urutan = self.urutan_kunci(lokasi, kriteria, kategori)
+        if not ascending:
+            urutan = reversed(urutan)
+        return [(kunci[2], koleksi[kunci[2]]) for kunci in urutan
+                if kunci[2] in koleksi and (saring is None or saring(koleksi[kunci[2]]))]
+
+    def _iter_dari(self, lokasi, kriteria, ascending, setelah, kategori=None):
+        """Iterasi kunci_urut mulai tepat setelah cursor (None = dari awal)."""
+        urutan = self.urutan_kunci(lokasi, kriteria, kategori)
+        if ascending:
+            awal = 0 if setelah is None else bisect_right(urutan, tuple(setelah))
+            return (urutan[i] for i in range(awal, len(urutan)))
+        akhir = len(urutan) if setelah is None else bisect_left(urutan, tuple(setelah))
+        return (urutan[i] for i in range(akhir - 1, -1, -1))
+
+    def halaman(self, lokasi, kriteria="nama", ascending=True, setelah=None,
+                ukuran=UKURAN_HALAMAN, saring=None, kategori=None):
+        """
+        Satu halaman (nama, info) setelah cursor, beserta cursor halaman
+        berikutnya (None jika halaman ini yang terakhir).
+        """
+        koleksi = self.store.load().get(lokasi, {})
+        baris = []
+        kunci_terakhir = None
+        for kunci in self._iter_dari(lokasi, kriteria, ascending, setelah, kategori):
+            info = koleksi.get(kunci[2])
+            if info is None or (saring is not None and not saring(info)):
+                continue
+            if len(baris) == ukuran:
+                return baris, kunci_terakhir
+            baris.append((kunci[2], info))
+            kunci_terakhir = kunci
+        return baris, None
+
+    def cursor_halaman(self, lokasi, nomor, kriteria="nama", ascending=True,
+                       ukuran=UKURAN_HALAMAN, saring=None, kategori=None):
+        """
+        Cursor untuk awal halaman ke-nomor (mulai 1). Tanpa saringan dihitung
+        langsung dari posisi; dengan saringan produk dilewati satu per satu.
+        """
+        lewati = (nomor - 1) * ukuran
+        if lewati <= 0:
+            return None
+        if saring is None:
+            urutan = self.urutan_kunci(lokasi, kriteria, kategori)
+            if lewati >= len(urutan):
+                return None
+            return urutan[lewati - 1] if ascending else urutan[len(urutan) - lewati]
+        koleksi = self.store.load().get(lokasi, {})
+        ditemukan = None
+        for kunci in self._iter_dari(lokasi, kriteria, ascending, None, kategori):
+            info = koleksi.get(kunci[2])
+            if info is not None and saring(info):
+                if ditemukan is not None:
+                    return ditemukan   # halaman tersebut memang berisi produk
+                lewati -= 1
+                if lewati == 0:
+                    ditemukan = kunci
+        return None
+
+    def jumlah(self, lokasi, saring=None, kategori=None):
+        """Jumlah produk di lokasi (opsional satu kategori) yang lolos saringan."""
+        with self.store.lock:
+            koleksi = self.store.salinan(lokasi)
+            nama_list = koleksi if kategori is None else self.store.produk_per_kategori(lokasi, kategori)
+        if saring is None:
+            return len(nama_list)
+        return sum(1 for nama in nama_list if nama in koleksi and saring(koleksi[nama]))
+
+    def invalidate(self):
+        with self.lock:
+            self._cache = {}
+
+
+# Global sorter instance
+pengurut = PengurutProduk()
+
+def urutkan_produk(lokasi, kriteria="nama", ascending=True, saring=None, kategori=None):
+    return pengurut.urutkan(lokasi, kriteria, ascending, saring, kategori)
+
+
+# -------------------- INPUT URUTAN --------------------
+def input_urutan():
+    """Tanyakan kriteria dan arah urutan; mengembalikan (kriteria, ascending)."""
+    print("Urutkan berdasarkan:")
+    pilihan = list(KRITERIA_URUT)
+    for i, kriteria in enumerate(pilihan):
+        print(f"{i+1}. {KRITERIA_URUT[kriteria][0]}")
+    nomor = input(f"Pilih (1-{len(pilihan)}, Enter = Nama): ").strip()
+    kriteria = pilihan[int(nomor) - 1] if nomor.isdigit() and 1 <= int(nomor) <= len(pilihan) else "nama"
+    urutan = input("Urutkan ascending (a) atau descending (d)? [a/d]: ").lower()
+    return kriteria, (urutan != "d")
+
+
+# -------------------- TAMPILAN BERHALAMAN --------------------
+def tampilkan_berhalaman(lokasi, judul, headers, format_baris, kriteria="nama", ascending=True,
+                         saring=None, kategori=None, ukuran=UKURAN_HALAMAN,
+                         pesan_kosong="Tidak ada produk yang ditemukan."):
+    """
+    Tampilkan katalog per halaman. Hanya baris di halaman aktif yang
+    diformat; navigasi: n (berikutnya), p (sebelumnya), j (lompat), q (keluar).
+    """
+    cursor = {1: None}   # nomor halaman -> cursor awal halaman yang sudah diketahui
+    nomor = 1
+    total = pengurut.jumlah(lokasi, kategori=kategori) if saring is None else None
+    while True:
+        if nomor not in cursor:
+            cursor[nomor] = pengurut.cursor_halaman(lokasi, nomor, kriteria, ascending, ukuran, saring, kategori)
+        baris, berikut = pengurut.halaman(lokasi, kriteria, ascending, cursor[nomor], ukuran, saring, kategori)
+        if not baris and nomor == 1:
+            print(pesan_kosong)
+            return
+        print(f"\n{judul}")
+        print(tabulate([format_baris(nama, info) for nama, info in baris], headers=headers, tablefmt="grid"))
+        if total is not None:
+            print(f"Halaman {nomor} dari {max(1, -(-total // ukuran))}")
+        else:
+            print(f"Halaman {nomor}")
+
+        navigasi = []
+        if berikut is not None:
+            navigasi.append("n = berikutnya")
+        if nomor > 1:
+            navigasi.append("p = sebelumnya")
+        navigasi += ["j = lompat ke halaman", "q = keluar"]
+        pilihan = input(f"[{', '.join(navigasi)}]: ").strip().lower()
+
+        if pilihan == "n" and berikut is not None:
+            nomor += 1
+            cursor[nomor] = berikut
+        elif pilihan == "p" and nomor > 1:
+            nomor -= 1
+        elif pilihan == "j":
+            try:
+                tujuan = int(input("Nomor halaman: "))
+            except ValueError:
+                print("Input tidak valid.")
+                continue
+            if tujuan > 1 and tujuan not in cursor:
+                c = pengurut.cursor_halaman(lokasi, tujuan, kriteria, ascending, ukuran, saring, kategori)
+                if c is not None:
+                    cursor[tujuan] = c
+            if tujuan not in cursor:
+                print("Halaman tidak tersedia.")
+                continue
+            nomor = tujuan
+        elif pilihan in ("q", ""):
+            return
+        else:
+            print("Pilihan tidak valid.")
@@ -0,0 +1,141 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from inventory_store import store as inventory_store
+from order_archive import epoch
+from order_queue import antrean as antrean_pesanan
+from sales_rollup import rollup as rollup_penjualan
+
+# Folder dan File paths
+DATA_FOLDER = "Data"
+CACHE_LAPORAN_DIR = os.path.join(DATA_FOLDER, "cache_laporan")
+
+CACHE_LAPORAN_UKURAN = 16       # jumlah hasil laporan yang disimpan di memori
+CACHE_LAPORAN_DISK = False      # simpan juga hasil laporan ke disk agar bertahan antar sesi
+CACHE_LAPORAN_DISK_UKURAN = 64  # jumlah file maksimum di cache disk
+
+
+# -------------------- CACHE LAPORAN --------------------
+class CacheLaporan:
+    """
+    Cache hasil perhitungan laporan dengan eviksi LRU.
+
+    Kunci berisi nama perhitungan, rentang waktu (detik epoch), versi antrean,
+    versi inventaris, dan generasi rollup. Setiap konfirmasi pesanan menaikkan
+    versi antrean sehingga entri lama tidak akan pernah cocok lagi, tanpa
+    perlu invalidasi manual.
+
+    Tier disk (opsional) menyimpan hasil sebagai JSON dengan nama file hash
+    kunci. Karena versi inventaris di memori hanya berlaku per proses, kunci
+    disk memakai penanda persisten inventaris (stat file) sebagai gantinya.
+    """
+    def __init__(self, ukuran=CACHE_LAPORAN_UKURAN, disk=CACHE_LAPORAN_DISK, folder=CACHE_LAPORAN_DIR,
+                 ukuran_disk=CACHE_LAPORAN_DISK_UKURAN, antrean=antrean_pesanan, store=inventory_store,
+                 rollup=rollup_penjualan):
+        self.ukuran = ukuran
+        self.disk = disk
+        self.folder = folder
+        self.ukuran_disk = ukuran_disk
+        self.antrean = antrean
+        self.store = store
+        self.rollup = rollup
+        self.lock = threading.Lock()
+        self._isi = OrderedDict()   # kunci -> hasil, urut dari yang paling lama tidak dipakai
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _kunci(self, nama, start_date, end_date):
+        self.store.load()   # muat ulang jika inventaris diubah proses lain, agar versinya terkini
+        versi_antrean = self.antrean.versi_terkini()
+        generasi_rollup = self.rollup.penanda()
+        rentang = (epoch(start_date), epoch(end_date))
+        kunci_memori = (nama, rentang, versi_antrean, self.store.version, generasi_rollup)
+        kunci_disk = [nama, rentang, versi_antrean, self.store.penanda(), generasi_rollup]
+        return kunci_memori, kunci_disk
+
+    # ---------- tier disk ----------
+    def _disk_path(self, kunci_disk):
+        digest = hashlib.sha1(json.dumps(kunci_disk).encode()).hexdigest()
+        return os.path.join(self.folder, f"{digest}.json")
+
+    def _baca_disk(self, kunci_disk):
+        path = self._disk_path(kunci_disk)
+        try:
+            with open(path, 'r') as f:
+                isi = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        if isi.get("kunci") != json.loads(json.dumps(kunci_disk)):
+            return None
+        os.utime(path)   # tandai baru dipakai untuk eviksi LRU di disk
+        return isi
+
+    def _tulis_disk(self, kunci_disk, hasil):
+        if not os.path.exists(self.folder):
+            os.makedirs(self.folder)
+        path = self._disk_path(kunci_disk)
+        with open(path + ".tmp", 'w') as f:
+            json.dump({"kunci": kunci_disk, "hasil": hasil}, f, separators=(',', ':'))
+        os.replace(path + ".tmp", path)
+        # Buang file yang paling lama tidak dipakai jika melebihi batas
+        files = [os.path.join(self.folder, nama) for nama in os.listdir(self.folder) if nama.endswith(".json")]
+        if len(files) > self.ukuran_disk:
+            files.sort(key=os.path.getmtime)
+            for lama in files[:len(files) - self.ukuran_disk]:
+                os.remove(lama)
+
+    # ---------- API ----------
+    def ambil(self, nama, start_date, end_date, hitung):
+        """
+        Hasil perhitungan laporan `nama` untuk rentang tersebut; hitung() hanya
+        dipanggil jika belum ada di cache untuk versi data saat ini.
+        Hasil dipakai bersama, jadi pemanggil tidak boleh mengubahnya.
+        """
+        kunci_memori, kunci_disk = self._kunci(nama, start_date, end_date)
+        with self.lock:
+            if kunci_memori in self._isi:
+                self._isi.move_to_end(kunci_memori)
+                self.hits += 1
+                return self._isi[kunci_memori]
+
+        hasil = None
+        if self.disk:
+            isi = self._baca_disk(kunci_disk)
+            if isi is not None:
+                hasil = isi["hasil"]
+                self.disk_hits += 1
+        if hasil is None:
+            hasil = hitung()
+            self.misses += 1
+            if self.disk:
+                self._tulis_disk(kunci_disk, hasil)
+
+        with self.lock:
+            self._isi[kunci_memori] = hasil
+            self._isi.move_to_end(kunci_memori)
+            while len(self._isi) > self.ukuran:
+                self._isi.popitem(last=False)
+        return hasil
+
+    def kosongkan(self):
+        with self.lock:
+            self._isi = OrderedDict()
+
+    def stats(self):
+        """Statistik cache untuk tuning."""
+        total = self.hits + self.disk_hits + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_ratio": ((self.hits + self.disk_hits) / total) if total else 0.0,
+            "entri": len(self._isi),
+        }
+
+
+# Global report cache instance
+cache_laporan = CacheLaporan()
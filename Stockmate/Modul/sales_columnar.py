@@ -0,0 +1,156 @@
+try:
+    import numpy as np
+except ImportError:   # NumPy opsional; tanpa NumPy dipakai jalur Python murni
+    np = None
+
+from order_archive import epoch, epoch_pesanan
+
+NUMPY_AKTIF = True   # False = selalu pakai jalur Python murni
+DIMENSI = ("hari", "produk", "kategori")
+
+
+# -------------------- KOLOM PENJUALAN --------------------
+class KolomPenjualan:
+    """
+    Baris pesanan terkonfirmasi dalam bentuk kolom: waktu (epoch detik),
+    kode hari, kode produk, kode kategori, jumlah, harga satuan, diskon, dan
+    modal satuan (dari baris pesanan, atau inventaris untuk pesanan lama).
+    Nama hari/produk/kategori disimpan sekali di tabel label dan setiap baris
+    hanya menyimpan kodenya.
+
+    Jika NumPy tersedia, kolom menjadi array dan kelompokkan() memakai
+    np.unique + np.bincount. bincount menjumlahkan bobot berurutan sesuai
+    urutan baris, sama seperti jalur Python murni, sehingga kedua jalur
+    menghasilkan angka yang identik.
+    """
+    def __init__(self, pakai_numpy=None):
+        if pakai_numpy is None:
+            pakai_numpy = NUMPY_AKTIF
+        self.numpy = pakai_numpy and np is not None
+        self.label = {dimensi: [] for dimensi in DIMENSI}   # dimensi -> [nama per kode]
+        self._kode = {dimensi: {} for dimensi in DIMENSI}   # dimensi -> {nama: kode}
+        self.kolom = {nama: [] for nama in ("waktu", "hari", "produk", "kategori",
+                                              "jumlah", "harga", "diskon", "modal")}
+        self._siap = False
+
+    def __len__(self):
+        return len(self.kolom["jumlah"])
+
+    def _kode_untuk(self, dimensi, nilai):
+        peta = self._kode[dimensi]
+        kode = peta.get(nilai)
+        if kode is None:
+            kode = peta[nilai] = len(self.label[dimensi])
+            self.label[dimensi].append(nilai)
+        return kode
+
+    def tambah_pesanan(self, pesanan, info_produk):
+        """Tambahkan baris-baris satu pesanan; info_produk(nama) -> (kategori, harga_modal)."""
+        self._list()
+        waktu = epoch_pesanan(pesanan)
+        hari = self._kode_untuk("hari", pesanan['waktu'][:10])
+        kolom = self.kolom
+        for item in pesanan['pesanan']:
+            kategori, harga_modal = info_produk(item['produk'])
+            kolom["waktu"].append(waktu)
+            kolom["hari"].append(hari)
+            kolom["produk"].append(self._kode_untuk("produk", item['produk']))
+            kolom["kategori"].append(self._kode_untuk("kategori", kategori))
+            kolom["jumlah"].append(item['jumlah'])
+            kolom["harga"].append(float(item['harga_satuan']))
+            kolom["diskon"].append(float(item['diskon']))
+            kolom["modal"].append(float(item.get('harga_modal', harga_modal)))
+
+    def _list(self):
+        """Kembalikan kolom array ke list agar baris baru bisa ditambahkan setelah kelompokkan()."""
+        if not self._siap:
+            return
+        for nama in self.kolom:
+            self.kolom[nama] = self.kolom[nama].tolist()
+        self._siap = False
+
+    def _array(self):
+        """Ubah kolom list menjadi array NumPy (sekali, setelah semua baris ditambahkan)."""
+        if self._siap:
+            return
+        for nama, tipe in (("waktu", np.int64), ("hari", np.int64), ("produk", np.int64),
+                           ("kategori", np.int64), ("jumlah", np.int64), ("harga", np.float64),
+                           ("diskon", np.float64), ("modal", np.float64)):
+            self.kolom[nama] = np.asarray(self.kolom[nama], dtype=tipe)
+        self._siap = True
+
+    def kelompokkan(self, *dimensi, mulai=None, sampai=None):
+        """
+        Jumlahkan baris per kombinasi dimensi ("hari", "produk", "kategori"),
+        opsional hanya baris dengan mulai <= waktu < sampai (datetime).
+        Mengembalikan {(label, ...): {"jumlah", "bruto", "diskon", "modal", "margin"}}.
+        """
+        mulai, sampai = epoch(mulai), epoch(sampai)
+        if self.numpy:
+            return self._kelompokkan_numpy(dimensi, mulai, sampai)
+        return self._kelompokkan_python(dimensi, mulai, sampai)
+
+    def _kelompokkan_python(self, dimensi, mulai, sampai):
+        k = self.kolom
+        hasil = {}
+        for i in range(len(self)):
+            waktu = k["waktu"][i]
+            if (mulai is not None and waktu < mulai) or (sampai is not None and waktu >= sampai):
+                continue
+            kunci = tuple(self.label[d][k[d][i]] for d in dimensi)
+            jumlah = k["jumlah"][i]
+            bruto = k["harga"][i] * jumlah
+            diskon = bruto * k["diskon"][i] / 100
+            modal = k["modal"][i] * jumlah
+            metrik = hasil.get(kunci)
+            if metrik is None:
+                metrik = hasil[kunci] = {"jumlah": 0, "bruto": 0.0, "diskon": 0.0, "modal": 0.0, "margin": 0.0}
+            metrik["jumlah"] += jumlah
+            metrik["bruto"] += bruto
+            metrik["diskon"] += diskon
+            metrik["modal"] += modal
+            metrik["margin"] += bruto - diskon - modal
+        return hasil
+
+    def _kelompokkan_numpy(self, dimensi, mulai, sampai):
+        self._array()
+        k = self.kolom
+        pilih = np.ones(len(self), dtype=bool)
+        if mulai is not None:
+            pilih &= k["waktu"] >= mulai
+        if sampai is not None:
+            pilih &= k["waktu"] < sampai
+        # Gabungkan kode setiap dimensi menjadi satu kode grup
+        kode = np.zeros(int(pilih.sum()), dtype=np.int64)
+        for d in dimensi:
+            kode = kode * max(1, len(self.label[d])) + k[d][pilih]
+        grup, posisi = np.unique(kode, return_inverse=True)
+
+        jumlah = k["jumlah"][pilih]
+        bruto = k["harga"][pilih] * jumlah
+        diskon = bruto * k["diskon"][pilih] / 100
+        modal = k["modal"][pilih] * jumlah
+        kolom_metrik = {
+            "jumlah": jumlah,
+            "bruto": bruto,
+            "diskon": diskon,
+            "modal": modal,
+            "margin": bruto - diskon - modal,
+        }
+        total = {nama: np.bincount(posisi, weights=nilai, minlength=len(grup))
+                 for nama, nilai in kolom_metrik.items()}
+
+        hasil = {}
+        for g, kode_grup in enumerate(grup.tolist()):
+            kunci = []
+            for d in reversed(dimensi):
+                kode_grup, kode_d = divmod(kode_grup, max(1, len(self.label[d])))
+                kunci.append(self.label[d][kode_d])
+            hasil[tuple(reversed(kunci))] = {
+                "jumlah": int(total["jumlah"][g]),
+                "bruto": float(total["bruto"][g]),
+                "diskon": float(total["diskon"][g]),
+                "modal": float(total["modal"][g]),
+                "margin": float(total["margin"][g]),
+            }
+        return hasil
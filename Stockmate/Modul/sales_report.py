@@ -0,0 +1,121 @@
+from datetime import datetime, timedelta
+from tabulate import tabulate
+
+from inventory_store import store
+from sales_rollup import rollup, peringkat_produk, JUMLAH_PERINGKAT, KRITERIA_PERINGKAT
+from report_cache import cache_laporan
+from sales_window import jendela_penjualan
+
+
+# -------------------- PILIH RENTANG WAKTU --------------------
+def pilih_rentang_waktu():
+    """
+    Minta rentang laporan. Mengembalikan (start_date, end_date) dengan end_date
+    eksklusif, (None, None) untuk semua waktu, atau None jika pengguna kembali.
+    """
+    while True:
+        print("\n=== PILIH RENTANG WAKTU ===")
+        print("1. Hari ini")
+        print("2. Kemarin")
+        print("3. 7 hari terakhir")
+        print("4. 30 hari terakhir")
+        print("5. Bulan ini")
+        print("6. Bulan lalu")
+        print("7. Rentang tanggal kustom")
+        print("8. Semua waktu")
+        print("0. Kembali")
+        
+        pilihan = input("Pilih opsi (0-8): ").strip()
+        
+        today = datetime.now()
+        today_start = datetime(today.year, today.month, today.day)
+        
+        if pilihan == "0":
+            return None
+        elif pilihan == "1":  # Hari ini
+            return today_start, today_start + timedelta(days=1)
+        elif pilihan == "2":  # Kemarin
+            yesterday = today_start - timedelta(days=1)
+            return yesterday, today_start
+        elif pilihan == "3":  # 7 hari terakhir
+            return today_start - timedelta(days=7), today_start + timedelta(days=1)
+        elif pilihan == "4":  # 30 hari terakhir
+            return today_start - timedelta(days=30), today_start + timedelta(days=1)
+        elif pilihan == "5":  # Bulan ini
+            start_of_month = datetime(today.year, today.month, 1)
+            return start_of_month, today_start + timedelta(days=1)
+        elif pilihan == "6":  # Bulan lalu
+            if today.month == 1:
+                start_of_last_month = datetime(today.year - 1, 12, 1)
+                end_of_last_month = datetime(today.year, 1, 1)
+            else:
+                start_of_last_month = datetime(today.year, today.month - 1, 1)
+                end_of_last_month = datetime(today.year, today.month, 1)
+            return start_of_last_month, end_of_last_month
+        elif pilihan == "7":  # Rentang tanggal kustom
+            try:
+                print("\nMasukkan rentang tanggal (format: DD-MM-YYYY)")
+                tanggal_awal = input("Tanggal awal: ").strip()
+                tanggal_akhir = input("Tanggal akhir: ").strip()
+                
+                start_date = datetime.strptime(tanggal_awal, "%d-%m-%Y")
+                end_date = datetime.strptime(tanggal_akhir, "%d-%m-%Y") + timedelta(days=1)  # Include the end date
+                
+                return start_date, end_date
+            except ValueError:
+                print("\nFormat tanggal tidak valid. Gunakan format DD-MM-YYYY.")
+                continue
+        elif pilihan == "8":  # Semua waktu
+            return None, None
+        else:
+            print("Pilihan tidak valid. Silakan coba lagi.")
+
+
+# -------------------- RINGKASAN PENJUALAN --------------------
+def ambil_ringkasan(start_date, end_date):
+    """Ringkasan rollup untuk rentang; jendela berjalan (hari ini / 7 / 30 hari) dijawab dari memori."""
+    ringkasan = jendela_penjualan.ringkasan(start_date, end_date)
+    if ringkasan is None:
+        ringkasan = cache_laporan.ambil("ringkasan", start_date, end_date,
+                                        lambda: rollup.ringkasan(start_date, end_date))
+    return ringkasan
+
+
+# -------------------- PRODUK TERLARIS & PALING LAMBAT --------------------
+def tabel_peringkat(peringkat):
+    table_data = []
+    for idx, (produk, info) in enumerate(peringkat, 1):
+        table_data.append([idx, produk, info['jumlah'], f"Rp {info['total_harga']:,.2f}", f"Rp {info['margin']:,.2f}"])
+    return tabulate(table_data, headers=["No.", "Produk", "Jumlah Terjual", "Total Penjualan", "Keuntungan"], tablefmt="grid")
+
+def lihat_produk_terlaris():
+    print("\n=== PRODUK TERLARIS & PALING LAMBAT ===")
+    rentang = pilih_rentang_waktu()
+    if rentang is None:
+        print("Kembali ke menu utama.")
+        return
+    start_date, end_date = rentang
+
+    print("Urutkan berdasarkan:")
+    for idx, (_, label) in enumerate(KRITERIA_PERINGKAT, 1):
+        print(f"{idx}. {label}")
+    try:
+        pilihan = int(input(f"Pilih kriteria (1-{len(KRITERIA_PERINGKAT)}): ").strip())
+        kriteria, label = KRITERIA_PERINGKAT[pilihan - 1]
+        jumlah_input = input(f"Jumlah produk ditampilkan (default {JUMLAH_PERINGKAT}): ").strip()
+        n = int(jumlah_input) if jumlah_input else JUMLAH_PERINGKAT
+    except (ValueError, IndexError):
+        print("Input tidak valid.")
+        return
+    if n <= 0 or pilihan <= 0:
+        print("Input tidak valid.")
+        return
+
+    total_per_produk = ambil_ringkasan(start_date, end_date)['produk']
+    # Produk toko yang belum terjual sama sekali ikut dihitung sebagai produk paling lambat
+    produk_toko = store.salinan("toko")
+
+    print(f"\n{n} PRODUK TERLARIS ({label.upper()}):")
+    print(tabel_peringkat(peringkat_produk(total_per_produk, n, kriteria)))
+    print(f"\n{n} PRODUK PALING LAMBAT ({label.upper()}):")
+    print(tabel_peringkat(peringkat_produk(total_per_produk, n, kriteria, terbawah=True, produk_lain=produk_toko)))
@@ -0,0 +1,309 @@
+import heapq
+import itertools
+import json
+import os
+import shutil
+import threading
+
+from inventory_store import store as inventory_store
+from order_archive import arsip as arsip_pesanan, waktu_str
+from sales_columnar import KolomPenjualan
+
+# Folder dan File paths
+DATA_FOLDER = "Data"
+ROLLUP_DIR = os.path.join(DATA_FOLDER, "rollup")
+
+TANPA_KATEGORI = "Tidak terkategori"
+VERSI_ROLLUP = 2   # naikkan jika isi metrik berubah; rollup versi lama dibangun ulang
+
+JUMLAH_PERINGKAT = 10   # banyak produk di daftar terlaris / paling lambat
+KRITERIA_PERINGKAT = [("jumlah", "Jumlah Terjual"), ("total_harga", "Total Penjualan"), ("margin", "Keuntungan")]
+
+
+# -------------------- METRIK --------------------
+def metrik_kosong():
+    return {"jumlah": 0, "bruto": 0.0, "diskon": 0.0, "modal": 0.0, "margin": 0.0}
+
+def tambah_metrik(tujuan, sumber):
+    for kunci, nilai in sumber.items():
+        tujuan[kunci] = tujuan.get(kunci, 0) + nilai
+
+def metrik_item(item, harga_modal=0):
+    """
+    Metrik satu baris pesanan: jumlah, bruto (sebelum diskon), potongan diskon,
+    modal, dan margin. Modal memakai harga_modal yang dicatat di baris pesanan
+    saat checkout; argumen harga_modal hanya cadangan untuk pesanan lama.
+    """
+    jumlah = item['jumlah']
+    bruto = float(item['harga_satuan']) * jumlah
+    diskon = bruto * float(item['diskon']) / 100
+    modal = float(item.get('harga_modal', harga_modal)) * jumlah
+    return {
+        "jumlah": jumlah,
+        "bruto": bruto,
+        "diskon": diskon,
+        "modal": modal,
+        "margin": bruto - diskon - modal,
+    }
+
+def dimensi_produk(nama_list, produk_toko=None, store=inventory_store):
+    """
+    Dimensi produk untuk satu laporan: nama produk di pesanan -> {nama_asli,
+    kategori, harga_modal, harga_jual, diskon} menurut inventaris toko.
+    Setiap nama diselesaikan sekali, bukan sekali per baris pesanan.
+    """
+    if produk_toko is None:
+        produk_toko = store.load().get("toko", {})
+    dimensi = {}
+    for nama in nama_list:
+        if nama in dimensi:
+            continue
+        nama_asli = store.cari_nama_asli("toko", nama)
+        info = produk_toko.get(nama_asli, {}) if nama_asli else {}
+        dimensi[nama] = {
+            "nama_asli": nama_asli,
+            "kategori": info.get('kategori') or TANPA_KATEGORI,
+            "harga_modal": info.get('harga_modal', 0),
+            "harga_jual": info.get('harga_jual', 0),
+            "diskon": info.get('diskon', 0),
+        }
+    return dimensi
+
+def dimensi_pesanan(pesanan_list, nama_tambahan=()):
+    """Dimensi produk untuk semua produk yang muncul di pesanan_list (dan nama_tambahan)."""
+    nama_list = {item['produk'] for pesanan in pesanan_list for item in pesanan['pesanan']}
+    return dimensi_produk(nama_list | set(nama_tambahan))
+
+def sebagai_total(metrik):
+    """Metrik rollup dalam bentuk yang dipakai laporan: total_harga = bruto - diskon."""
+    hasil = dict(metrik)
+    hasil['total_harga'] = metrik['bruto'] - metrik['diskon']
+    return hasil
+
+def peringkat_produk(total_per_produk, n=JUMLAH_PERINGKAT, kriteria="jumlah", terbawah=False, produk_lain=()):
+    """
+    N produk teratas (atau terbawah) dari ringkasan per produk menurut kriteria
+    ("jumlah", "total_harga", atau "margin"), memakai heapq sehingga biayanya
+    O(m log N) untuk m produk, bukan mengurutkan semuanya. Nama di produk_lain
+    yang tidak ada di ringkasan (produk toko yang belum terjual) ikut diperingkat
+    dengan metrik nol. Hasil: [(nama, metrik), ...] terurut sesuai peringkat.
+    """
+    kosong = sebagai_total(metrik_kosong())
+    kandidat = itertools.chain(
+        total_per_produk.items(),
+        ((nama, kosong) for nama in produk_lain if nama not in total_per_produk)
+    )
+    pilih = heapq.nsmallest if terbawah else heapq.nlargest
+    return pilih(n, kandidat, key=lambda item: item[1][kriteria])
+
+
+# -------------------- ROLLUP PENJUALAN HARIAN --------------------
+class RollupPenjualan:
+    """
+    Ringkasan penjualan harian (hari x produk dan hari x kategori: jumlah,
+    bruto, diskon, modal) yang diperbarui saat pesanan dikonfirmasi.
+
+    Rollup dipartisi per bulan seperti arsip (rollup/YYYY-MM.json), sehingga
+    satu konfirmasi hanya menulis ulang file bulan tersebut, dan laporan
+    menjumlahkan bucket harian dalam rentang alih-alih membaca setiap baris
+    pesanan. Modal dan margin diambil dari harga modal yang dicatat di baris
+    pesanan saat checkout, dan kategori dicatat saat pesanan dikonfirmasi,
+    sehingga laba rugi tetap benar walaupun harga atau produk berubah.
+    Jika folder rollup belum ada (atau versinya lama), rollup dibangun dari arsip.
+    """
+    def __init__(self, folder=ROLLUP_DIR, arsip=arsip_pesanan, store=inventory_store):
+        self.folder = folder
+        self.arsip = arsip
+        self.store = store
+        self.lock = threading.RLock()
+        self._bulan = {}   # kunci bulan -> (signature file, {hari: {"transaksi": n, "produk": {...}, "kategori": {...}}})
+        self.pendengar = []   # fungsi(delta) yang dipanggil setelah pesanan baru masuk; delta None = dibangun ulang
+
+    def _path(self, bulan, folder=None):
+        return os.path.join(folder or self.folder, f"{bulan}.json")
+
+    def _versi_path(self, folder=None):
+        return os.path.join(folder or self.folder, "VERSI")
+
+    def _perlu_dibangun(self):
+        """True jika rollup belum ada atau dibuat oleh versi metrik yang lama."""
+        try:
+            with open(self._versi_path(), 'r') as f:
+                return int(f.read().strip() or 0) != VERSI_ROLLUP
+        except (OSError, ValueError):
+            return True
+
+    def init_file(self):
+        if self._perlu_dibangun():
+            self.bangun_ulang()
+
+    def penanda(self):
+        """Penanda generasi rollup; berubah setiap kali rollup dibangun ulang."""
+        try:
+            return os.stat(self._versi_path()).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def daftar_bulan(self):
+        """Kunci bulan yang memiliki rollup, urut dari yang terlama."""
+        if not os.path.isdir(self.folder):
+            return []
+        return sorted(nama[:-len(".json")] for nama in os.listdir(self.folder) if nama.endswith(".json"))
+
+    def signature_bulan(self, bulan):
+        """Stat file rollup satu bulan; berubah jika file ditulis (oleh proses mana pun)."""
+        try:
+            st = os.stat(self._path(bulan))
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def _baca_bulan(self, bulan):
+        signature = self.signature_bulan(bulan)
+        cache = self._bulan.get(bulan)
+        if cache is None or cache[0] != signature:
+            isi = {}
+            if signature is not None:
+                with open(self._path(bulan), 'r') as f:
+                    isi = json.load(f)
+            cache = self._bulan[bulan] = (signature, isi)
+        return cache[1]
+
+    def _simpan_bulan(self, bulan, isi, folder=None):
+        path = self._path(bulan, folder)
+        with open(path + ".tmp", 'w') as f:
+            json.dump(isi, f, separators=(',', ':'), sort_keys=True)
+        os.replace(path + ".tmp", path)
+        if folder is None:
+            self._bulan[bulan] = (self.signature_bulan(bulan), isi)
+
+    def _info_produk(self, produk_toko):
+        """Fungsi nama produk -> (kategori, harga_modal); tiap nama diselesaikan sekali."""
+        dimensi = {}
+
+        def info_produk(nama):
+            if nama not in dimensi:
+                dimensi.update(dimensi_produk([nama], produk_toko, self.store))
+            return dimensi[nama]["kategori"], dimensi[nama]["harga_modal"]
+        return info_produk
+
+    @staticmethod
+    def _bucket(isi_bulan, hari):
+        return isi_bulan.setdefault(hari, {"transaksi": 0, "produk": {}, "kategori": {}})
+
+    def _akumulasi(self, per_bulan, pesanan_list, produk_toko):
+        """Tambahkan pesanan ke bucket harian; per_bulan(bulan) -> dict hari bulan tersebut."""
+        info_produk = self._info_produk(produk_toko)
+        for pesanan in pesanan_list:
+            hari = pesanan['waktu'][:10]
+            bucket = self._bucket(per_bulan(hari[:7]), hari)
+            bucket["transaksi"] += 1
+            for item in pesanan['pesanan']:
+                kategori, harga_modal = info_produk(item['produk'])
+                metrik = metrik_item(item, harga_modal)
+                tambah_metrik(bucket["produk"].setdefault(item['produk'], metrik_kosong()), metrik)
+                tambah_metrik(bucket["kategori"].setdefault(kategori, metrik_kosong()), metrik)
+
+    def tambah(self, *pesanan):
+        """
+        Masukkan pesanan yang baru diarsipkan ke rollup; satu tulisan per bulan
+        yang tersentuh. Jika rollup belum ada, rollup dibangun dari arsip (yang
+        sudah berisi pesanan ini).
+        """
+        with self.lock:
+            if self._perlu_dibangun():
+                self.bangun_ulang()
+                return
+            produk_toko = self.store.load().get("toko", {})
+            tersentuh = set()
+
+            def per_bulan(bulan):
+                tersentuh.add(bulan)
+                return self._baca_bulan(bulan)
+
+            self._akumulasi(per_bulan, pesanan, produk_toko)
+            for bulan in tersentuh:
+                self._simpan_bulan(bulan, self._bulan[bulan][1])
+
+            if self.pendengar:
+                delta = {}
+                self._akumulasi(lambda bulan: delta.setdefault(bulan, {}), pesanan, produk_toko)
+                for pendengar in self.pendengar:
+                    pendengar(delta)
+
+    def bangun_ulang(self):
+        """
+        Bangun ulang seluruh rollup dari arsip, satu partisi arsip sekaligus.
+        Setiap partisi dimuat sebagai kolom dan dikelompokkan per (hari, produk)
+        dan (hari, kategori) dengan KolomPenjualan (NumPy jika tersedia).
+        Rollup baru ditulis ke folder sementara lalu menggantikan yang lama.
+        Mengembalikan jumlah pesanan yang diproses.
+        """
+        with self.lock:
+            tmp_folder = self.folder + ".tmp"
+            if os.path.exists(tmp_folder):
+                shutil.rmtree(tmp_folder)
+            os.makedirs(tmp_folder)
+            info_produk = self._info_produk(self.store.load().get("toko", {}))
+            jumlah = 0
+            for kunci in self.arsip.daftar_partisi():
+                per_bulan = {}
+                pesanan_list = self.arsip.baca_partisi(kunci)
+                kolom = KolomPenjualan()
+                for pesanan in pesanan_list:
+                    kolom.tambah_pesanan(pesanan, info_produk)
+                    hari = pesanan['waktu'][:10]
+                    self._bucket(per_bulan.setdefault(hari[:7], {}), hari)["transaksi"] += 1
+                for dimensi in ("produk", "kategori"):
+                    for (hari, nama), metrik in kolom.kelompokkan("hari", dimensi).items():
+                        per_bulan[hari[:7]][hari][dimensi][nama] = metrik
+                for bulan, isi in per_bulan.items():
+                    self._simpan_bulan(bulan, isi, tmp_folder)
+                jumlah += len(pesanan_list)
+            with open(self._versi_path(tmp_folder), 'w') as f:
+                f.write(str(VERSI_ROLLUP))
+            if os.path.exists(self.folder):
+                shutil.rmtree(self.folder)
+            os.replace(tmp_folder, self.folder)
+            self._bulan = {}
+            for pendengar in self.pendengar:
+                pendengar(None)
+            return jumlah
+
+    def bucket_hari(self, hari):
+        """Bucket rollup satu hari ('YYYY-MM-DD'), atau None jika tidak ada penjualan."""
+        with self.lock:
+            self.init_file()
+            return self._baca_bulan(hari[:7]).get(hari)
+
+    def ringkasan(self, start_date, end_date):
+        """
+        Total penjualan untuk start_date <= hari < end_date (None = tanpa batas):
+        {"transaksi": n, "produk": {nama: metrik}, "kategori": {kategori: metrik}, "total": metrik}.
+        Setiap metrik berisi jumlah, bruto, diskon, modal, margin, dan total_harga.
+        """
+        start = waktu_str(start_date)[:10] if start_date is not None else None
+        end = waktu_str(end_date)[:10] if end_date is not None else None
+        hasil = {"transaksi": 0, "produk": {}, "kategori": {}, "total": metrik_kosong()}
+        with self.lock:
+            self.init_file()
+            for bulan in self.daftar_bulan():
+                if (start is not None and bulan < start[:7]) or (end is not None and bulan > end[:7]):
+                    continue
+                for hari, bucket in self._baca_bulan(bulan).items():
+                    if (start is not None and hari < start) or (end is not None and hari >= end):
+                        continue
+                    hasil["transaksi"] += bucket["transaksi"]
+                    for nama, metrik in bucket["produk"].items():
+                        tambah_metrik(hasil["produk"].setdefault(nama, metrik_kosong()), metrik)
+                        tambah_metrik(hasil["total"], metrik)
+                    for kategori, metrik in bucket["kategori"].items():
+                        tambah_metrik(hasil["kategori"].setdefault(kategori, metrik_kosong()), metrik)
+        for bagian in ("produk", "kategori"):
+            hasil[bagian] = {nama: sebagai_total(metrik) for nama, metrik in hasil[bagian].items()}
+        hasil["total"] = sebagai_total(hasil["total"])
+        return hasil
+
+
+# Global rollup instance
+rollup = RollupPenjualan()
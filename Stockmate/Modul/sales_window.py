@@ -0,0 +1,147 @@
+import threading
+from datetime import datetime, timedelta
+
+from sales_rollup import rollup as rollup_penjualan, metrik_kosong, tambah_metrik, sebagai_total
+
+# Panjang jendela (hari, termasuk hari ini) untuk opsi "Hari ini", "7 hari terakhir",
+# dan "30 hari terakhir" di sales_report.pilih_rentang_waktu
+PANJANG_JENDELA = (1, 8, 31)
+
+
+# -------------------- JENDELA PENJUALAN --------------------
+def _bucket_kosong():
+    return {"transaksi": 0, "produk": {}, "kategori": {}}
+
+def _total_kosong():
+    return {"transaksi": 0, "produk": {}, "kategori": {}, "total": metrik_kosong()}
+
+def _tambah_bucket(tujuan, bucket):
+    """Tambahkan bucket harian ke bucket lain, atau ke total jendela (yang juga punya "total")."""
+    tujuan["transaksi"] += bucket["transaksi"]
+    for nama, metrik in bucket["produk"].items():
+        tambah_metrik(tujuan["produk"].setdefault(nama, metrik_kosong()), metrik)
+        if "total" in tujuan:
+            tambah_metrik(tujuan["total"], metrik)
+    for kategori, metrik in bucket["kategori"].items():
+        tambah_metrik(tujuan["kategori"].setdefault(kategori, metrik_kosong()), metrik)
+
+
+class JendelaPenjualan:
+    """
+    Total penjualan berjalan untuk jendela hari ini, 7 hari terakhir, dan 30
+    hari terakhir, disimpan di memori.
+
+    Bucket harian untuk 31 hari terakhir dimuat sekali dari rollup. Setiap
+    pesanan yang dikonfirmasi ditambahkan langsung ke bucket dan ke total
+    setiap jendela yang memuat harinya (lewat pendengar rollup). Saat hari
+    berganti, bucket yang keluar dari jendela dibuang dan total dihitung ulang
+    dari paling banyak 31 bucket, sehingga tidak ada galat pengurangan float.
+    Jika file rollup bulan terkait ditulis proses lain, jendela dimuat ulang.
+
+    Lock rollup selalu diambil sebelum lock jendela: pendengar dipanggil rollup
+    dengan lock rollup dipegang, jadi ringkasan() juga mengambilnya lebih dulu.
+    """
+    def __init__(self, rollup=rollup_penjualan, panjang=PANJANG_JENDELA):
+        self.rollup = rollup
+        self.panjang = panjang
+        self.lock = threading.Lock()
+        self._hari_ini = None   # tanggal (date) saat jendela terakhir digeser
+        self._hari = {}         # 'YYYY-MM-DD' -> bucket harian
+        self._total = {}        # panjang -> total jendela
+        self._signature = {}    # bulan -> signature file rollup saat dimuat
+        rollup.pendengar.append(self._terima)
+
+    def _daftar_hari(self, hari_ini):
+        return [(hari_ini - timedelta(days=i)).strftime("%Y-%m-%d") for i in range(max(self.panjang))]
+
+    def _hitung_total(self):
+        hari_ini = self._hari_ini.strftime("%Y-%m-%d")
+        self._total = {}
+        for panjang in self.panjang:
+            awal = (self._hari_ini - timedelta(days=panjang - 1)).strftime("%Y-%m-%d")
+            total = _total_kosong()
+            for hari in sorted(self._hari):
+                if awal <= hari <= hari_ini:
+                    _tambah_bucket(total, self._hari[hari])
+            self._total[panjang] = total
+
+    def _muat(self, hari_ini):
+        """Muat bucket harian jendela dari rollup (satu-satunya saat rollup dibaca)."""
+        self._hari_ini = hari_ini
+        self._hari = {}
+        self._signature = {}
+        for hari in self._daftar_hari(hari_ini):
+            self._signature.setdefault(hari[:7], self.rollup.signature_bulan(hari[:7]))
+            bucket = self.rollup.bucket_hari(hari)
+            if bucket is not None:
+                # Salin, karena bucket di jendela ikut bertambah saat pesanan masuk
+                self._hari[hari] = _bucket_kosong()
+                _tambah_bucket(self._hari[hari], bucket)
+        self._hitung_total()
+
+    def _geser(self, hari_ini):
+        """Buang bucket yang sudah keluar dari jendela terpanjang lalu hitung ulang total."""
+        daftar_hari = self._daftar_hari(hari_ini)
+        if any(hari[:7] not in self._signature for hari in daftar_hari):
+            # Bulan baru masuk jendela: bucketnya belum pernah dibaca dari rollup
+            self._muat(hari_ini)
+            return
+        self._hari_ini = hari_ini
+        batas = daftar_hari[-1]
+        self._hari = {hari: bucket for hari, bucket in self._hari.items() if hari >= batas}
+        self._hitung_total()
+
+    def _terima(self, delta):
+        """Pendengar rollup: tambahkan bucket pesanan baru, atau reset jika rollup dibangun ulang."""
+        with self.lock:
+            if delta is None or self._hari_ini is None:
+                self._hari_ini = None
+                return
+            hari_ini = self._hari_ini.strftime("%Y-%m-%d")
+            batas = self._daftar_hari(self._hari_ini)[-1]
+            for bulan, per_hari in delta.items():
+                if bulan in self._signature:
+                    self._signature[bulan] = self.rollup.signature_bulan(bulan)
+                for hari, bucket in per_hari.items():
+                    # Hari setelah hari_ini (pesanan lewat tengah malam) tetap disimpan
+                    # agar masuk ke total saat jendela digeser ke hari tersebut
+                    if hari < batas:
+                        continue
+                    _tambah_bucket(self._hari.setdefault(hari, _bucket_kosong()), bucket)
+                    for panjang in self.panjang:
+                        awal = (self._hari_ini - timedelta(days=panjang - 1)).strftime("%Y-%m-%d")
+                        if awal <= hari <= hari_ini:
+                            _tambah_bucket(self._total[panjang], bucket)
+
+    def _basi(self):
+        return any(self.rollup.signature_bulan(bulan) != signature for bulan, signature in self._signature.items())
+
+    def ringkasan(self, start_date, end_date, sekarang=None):
+        """
+        Ringkasan dengan bentuk yang sama seperti rollup.ringkasan jika rentang
+        adalah salah satu jendela berjalan (berakhir besok pukul 00:00);
+        None untuk rentang lain.
+        """
+        if start_date is None or end_date is None:
+            return None
+        hari_ini = (sekarang or datetime.now()).date()
+        panjang = (end_date - start_date).days
+        if end_date != datetime.combine(hari_ini + timedelta(days=1), datetime.min.time()) \
+                or start_date + timedelta(days=panjang) != end_date or panjang not in self.panjang:
+            return None
+        with self.rollup.lock, self.lock:
+            if self._hari_ini is None or self._basi():
+                self._muat(hari_ini)
+            elif self._hari_ini != hari_ini:
+                self._geser(hari_ini)
+            total = self._total[panjang]
+            return {
+                "transaksi": total["transaksi"],
+                "produk": {nama: sebagai_total(metrik) for nama, metrik in total["produk"].items()},
+                "kategori": {nama: sebagai_total(metrik) for nama, metrik in total["kategori"].items()},
+                "total": sebagai_total(total["total"]),
+            }
+
+
+# Global sliding-window instance
+jendela_penjualan = JendelaPenjualan()
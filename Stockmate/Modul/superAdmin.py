@@ -1,100 +1,51 @@
-import json
-import os
 from datetime import datetime, timedelta
 from tabulate import tabulate
+from order_archive import arsip, epoch_pesanan, potong_rentang
+from product_sort import urutkan_items, input_urutan, tampilkan_berhalaman
+from product_search import pilih_dari_saran
+from sweeper import sapu_kadaluarsa
+from sales_rollup import rollup, dimensi_pesanan, peringkat_produk, JUMLAH_PERINGKAT
+from report_cache import cache_laporan
+from sales_report import pilih_rentang_waktu, ambil_ringkasan, lihat_produk_terlaris
+from inventory_store import (
+    store, load_data, terapkan, mutasi_stok, mutasi_set, mutasi_tambah, mutasi_hapus, mutasi_ganti_nama
+)
 
 # Folder dan File paths
 DATA_FOLDER = "Data"
-FILE_PATH = os.path.join(DATA_FOLDER, "inv.json")
-ANTREAN_PATH = os.path.join(DATA_FOLDER, "antrean.json")
 KATEGORI_OPSI = ["Makanan", "Minuman", "Elektronik"]
 
 # -------------------- FUNGSI FILE HANDLING --------------------
-def init_file():
-    if not os.path.exists(DATA_FOLDER):
-        os.makedirs(DATA_FOLDER)
-    if not os.path.exists(FILE_PATH):
-        with open(FILE_PATH, 'w') as f:
-            json.dump({"gudang": {}, "toko": {}}, f, indent=4)
-
-def load_data():
-    init_file()
-    with open(FILE_PATH, 'r') as f:
-        return json.load(f)
-
-def save_data(data):
-    with open(FILE_PATH, 'w') as f:
-        json.dump(data, f, indent=4)
-
-def cari_nama_produk(koleksi, nama):
-    nama_lower = nama.lower()
-    return any(nama_lower == key.lower() for key in koleksi)
-
-def dapatkan_nama_asli(koleksi, nama):
-    nama_lower = nama.lower()
-    for key in koleksi:
-        if key.lower() == nama_lower:
-            return key
-    return None
-
-
-# -------------------- QUICK SORT --------------------
-def quick_sort(arr, ascending=True):
-    if len(arr) <= 1:
-        return arr
-    pivot = arr[0]
-    pivot_key = pivot[0].lower()
-    left = [item for item in arr[1:] if (item[0].lower() <= pivot_key) == ascending]
-    right = [item for item in arr[1:] if (item[0].lower() > pivot_key) == ascending]
-    return quick_sort(left, ascending) + [pivot] + quick_sort(right, ascending)
+def cari_nama_produk(lokasi, nama):
+    return store.cari_nama_asli(lokasi, nama) is not None
+
+def dapatkan_nama_asli(lokasi, nama):
+    return store.cari_nama_asli(lokasi, nama)
+
 
 # -------------------- CEK KADALUARSA --------------------
 
 def cek_dan_bersihkan_kadaluarsa():
     """Cek produk yang sudah kadaluarsa dan hapus dari gudang dan toko"""
-    data = load_data()
-    hari_ini = datetime.now().strftime('%Y-%m-%d')
-    
-    # Cek di gudang
-    gudang_untuk_dihapus = []
-    for produk, info in data["gudang"].items():
-        if "tanggal_kadaluarsa" in info and info["tanggal_kadaluarsa"] <= hari_ini:
-            gudang_untuk_dihapus.append(produk)
-    
-    # Cek di toko
-    toko_untuk_dihapus = []
-    for produk, info in data["toko"].items():
-        if "tanggal_kadaluarsa" in info and info["tanggal_kadaluarsa"] <= hari_ini:
-            toko_untuk_dihapus.append(produk)
-    
-    # Hapus produk kadaluarsa
-    for produk in gudang_untuk_dihapus:
-        del data["gudang"][produk]
-        print(f"Produk '{produk}' di gudang telah kadaluarsa dan dihapus dari sistem.")
-    
-    for produk in toko_untuk_dihapus:
-        del data["toko"][produk]
-        print(f"Produk '{produk}' di toko telah kadaluarsa dan dihapus dari sistem.")
-    
-    if gudang_untuk_dihapus or toko_untuk_dihapus:
-        save_data(data)
-        return True
-    return False
+    dihapus = sapu_kadaluarsa()
+    for lokasi, daftar in dihapus.items():
+        for produk in daftar:
+            print(f"Produk '{produk}' di {lokasi} telah kadaluarsa dan dihapus dari sistem.")
+    return any(dihapus.values())
 
 
 # -------------------- TAMBAHKAN PRODUK --------------------
 
 def tambah_produk_ke_gudang(nama, stok, harga_modal=None, harga_jual=None, kategori=None):
-    data = load_data()
     nama = nama.strip().title()
-    nama_asli = dapatkan_nama_asli(data["gudang"], nama)
+    nama_asli = dapatkan_nama_asli("gudang", nama)
 
     if stok <= 0:
         print("Stok harus lebih dari 0.")
         return
 
     if nama_asli:  # Produk sudah ada
-        data["gudang"][nama_asli]["stok"] += stok
+        terapkan(mutasi_stok("gudang", nama_asli, stok))
         print(f"Stok produk '{nama_asli}' di gudang berhasil ditambah {stok} unit.")
     else:  # Produk baru
         if harga_modal is None or harga_jual is None or kategori is None:
@@ -117,7 +68,7 @@ def tambah_produk_ke_gudang(nama, stok, harga_modal=None, harga_jual=None, kateg
             except ValueError:
                 print("Input masa simpan tidak valid. Menggunakan tanpa tanggal kadaluarsa.")
 
-        data["gudang"][nama] = {
+        info = {
             "stok": stok,
             "kategori": kategori,
             "harga_modal": harga_modal,
@@ -126,70 +77,47 @@ def tambah_produk_ke_gudang(nama, stok, harga_modal=None, harga_jual=None, kateg
         }
 
         if tanggal_kadaluarsa:
-            data["gudang"][nama]["tanggal_kadaluarsa"] = tanggal_kadaluarsa
+            info["tanggal_kadaluarsa"] = tanggal_kadaluarsa
             print(f"Produk '{nama}' ditambahkan dengan tanggal kadaluarsa: {tanggal_kadaluarsa}")
         else:
             print(f"Produk '{nama}' ditambahkan tanpa tanggal kadaluarsa.")
-        
-        print(f"-> Harga beli: {harga_modal}, Harga jual: {harga_jual}")
 
-    save_data(data)
+        terapkan(mutasi_tambah("gudang", nama, info))
+        print(f"-> Harga beli: {harga_modal}, Harga jual: {harga_jual}")
 
 # -------------------- TAMPILKAN PRODUK -----------------------------
 def hitung_harga_diskon(harga, diskon):
     return harga * (1 - diskon / 100)
 
-def tampilkan_produk(lokasi="gudang", ascending=True, filter_kategori=None):
+def tampilkan_produk(lokasi="gudang", ascending=True, filter_kategori=None, kriteria="nama"):
     data = load_data()
     if lokasi not in data:
         print("Lokasi tidak valid.")
         return
 
-    produk_list = data[lokasi]
-    filtered = {
-        k: v for k, v in produk_list.items()
-        if filter_kategori is None or v["kategori"] == filter_kategori
-    }
-
-    produk_items = list(filtered.items())
-    sorted_produk = quick_sort(produk_items, ascending)
-
-    if not sorted_produk:
-        print("Tidak ada produk yang ditemukan.")
-        return
-
-    tabel = []
-    for nama, info in sorted_produk:
-        if lokasi == "toko":
+    if lokasi == "toko":
+        def format_baris(nama, info):
             harga_jual = info['harga_jual']
             diskon = info.get('diskon', 0)
             harga_diskon = hitung_harga_diskon(harga_jual, diskon)
-            tabel.append([
+            return [
                 nama, info['stok'], f"Rp {harga_jual:,.2f}", info['kategori'],
                 f"{diskon}%", f"Rp {harga_diskon:,.2f}"
-            ])
-        else:  # lokasi == "gudang"
-            tabel.append([
+            ]
+        headers = ["Nama", "Stok", "Harga Jual", "Kategori", "Diskon", "Harga Setelah Diskon"]
+    else:  # lokasi == "gudang"
+        def format_baris(nama, info):
+            return [
                 nama,
                 info['stok'],
                 f"Rp {info['harga_modal']:,.2f}",
                 f"Rp {info['harga_jual']:,.2f}",
                 info['kategori']
-            ])
+            ]
+        headers = ["Nama", "Stok", "Harga Modal", "Harga Jual", "Kategori"]
 
-    print(f"\nProduk di {lokasi.upper()}:")
-    if lokasi == "toko":
-        print(tabulate(
-            tabel,
-            headers=["Nama", "Stok", "Harga Jual", "Kategori", "Diskon", "Harga Setelah Diskon"],
-            tablefmt="grid"
-        ))
-    else:
-        print(tabulate(
-            tabel,
-            headers=["Nama", "Stok", "Harga Modal", "Harga Jual", "Kategori"],
-            tablefmt="grid"
-        ))
+    tampilkan_berhalaman(lokasi, f"Produk di {lokasi.upper()}:", headers, format_baris,
+                         kriteria, ascending, kategori=filter_kategori)
 
 def menu_tampilkan_produk(lokasi):
     print(f"\n=== Tampilkan Produk di {lokasi.upper()} ===")
@@ -199,23 +127,24 @@ def menu_tampilkan_produk(lokasi):
 
     filter_kategori = None
     if opsi == "2":
+        # Kategori standar ditambah kategori lama yang masih dipakai produk
+        kategori_opsi = KATEGORI_OPSI + [k for k in store.daftar_kategori(lokasi) if k not in KATEGORI_OPSI]
         print("Pilih kategori:")
-        for i, kategori in enumerate(KATEGORI_OPSI):
+        for i, kategori in enumerate(kategori_opsi):
             print(f"{i+1}. {kategori}")
         try:
             idx = int(input("Masukkan nomor kategori: ")) - 1
-            if idx < 0 or idx >= len(KATEGORI_OPSI):
+            if idx < 0 or idx >= len(kategori_opsi):
                 print("Kategori tidak valid.")
                 return
-            filter_kategori = KATEGORI_OPSI[idx]
+            filter_kategori = kategori_opsi[idx]
         except ValueError:
             print("Input tidak valid.")
             return
 
-    urutan = input("Urutkan ascending (a) atau descending (d)? [a/d]: ").lower()
-    ascending = (urutan != "d")
+    kriteria, ascending = input_urutan()
 
-    tampilkan_produk(lokasi=lokasi, ascending=ascending, filter_kategori=filter_kategori)
+    tampilkan_produk(lokasi=lokasi, ascending=ascending, filter_kategori=filter_kategori, kriteria=kriteria)
 
 def menu_tampilan_produk_utama():
     while True:
@@ -242,7 +171,8 @@ def hitung_harga_diskon(harga, diskon):
 
 # -------------------- CETAK TOTAL STOK --------------------
 def cetak_total_stok():
-    data = load_data()
+    # Salinan per lokasi: penyapu latar bisa menghapus produk selama tabel dibangun
+    data = {lokasi: store.salinan(lokasi) for lokasi in ("gudang", "toko")}
     gabungan = {}
 
     # Proses data gudang
@@ -280,7 +210,7 @@ def cetak_total_stok():
         return
 
     produk_items = [(v["nama_asli"], v) for v in gabungan.values()]
-    sorted_produk = quick_sort(produk_items, True)
+    sorted_produk = urutkan_items(produk_items)
 
     tabel = []
     for nama, item in sorted_produk:
@@ -303,40 +233,31 @@ def cetak_total_stok():
     ))
 
 # -------------------- FUNGSI PENCARIAN PRODUK DI GUDANG --------------------
-def sequential_search(data_dict, produk_dicari):
-    for nama_produk in data_dict:
-        if nama_produk.lower() == produk_dicari.lower():
-            return nama_produk, data_dict[nama_produk]
-    return None
-
 def cari_produk_di_gudang():
     data = load_data()
     produk_dicari = input("Masukkan nama produk yang ingin dicari di GUDANG: ").strip()
-    hasil = sequential_search(data.get("gudang", {}), produk_dicari)
-    if hasil:
-        nama_asli, info = hasil
+    nama_asli = dapatkan_nama_asli("gudang", produk_dicari) or pilih_dari_saran("gudang", produk_dicari)
+    if nama_asli:
         print(f"\nProduk '{nama_asli}' ditemukan di GUDANG:")
-        for k, v in info.items():
+        for k, v in data["gudang"][nama_asli].items():
             print(f"  {k}: {v}")
     else:
         print(f"\nProduk '{produk_dicari}' tidak ditemukan di GUDANG.")
 
 # -------------------- FUNGSI HAPUS PRODUK DARI GUDANG --------------------
 def hapus_produk_dari_gudang(nama):
-    data = load_data()
-    nama_asli = dapatkan_nama_asli(data["gudang"], nama)
+    nama_asli = dapatkan_nama_asli("gudang", nama)
     if not nama_asli:
         print(f"Produk '{nama}' tidak ditemukan di gudang.")
         return
-    del data["gudang"][nama_asli]
-    save_data(data)
+    terapkan(mutasi_hapus("gudang", nama_asli))
     print(f"Produk '{nama_asli}' berhasil dihapus dari gudang.")
 
 # -------------------- FUNGSI EDIT PRODUK DI GUDANG --------------------
 def edit_produk_di_gudang():
     data = load_data()
     produk_dicari = input("Masukkan nama produk yang ingin diedit di GUDANG: ").strip()
-    nama_asli = dapatkan_nama_asli(data["gudang"], produk_dicari)
+    nama_asli = dapatkan_nama_asli("gudang", produk_dicari)
 
     if not nama_asli:
         print(f"Produk '{produk_dicari}' tidak ditemukan di gudang.")
@@ -369,11 +290,12 @@ def edit_produk_di_gudang():
         if pilihan == "1":
             nama_baru = input("Masukkan nama baru: ").strip().title()
             if nama_baru:
-                data["gudang"][nama_baru] = data["gudang"].pop(nama_asli)
+                mutasi = [mutasi_ganti_nama("gudang", nama_asli, nama_baru)]
 
                 # Rename di toko jika ada
                 if ada_di_toko:
-                    data["toko"][nama_baru] = data["toko"].pop(nama_asli)
+                    mutasi.append(mutasi_ganti_nama("toko", nama_asli, nama_baru))
+                terapkan(mutasi)
 
                 nama_asli = nama_baru
                 produk = data["gudang"][nama_asli]
@@ -383,7 +305,7 @@ def edit_produk_di_gudang():
             try:
                 stok_baru = int(input("Masukkan stok baru: ").strip())
                 if stok_baru >= 0:
-                    produk["stok"] = stok_baru
+                    terapkan(mutasi_set("gudang", nama_asli, "stok", stok_baru))
                     print("Stok berhasil diubah.")
                 else:
                     print("Stok tidak boleh negatif.")
@@ -397,9 +319,10 @@ def edit_produk_di_gudang():
             try:
                 idx = int(input("Masukkan nomor kategori: ")) - 1
                 if 0 <= idx < len(KATEGORI_OPSI):
-                    produk["kategori"] = KATEGORI_OPSI[idx]
+                    mutasi = [mutasi_set("gudang", nama_asli, "kategori", KATEGORI_OPSI[idx])]
                     if ada_di_toko:
-                        toko[nama_asli]["kategori"] = KATEGORI_OPSI[idx]
+                        mutasi.append(mutasi_set("toko", nama_asli, "kategori", KATEGORI_OPSI[idx]))
+                    terapkan(mutasi)
                     print("Kategori berhasil diubah.")
                 else:
                     print("Pilihan kategori tidak valid.")
@@ -410,9 +333,10 @@ def edit_produk_di_gudang():
             try:
                 harga_modal_baru = float(input("Masukkan harga modal baru: ").strip())
                 if harga_modal_baru > 0:
-                    produk["harga_modal"] = harga_modal_baru
+                    mutasi = [mutasi_set("gudang", nama_asli, "harga_modal", harga_modal_baru)]
                     if ada_di_toko:
-                        toko[nama_asli]["harga_modal"] = harga_modal_baru
+                        mutasi.append(mutasi_set("toko", nama_asli, "harga_modal", harga_modal_baru))
+                    terapkan(mutasi)
                     print("Harga modal berhasil diubah.")
                 else:
                     print("Harga modal harus lebih dari 0.")
@@ -423,9 +347,10 @@ def edit_produk_di_gudang():
             try:
                 harga_jual_baru = float(input("Masukkan harga jual baru: ").strip())
                 if harga_jual_baru > 0:
-                    produk["harga_jual"] = harga_jual_baru
+                    mutasi = [mutasi_set("gudang", nama_asli, "harga_jual", harga_jual_baru)]
                     if ada_di_toko:
-                        toko[nama_asli]["harga_jual"] = harga_jual_baru
+                        mutasi.append(mutasi_set("toko", nama_asli, "harga_jual", harga_jual_baru))
+                    terapkan(mutasi)
                     print("Harga jual berhasil diubah.")
                 else:
                     print("Harga jual harus lebih dari 0.")
@@ -437,117 +362,59 @@ def edit_produk_di_gudang():
             if tanggal_baru:
                 try:
                     datetime.strptime(tanggal_baru, '%Y-%m-%d')
-                    produk["tanggal_kadaluarsa"] = tanggal_baru
+                    mutasi = [mutasi_set("gudang", nama_asli, "tanggal_kadaluarsa", tanggal_baru)]
                     if ada_di_toko:
-                        toko[nama_asli]["tanggal_kadaluarsa"] = tanggal_baru
+                        mutasi.append(mutasi_set("toko", nama_asli, "tanggal_kadaluarsa", tanggal_baru))
+                    terapkan(mutasi)
                     print("Tanggal kadaluarsa berhasil diubah.")
                 except ValueError:
                     print("Format tanggal tidak valid.")
             else:
-                produk.pop("tanggal_kadaluarsa", None)
+                mutasi = [mutasi_set("gudang", nama_asli, "tanggal_kadaluarsa", None)]
                 if ada_di_toko:
-                    toko[nama_asli].pop("tanggal_kadaluarsa", None)
+                    mutasi.append(mutasi_set("toko", nama_asli, "tanggal_kadaluarsa", None))
+                terapkan(mutasi)
                 print("Tanggal kadaluarsa dihapus.")
 
         else:
             print("Pilihan tidak valid.")
 
-    save_data(data)
     print(f"\nProduk '{nama_asli}' berhasil diperbarui.")
 
 
-# -------------------- LOAD DATA ANTREAN.JSON --------------------
-def load_antrean():
-    if not os.path.exists(ANTREAN_PATH):
-        with open(ANTREAN_PATH, 'w') as f:
-            json.dump([], f)
-    with open(ANTREAN_PATH, 'r') as f:
-        return json.load(f)
+# -------------------- LOAD DATA ARSIP PESANAN --------------------
+def load_antrean(start_date=None, end_date=None):
+    """Pesanan terkonfirmasi dari partisi arsip yang beririsan dengan rentang tanggal."""
+    return list(arsip.baca_rentang(start_date, end_date))
     
-# -------------------- PILIH RENTANG WAKTU --------------------
-def pilih_rentang_waktu():
-    while True:
-        print("\n=== PILIH RENTANG WAKTU ===")
-        print("1. Hari ini")
-        print("2. Kemarin")
-        print("3. 7 hari terakhir")
-        print("4. 30 hari terakhir")
-        print("5. Bulan ini")
-        print("6. Bulan lalu")
-        print("7. Rentang tanggal kustom")
-        print("8. Semua waktu")
-        print("0. Kembali")
-        pilihan = input("Pilih opsi (0-8): ").strip()
-        today = datetime.now()
-        today_start = datetime(today.year, today.month, today.day)
-        if pilihan == "0":
-            return None, None
-        elif pilihan == "1":  
-            return today_start, today_start + timedelta(days=1)
-        elif pilihan == "2":  
-            yesterday = today_start - timedelta(days=1)
-            return yesterday, today_start
-        elif pilihan == "3":  
-            return today_start - timedelta(days=7), today_start + timedelta(days=1)
-        elif pilihan == "4":  
-            return today_start - timedelta(days=30), today_start + timedelta(days=1)
-        elif pilihan == "5":  
-            start_of_month = datetime(today.year, today.month, 1)
-            return start_of_month, today_start + timedelta(days=1)
-        elif pilihan == "6":  
-            if today.month == 1:
-                start_of_last_month = datetime(today.year - 1, 12, 1)
-                end_of_last_month = datetime(today.year, 1, 1)
-            else:
-                start_of_last_month = datetime(today.year, today.month - 1, 1)
-                end_of_last_month = datetime(today.year, today.month, 1)
-            return start_of_last_month, end_of_last_month
-        elif pilihan == "7":  
-            try:
-                print("\nMasukkan rentang tanggal (format: DD-MM-YYYY)")
-                tanggal_awal = input("Tanggal awal: ").strip()
-                tanggal_akhir = input("Tanggal akhir: ").strip()
-                start_date = datetime.strptime(tanggal_awal, "%d-%m-%Y")
-                end_date = datetime.strptime(tanggal_akhir, "%d-%m-%Y") + timedelta(days=1)  # Include the end date
-                return start_date, end_date
-            except ValueError:
-                print("\nFormat tanggal tidak valid. Gunakan format DD-MM-YYYY.")
-                continue
-        elif pilihan == "8":  
-            return None, None
-        else:
-            print("Pilihan tidak valid. Silakan coba lagi.")
-
 # -------------------- FILTER PESANAN BERDASARKAN RENTANG TANGGAL --------------------
 def filter_pesanan_by_date_range(pesanan_list, start_date, end_date):
     if start_date is None and end_date is None:
-        return pesanan_list
-    filtered_pesanan = []
-    for pesanan in pesanan_list:
-        try:
-            pesanan_date = datetime.strptime(pesanan['waktu'], "%Y-%m-%d %H:%M:%S")
-            if (start_date is None or pesanan_date >= start_date) and (end_date is None or pesanan_date < end_date):
-                filtered_pesanan.append(pesanan)
-        except (ValueError, KeyError):
-            continue  
-    return filtered_pesanan
+        return list(pesanan_list)
+    # Rentang dipotong dengan bisect atas field ts (detik epoch), tanpa parsing string
+    return potong_rentang([pesanan for pesanan in pesanan_list if pesanan.get('waktu')], start_date, end_date)
 
 # -------------------- FUNGSI LAPORAN PENJUALAN (DENGAN KEUNTUNGAN) --------------------
 def lihat_laporan_penjualan():
     print("\n=== LAPORAN PENJUALAN ===")
-    start_date, end_date = pilih_rentang_waktu()
-    if start_date is None and end_date is None and not isinstance(start_date, datetime):
+    rentang = pilih_rentang_waktu()
+    if rentang is None:
         print("Kembali ke menu utama.")
         return
+    start_date, end_date = rentang
 
     if start_date is None and end_date is None:
         print("\nMenampilkan laporan untuk: SEMUA WAKTU")
     else:
         print(f"\nMenampilkan laporan untuk periode: {start_date.strftime('%d-%m-%Y')} hingga {(end_date - timedelta(days=1)).strftime('%d-%m-%Y')}")
 
-    antrean = load_antrean()
-    antrean_confirmed = [p for p in antrean if p['status'] == "confirmed"]
-    filtered_pesanan = filter_pesanan_by_date_range(antrean_confirmed, start_date, end_date)
+    def hitung_transaksi():
+        antrean_list = load_antrean(start_date, end_date)
+        antrean_confirmed = [p for p in antrean_list if p['status'] == "confirmed"]
+        return filter_pesanan_by_date_range(antrean_confirmed, start_date, end_date)
+
+    # Hasil di-cache per rentang sampai ada pesanan baru dikonfirmasi atau inventaris berubah
+    filtered_pesanan = cache_laporan.ambil("transaksi", start_date, end_date, hitung_transaksi)
 
     if not filtered_pesanan:
         print("Tidak ada pesanan terkonfirmasi dalam rentang waktu yang dipilih.")
@@ -578,51 +445,14 @@ def lihat_laporan_penjualan():
     print("----------------------------------")
     print(f"Jumlah Transaksi: {len(filtered_pesanan)}")
 
-    total_per_produk = {}
-    total_per_kategori = {}
-    untung_per_produk = {}
-    total_keseluruhan = 0
-    total_untung = 0
-
-    data = load_data()
-    produk_toko = data.get("toko", {})
-
-    for pesanan in filtered_pesanan:
-        subtotal_transaksi = 0
-        for item in pesanan['pesanan']:
-            nama_produk = item['produk']
-            jumlah = item['jumlah']
-            harga_satuan = item['harga_satuan']
-            diskon = item['diskon']
-            harga_diskon = harga_satuan * (1 - diskon / 100)
-            subtotal = jumlah * harga_diskon
-            subtotal_transaksi += subtotal
-
-            # Total per produk
-            if nama_produk not in total_per_produk:
-                total_per_produk[nama_produk] = {'jumlah': 0, 'total_harga': 0}
-            total_per_produk[nama_produk]['jumlah'] += jumlah
-            total_per_produk[nama_produk]['total_harga'] += subtotal
-
-            # Dapatkan kategori
-            kategori = "Tidak terkategori"
-            nama_asli = dapatkan_nama_asli(produk_toko, nama_produk)
-            if nama_asli and 'kategori' in produk_toko.get(nama_asli, {}):
-                kategori = produk_toko[nama_asli]['kategori']
-            if kategori not in total_per_kategori:
-                total_per_kategori[kategori] = {'jumlah': 0, 'total_harga': 0}
-            total_per_kategori[kategori]['jumlah'] += jumlah
-            total_per_kategori[kategori]['total_harga'] += subtotal
-
-            # Hitung keuntungan
-            harga_beli = produk_toko.get(nama_asli, {}).get('harga_beli', 0)
-            untung = (harga_diskon - harga_beli) * jumlah
-            total_untung += untung
-            if nama_produk not in untung_per_produk:
-                untung_per_produk[nama_produk] = 0
-            untung_per_produk[nama_produk] += untung
-
-        total_keseluruhan += subtotal_transaksi
+    # Ringkasan dijumlahkan dari rollup harian, bukan dari setiap baris pesanan;
+    # keuntungan = margin yang dicatat di rollup (modal diambil dari baris pesanan)
+    ringkasan = ambil_ringkasan(start_date, end_date)
+    total_per_produk = ringkasan['produk']
+    total_per_kategori = ringkasan['kategori']
+    untung_per_produk = {nama: info['margin'] for nama, info in total_per_produk.items()}
+    total_keseluruhan = ringkasan['total']['total_harga']
+    total_untung = ringkasan['total']['margin']
 
     # Tampilkan ringkasan per produk
     print("\nRINGKASAN PENJUALAN PER PRODUK:")
@@ -637,15 +467,19 @@ def lihat_laporan_penjualan():
 
     # Tampilkan ringkasan per kategori
     print("\nRINGKASAN PENJUALAN PER KATEGORI:")
-    header = ["Kategori", "Jumlah Terjual", "Total Penjualan", "Persentase"]
+    header = ["Kategori", "Jumlah Terjual", "Total Penjualan", "Persentase", "Stok Toko", "Nilai Stok (Modal)"]
     table_data = []
+    stok_kategori = store.ringkasan_kategori("toko")
     for kategori, info in total_per_kategori.items():
         persentase = (info['total_harga'] / total_keseluruhan * 100) if total_keseluruhan > 0 else 0
+        stok = stok_kategori.get(None if kategori == "Tidak terkategori" else kategori, {})
         table_data.append([
             kategori,
             info['jumlah'],
             f"Rp {info['total_harga']:,.2f}",
-            f"{persentase:.2f}%"
+            f"{persentase:.2f}%",
+            stok.get('stok', 0),
+            f"Rp {stok.get('nilai_modal', 0):,.2f}"
         ])
     print(tabulate(table_data, headers=header, tablefmt="grid"))
 
@@ -668,11 +502,21 @@ def lihat_laporan_penjualan():
             total_keseluruhan,
             start_date,
             end_date,
-            untung_per_produk,
-            total_untung
+            dimensi_pesanan(filtered_pesanan)
         )
+
+# -------------------- BANGUN ULANG ROLLUP PENJUALAN --------------------
+def bangun_ulang_rollup():
+    """Bangun ulang ringkasan penjualan harian dari arsip pesanan."""
+    konfirmasi = input("Bangun ulang ringkasan penjualan dari arsip? (y/n): ").strip().lower()
+    if konfirmasi != "y":
+        print("Dibatalkan.")
+        return
+    jumlah = rollup.bangun_ulang()
+    print(f"Ringkasan penjualan dibangun ulang dari {jumlah} pesanan terarsip.")
+
 # -------------------- EKSPORT LAPORAN KE CSV --------------------
-def export_laporan_to_csv(pesanan_list, total_per_produk, total_per_kategori, total_keseluruhan, start_date, end_date, produk_dict):
+def export_laporan_to_csv(pesanan_list, total_per_produk, total_per_kategori, total_keseluruhan, start_date, end_date, dimensi):
     import csv
     from datetime import datetime, timedelta
     import os
@@ -693,6 +537,13 @@ def export_laporan_to_csv(pesanan_list, total_per_produk, total_per_kategori, to
     filename = f"laporan_penjualan_{period}_{timestamp}.csv"
 
     total_laba = 0  # TAMBAHAN: untuk menghitung total laba
+    # Daftar produk terlaris / paling lambat untuk ekspor, dipilih dengan heap (lihat peringkat_produk)
+    produk_toko = store.salinan("toko")
+    daftar_peringkat = [
+        (f"{JUMLAH_PERINGKAT} PRODUK TERLARIS", peringkat_produk(total_per_produk)),
+        (f"{JUMLAH_PERINGKAT} PRODUK PALING LAMBAT",
+         peringkat_produk(total_per_produk, terbawah=True, produk_lain=produk_toko)),
+    ]
 
     try:
         try:
@@ -771,15 +622,10 @@ def export_laporan_to_csv(pesanan_list, total_per_produk, total_per_kategori, to
                     for item in pesanan['pesanan']:
                         harga_diskon = item['harga_satuan'] * (1 - item['diskon']/100)
                         subtotal = harga_diskon * item['jumlah']
-                        modal_satuan = produk_dict.get(item['produk'], {}).get('harga_modal', 0)
+                        modal_satuan = item.get('harga_modal', dimensi[item['produk']]['harga_modal'])
                         laba = (harga_diskon - modal_satuan) * item['jumlah']
                         total_laba += laba
-                        waktu = pesanan['waktu']
-                        if isinstance(waktu, str):
-                            try:
-                                waktu = datetime.strptime(waktu, "%Y-%m-%d %H:%M:%S")
-                            except:
-                                pass
+                        waktu = datetime.fromtimestamp(epoch_pesanan(pesanan))
                         worksheet.write(row, 0, transaction_idx, text_format)
                         worksheet.write(row, 1, pesanan['nama_pembeli'], text_format)
                         if isinstance(waktu, datetime):
@@ -807,6 +653,21 @@ def export_laporan_to_csv(pesanan_list, total_per_produk, total_per_kategori, to
                     worksheet.write(row, 2, info['total_harga'], currency_format)
                     row += 1
                 row += 1
+                # Produk terlaris dan paling lambat (berdasarkan jumlah terjual)
+                for judul, peringkat in daftar_peringkat:
+                    worksheet.write(row, 0, judul, subheader_format)
+                    row += 1
+                    for col, header in enumerate(['No.', 'Produk', 'Jumlah Terjual', 'Total Penjualan', 'Keuntungan']):
+                        worksheet.write(row, col, header, header_format)
+                    row += 1
+                    for idx, (produk, info) in enumerate(peringkat, 1):
+                        worksheet.write(row, 0, idx, text_format)
+                        worksheet.write(row, 1, produk, text_format)
+                        worksheet.write(row, 2, info['jumlah'], number_format)
+                        worksheet.write(row, 3, info['total_harga'], currency_format)
+                        worksheet.write(row, 4, info['margin'], currency_format)
+                        row += 1
+                    row += 1
                 worksheet.write(row, 0, 'RINGKASAN PER KATEGORI', subheader_format)
                 row += 1
                 cat_headers = ['Kategori', 'Jumlah Terjual', 'Total Penjualan', 'Persentase']
@@ -867,18 +728,11 @@ def export_laporan_to_csv(pesanan_list, total_per_produk, total_per_kategori, to
                 for item in pesanan['pesanan']:
                     harga_diskon = item['harga_satuan'] * (1 - item['diskon']/100)
                     subtotal = harga_diskon * item['jumlah']
-                    modal_satuan = produk_dict.get(item['produk'], {}).get('harga_modal', 0)
+                    modal_satuan = item.get('harga_modal', dimensi[item['produk']]['harga_modal'])
                     laba = (harga_diskon - modal_satuan) * item['jumlah']
                     total_laba += laba
-                    waktu = pesanan['waktu']
-                    if isinstance(waktu, str):
-                        try:
-                            dt = datetime.strptime(waktu, "%Y-%m-%d %H:%M:%S")
-                            waktu_formatted = f'"{dt.strftime("%d-%m-%Y %H:%M:%S")}"'
-                        except:
-                            waktu_formatted = f'"{waktu}"'
-                    else:
-                        waktu_formatted = f'"{waktu}"'
+                    dt = datetime.fromtimestamp(epoch_pesanan(pesanan))
+                    waktu_formatted = f'"{dt.strftime("%d-%m-%Y %H:%M:%S")}"'
                     writer.writerow([
                         transaction_idx,
                         pesanan['nama_pembeli'],
@@ -902,6 +756,20 @@ def export_laporan_to_csv(pesanan_list, total_per_produk, total_per_kategori, to
                     "", "", "", "", "", ""
                 ])
             writer.writerow([])
+            # Produk terlaris dan paling lambat (berdasarkan jumlah terjual)
+            for judul, peringkat in daftar_peringkat:
+                writer.writerow([judul, "", "", "", "", "", "", "", ""])
+                writer.writerow(["No.", "Produk", "Jumlah Terjual", "Total Penjualan", "Keuntungan", "", "", "", ""])
+                for idx, (produk, info) in enumerate(peringkat, 1):
+                    writer.writerow([
+                        idx,
+                        produk,
+                        info['jumlah'],
+                        format_number(info['total_harga']),
+                        format_number(info['margin']),
+                        "", "", "", ""
+                    ])
+                writer.writerow([])
             writer.writerow(["RINGKASAN PER KATEGORI", "", "", "", "", "", "", "", ""])
             writer.writerow(["Kategori", "Jumlah Terjual", "Total Penjualan", "Persentase", "", "", "", "", ""])
             for kategori, info in total_per_kategori.items():
@@ -955,17 +823,18 @@ def super_admin_menu():
         print("6. Hapus produk dari gudang")
         print("7. Lihat laporan penjualan")
         print("8. Periksa produk kadaluarsa")
+        print("9. Bangun ulang ringkasan penjualan")
+        print("10. Produk terlaris & paling lambat")
         print("0. Kembali ke menu utama")
-        pilihan = input("Pilih menu (0-8): ").strip()
+        pilihan = input("Pilih menu (0-10): ").strip()
         
         if pilihan == "0":
             break
         elif pilihan == "1":
             nama = input("Nama produk: ").strip()
-            data = load_data()
             try:
                 stok = int(input("Stok awal: "))    
-                if cari_nama_produk(data["gudang"], nama):
+                if cari_nama_produk("gudang", nama):
                     tambah_produk_ke_gudang(nama, stok)
                 else:
                     harga_modal = float(input("Harga Modal: "))
@@ -999,6 +868,10 @@ def super_admin_menu():
                 print("Pemeriksaan kadaluarsa selesai.")
             else:
                 print("Tidak ada produk yang kadaluarsa.")
+        elif pilihan == "9":
+            bangun_ulang_rollup()
+        elif pilihan == "10":
+            lihat_produk_terlaris()
         else:
             print("Pilihan tidak valid. Coba lagi.")
 
@@ -0,0 +1,128 @@
+import os
+import threading
+from datetime import datetime, timedelta
+
+from inventory_store import store, mutasi_hapus, mutasi_stok
+from order_queue import antrean
+from order_archive import epoch
+
+# Folder dan File paths
+DATA_FOLDER = "Data"
+LOG_AKTIVITAS_PATH = os.path.join(DATA_FOLDER, "aktivitas.log")
+
+# Penyapu latar belakang (opsional): bersihkan produk kadaluarsa dan pesanan
+# yang tidak dikonfirmasi secara berkala, tanpa menunggu admin membuka menu.
+PENYAPU_AKTIF = False
+PENYAPU_INTERVAL_MENIT = 30
+BATAS_PESANAN_JAM = 12   # pesanan belum dikonfirmasi lebih lama dari ini dihapus
+
+
+# -------------------- LOG AKTIVITAS --------------------
+_log_lock = threading.Lock()
+
+def catat_aktivitas(pesan, sumber="sistem"):
+    """Tambahkan satu baris bertanggal ke log aktivitas."""
+    waktu = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    with _log_lock:
+        folder = os.path.dirname(LOG_AKTIVITAS_PATH)
+        if folder and not os.path.exists(folder):
+            os.makedirs(folder)
+        with open(LOG_AKTIVITAS_PATH, 'a', encoding='utf-8') as f:
+            f.write(f"{waktu} [{sumber}] {pesan}\n")
+
+
+# -------------------- SAPUAN --------------------
+def sapu_kadaluarsa(hari_ini=None):
+    """
+    Hapus produk gudang dan toko yang sudah kadaluarsa dalam satu transaksi.
+    Mengembalikan {"gudang": [nama, ...], "toko": [nama, ...]}.
+    """
+    hari_ini = hari_ini or datetime.now().strftime('%Y-%m-%d')
+    with store.lock:
+        dihapus = {lokasi: store.produk_kadaluarsa(lokasi, hari_ini) for lokasi in ("gudang", "toko")}
+        mutasi = [mutasi_hapus(lokasi, nama) for lokasi, daftar in dihapus.items() for nama in daftar]
+        if mutasi:
+            store.terapkan(mutasi)
+    return dihapus
+
+def sapu_pesanan_kedaluwarsa(sekarang=None):
+    """
+    Hapus pesanan yang belum dikonfirmasi lebih dari BATAS_PESANAN_JAM dan
+    kembalikan stok toko yang dipesan dalam satu tulisan inventaris.
+    Pesanan pending urut waktu, jadi sapuan berhenti di pesanan pertama yang
+    belum kedaluwarsa dan langsung selesai jika pesanan tertua masih berlaku.
+    Stok produk yang sudah tidak ada di toko (habis lalu dihapus, atau
+    kadaluarsa) tidak dibuat ulang; jumlahnya dicatat di log aktivitas.
+    """
+    batas = epoch((sekarang or datetime.now()) - timedelta(hours=BATAS_PESANAN_JAM))
+    tertua = antrean.ts_pending_tertua()
+    if tertua is None or tertua >= batas:
+        return []
+    with antrean.lock:
+        seqs = antrean.pending_sebelum(batas)
+        dihapus = [antrean.lihat(seq) for seq in seqs]
+        antrean.hapus_banyak(seqs)
+    kembali = {}
+    for order in dihapus:
+        for item in order.get('pesanan', []):
+            kembali[item['produk']] = kembali.get(item['produk'], 0) + item['jumlah']
+    if kembali:
+        with store.lock:
+            koleksi = store.load().get("toko", {})
+            hilang = {nama: jumlah for nama, jumlah in kembali.items() if nama not in koleksi}
+            mutasi = [mutasi_stok("toko", nama, jumlah) for nama, jumlah in kembali.items() if nama in koleksi]
+            if mutasi:
+                store.terapkan(mutasi)
+        for nama, jumlah in hilang.items():
+            catat_aktivitas(f"Stok {jumlah} '{nama}' dari pesanan kedaluwarsa tidak dikembalikan: "
+                            f"produk sudah tidak ada di toko")
+    return dihapus
+
+# -------------------- PENYAPU LATAR BELAKANG --------------------
+class PenyapuLatar:
+    """
+    Thread daemon yang menjalankan sapuan kadaluarsa dan pembersihan pesanan
+    setiap interval. Lock store hanya dipegang selama satu sapuan, dan hasil
+    sapuan ditulis ke log aktivitas (bukan ke layar, agar menu tidak terganggu).
+    """
+    def __init__(self, interval_menit=PENYAPU_INTERVAL_MENIT):
+        self.interval_menit = interval_menit
+        self._thread = None
+        self._berhenti = threading.Event()
+
+    def jalankan_sekali(self):
+        dihapus = sapu_kadaluarsa()
+        for lokasi, daftar in dihapus.items():
+            for nama in daftar:
+                catat_aktivitas(f"Produk '{nama}' di {lokasi} kadaluarsa dan dihapus", "penyapu")
+        for order in sapu_pesanan_kedaluwarsa():
+            catat_aktivitas(f"Pesanan kedaluwarsa dihapus: {order['nama_pembeli']} - {order['waktu']}", "penyapu")
+
+    def _loop(self):
+        while not self._berhenti.is_set():
+            try:
+                self.jalankan_sekali()
+            except Exception as e:
+                # Thread tetap hidup; kesalahan apa pun dicatat dan sapuan dicoba lagi di interval berikutnya
+                catat_aktivitas(f"Sapuan gagal: {type(e).__name__}: {e}", "penyapu")
+            self._berhenti.wait(self.interval_menit * 60)
+
+    def mulai(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._berhenti.clear()
+        self._thread = threading.Thread(target=self._loop, name="penyapu-kadaluarsa", daemon=True)
+        self._thread.start()
+        catat_aktivitas(f"Penyapu latar dimulai (interval {self.interval_menit} menit)", "penyapu")
+
+    def hentikan(self):
+        self._berhenti.set()
+
+
+# Global sweeper instance
+penyapu = PenyapuLatar()
+
+def mulai_penyapu():
+    """Jalankan penyapu latar jika diaktifkan di konfigurasi."""
+    if PENYAPU_AKTIF:
+        penyapu.mulai()
@@ -1,139 +1,51 @@
-import json
-import os
 import uuid
-from datetime import datetime, timedelta
+from datetime import datetime
 from tabulate import tabulate
-from collections import deque
+from inventory_store import store, load_data, terapkan, mutasi_stok
+from order_queue import antrean
+from order_archive import arsip, epoch, FORMAT_WAKTU
+from product_sort import input_urutan, tampilkan_berhalaman
+from product_search import pilih_dari_saran
+from sweeper import sapu_pesanan_kedaluwarsa
 
 # Folder dan File paths
 DATA_FOLDER = "Data"
-FILE_PATH = os.path.join(DATA_FOLDER, "inv.json")
-ANTREAN_PATH = os.path.join(DATA_FOLDER, "antrean.json")
 KATEGORI_OPSI = ["Makanan", "Minuman", "Elektronik"]
 
 # -------------------- FUNGSI FILE HANDLING --------------------
-def init_file():
-    if not os.path.exists(DATA_FOLDER):
-        os.makedirs(DATA_FOLDER)
-    if not os.path.exists(FILE_PATH):
-        with open(FILE_PATH, 'w') as f:
-            json.dump({"gudang": {}, "toko": {}}, f, indent=4)
-
-def load_data():
-    init_file()
-    with open(FILE_PATH, 'r') as f:
-        return json.load(f)
-
-def save_data(data):
-    with open(FILE_PATH, 'w') as f:
-        json.dump(data, f, indent=4)
-
-def cari_nama_produk(koleksi, nama):
-    nama_lower = nama.lower()
-    return any(nama_lower == key.lower() for key in koleksi)
-
-def dapatkan_nama_asli(koleksi, nama):
-    nama_lower = nama.lower()
-    for key in koleksi:
-        if key.lower() == nama_lower:
-            return key
-    return None
-
-
-# -------------------- CLASS QUEQUE --------------------
-class FIFOQueue:
-    """
-    A FIFO (First In, First Out) queue implementation using deque.
-    """
-    def __init__(self):
-        self.queue = deque()
-    
-    def enqueue(self, item):
-        """Add an item to the rear of the queue."""
-        self.queue.append(item)
-    
-    def dequeue(self):
-        """Remove and return an item from the front of the queue."""
-        if self.is_empty():
-            raise IndexError("Queue is empty")
-        return self.queue.popleft()
-    
-    def peek(self):
-        """Return the front item without removing it."""
-        if self.is_empty():
-            raise IndexError("Queue is empty")
-        return self.queue[0]
-    
-    def is_empty(self):
-        """Check if the queue is empty."""
-        return len(self.queue) == 0
-    
-    def size(self):
-        """Return the number of items in the queue."""
-        return len(self.queue)
-    
-    def to_list(self):
-        """Convert queue to list for JSON serialization."""
-        return list(self.queue)
-    
-    def from_list(self, items):
-        """Load queue from a list."""
-        self.queue = deque(items)
-
-# Global queue instance
-antrean_queue = FIFOQueue()
-
-# -------------------- QUICK SORT --------------------
-def quick_sort(arr, ascending=True):
-    if len(arr) <= 1:
-        return arr
-    pivot = arr[0]
-    pivot_key = pivot[0].lower()
-    left = [item for item in arr[1:] if (item[0].lower() <= pivot_key) == ascending]
-    right = [item for item in arr[1:] if (item[0].lower() > pivot_key) == ascending]
-    return quick_sort(left, ascending) + [pivot] + quick_sort(right, ascending)
+def cari_nama_produk(lokasi, nama):
+    return store.cari_nama_asli(lokasi, nama) is not None
 
+def dapatkan_nama_asli(lokasi, nama):
+    return store.cari_nama_asli(lokasi, nama)
+
+
+# -------------------- TAMPILKAN PRODUK --------------------
 def hitung_harga_diskon(harga, diskon):
     return harga * (1 - diskon / 100)
 
-def tampilkan_produk_toko(ascending=True, filter_kategori=None):
+def tampilkan_produk_toko(ascending=True, filter_kategori=None, kriteria="nama"):
     """
     Menampilkan daftar produk di toko dengan opsi pengurutan dan filter kategori.
     """
-    data = load_data()
-    produk_list = data.get("toko", {})
-    filtered = {
-        k: v for k, v in produk_list.items()
-        if (filter_kategori is None or v["kategori"] == filter_kategori) and v["stok"] > 0
-    }
-
-    produk_items = list(filtered.items())
-    sorted_produk = quick_sort(produk_items, ascending)
-
-    if not sorted_produk:
-        print("Tidak ada produk yang tersedia.")
-        return
-
-    tabel = []
-    for nama, info in sorted_produk:
+    def format_baris(nama, info):
         harga_asli = info.get('harga_jual', 0)  # ✅ Perbaikan di sini
         diskon = info.get('diskon', 0)
         harga_diskon = hitung_harga_diskon(harga_asli, diskon)
-
-        tabel.append([
+        return [
             nama,
             info.get('stok', 0),
             f"Rp {harga_asli:,.2f}",
             f"{diskon}%",
             f"Rp {harga_diskon:,.2f}"
-        ])
+        ]
 
-    print("\n=== DAFTAR PRODUK TERSEDIA ===")
-    print(tabulate(
-        tabel,
-        headers=["Nama", "Stok", "Harga", "Diskon", "Harga Setelah Diskon"],
-        tablefmt="grid"
-    ))
+    tampilkan_berhalaman(
+        "toko", "=== DAFTAR PRODUK TERSEDIA ===",
+        ["Nama", "Stok", "Harga", "Diskon", "Harga Setelah Diskon"], format_baris,
+        kriteria, ascending, lambda info: info["stok"] > 0, filter_kategori,
+        pesan_kosong="Tidak ada produk yang tersedia."
+    )
 
 
 def menu_tampilkan_produk():
@@ -151,37 +63,29 @@ def menu_tampilkan_produk():
 
     filter_kategori = None
     if opsi == "2":
-        if not KATEGORI_OPSI:
+        # Kategori standar ditambah kategori lama yang masih dipakai produk
+        kategori_opsi = KATEGORI_OPSI + [k for k in store.daftar_kategori("toko") if k not in KATEGORI_OPSI]
+        if not kategori_opsi:
             print("Belum ada kategori yang tersedia.")
             return
         print("Pilih kategori:")
-        for i, kategori in enumerate(KATEGORI_OPSI):
+        for i, kategori in enumerate(kategori_opsi):
             print(f"{i+1}. {kategori}")
         try:
             idx = int(input("Masukkan nomor kategori: ")) - 1
-            if idx < 0 or idx >= len(KATEGORI_OPSI):
+            if idx < 0 or idx >= len(kategori_opsi):
                 print("Kategori tidak valid.")
                 return
-            filter_kategori = KATEGORI_OPSI[idx]
+            filter_kategori = kategori_opsi[idx]
         except ValueError:
             print("Input tidak valid.")
             return
 
-    urutan = input("Urutkan nama ascending (a) atau descending (d)? [a/d]: ").lower()
-    ascending = (urutan != "d")
+    kriteria, ascending = input_urutan()
 
-    tampilkan_produk_toko(ascending=ascending, filter_kategori=filter_kategori)
+    tampilkan_produk_toko(ascending=ascending, filter_kategori=filter_kategori, kriteria=kriteria)
 
 # -------------------- PENCARIAN PRODUK --------------------
-def sequential_search(data_dict, produk_dicari):
-    """
-    Melakukan pencarian produk dengan algoritma sequential search.
-    """
-    for nama_produk in data_dict:
-        if nama_produk.lower() == produk_dicari.lower():
-            return nama_produk, data_dict[nama_produk]
-    return None, None
-
 def cari_produk():
     """
     Mencari produk di toko berdasarkan nama.
@@ -189,9 +93,10 @@ def cari_produk():
     data = load_data()
     toko = data.get("toko", {})
     produk_dicari = input("Masukkan nama produk yang ingin dicari: ").strip()
-    nama_asli, hasil = sequential_search(toko, produk_dicari)
+    nama_asli = dapatkan_nama_asli("toko", produk_dicari) or pilih_dari_saran("toko", produk_dicari)
     
-    if hasil:
+    if nama_asli:
+        hasil = toko[nama_asli]
         harga_jual = hasil.get('harga_jual', 0)
         diskon = hasil.get('diskon', 0)
         harga_diskon = hitung_harga_diskon(harga_jual, diskon)
@@ -306,7 +211,7 @@ def tambah_ke_keranjang(keranjang):
     toko = data.get("toko", {})
     
     nama = input("Masukkan nama produk yang ingin dibeli: ").strip()
-    nama_asli = dapatkan_nama_asli(toko, nama)
+    nama_asli = dapatkan_nama_asli("toko", nama)
     
     if not nama_asli:
         print(f"Produk '{nama}' tidak ditemukan.")
@@ -357,7 +262,7 @@ def kelola_keranjang(keranjang):
         
         if pilihan == "1":
             nama = input("Masukkan nama produk yang ingin diubah: ").strip()
-            nama_asli = dapatkan_nama_asli(toko, nama)
+            nama_asli = dapatkan_nama_asli("toko", nama)
             
             if not nama_asli or nama_asli not in keranjang.items:
                 print(f"Produk '{nama}' tidak ada di keranjang.")
@@ -382,7 +287,7 @@ def kelola_keranjang(keranjang):
         
         elif pilihan == "2":
             nama = input("Masukkan nama produk yang ingin dihapus: ").strip()
-            nama_asli = dapatkan_nama_asli(toko, nama)
+            nama_asli = dapatkan_nama_asli("toko", nama)
             
             if not nama_asli or nama_asli not in keranjang.items:
                 print(f"Produk '{nama}' tidak ada di keranjang.")
@@ -407,43 +312,10 @@ def kelola_keranjang(keranjang):
 
 import uuid
 
-def init_antrean_file():
-    """
-    Inisialisasi file antrean jika belum ada.
-    """
-    if not os.path.exists(ANTREAN_PATH):
-        with open(ANTREAN_PATH, 'w') as f:
-            json.dump([], f, indent=4)
-
-def load_antrean():
-    """
-    Memuat data antrean dari file ke FIFO queue.
-    """
-    global antrean_queue
-    init_antrean_file()
-    with open(ANTREAN_PATH, 'r') as f:
-        content = f.read().strip()
-        if not content:
-            antrean_queue = FIFOQueue()
-        else:
-            data = json.loads(content)
-            antrean_queue = FIFOQueue()
-            antrean_queue.from_list(data)
-    return antrean_queue
-
-def save_antrean():
-    """
-    Menyimpan data antrean dari FIFO queue ke file.
-    """
-    global antrean_queue
-    with open(ANTREAN_PATH, 'w') as f:
-        json.dump(antrean_queue.to_list(), f, indent=4)
-
 def checkout(keranjang, nama_pelanggan):
     """
     Proses checkout dan membuat pesanan.
     """
-    global antrean_queue
     clean_expired_orders()
     if not keranjang.items:
         print("Keranjang belanja kosong. Tidak dapat melakukan checkout.")
@@ -471,30 +343,27 @@ def checkout(keranjang, nama_pelanggan):
             "produk": nama_produk,
             "jumlah": info["jumlah"],
             "harga_satuan": info["harga_satuan"],
-            "diskon": info["diskon"]
+            "diskon": info["diskon"],
+            # Harga modal saat checkout, agar laba rugi tidak bergantung pada inventaris terkini
+            "harga_modal": data["toko"][nama_produk].get("harga_modal", 0)
         })
 
+    sekarang = datetime.now()
     pesanan = {
         "id_pesanan": str(uuid.uuid4()),  # ID unik
         "nama_pembeli": nama_pelanggan,
-        "waktu": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "waktu": sekarang.strftime(FORMAT_WAKTU),
+        "ts": epoch(sekarang),  # detik epoch, untuk filter waktu tanpa parsing string
         "pesanan": daftar_pesanan,
         "status": "not confirmed"
     }
 
     # Kurangi stok di toko
-    for item in daftar_pesanan:
-        nama_produk = item["produk"]
-        if nama_produk in data["toko"]:
-            data["toko"][nama_produk]["stok"] -= item["jumlah"]
-
-    # Load queue, add pesanan to queue (FIFO)
-    load_antrean()
-    antrean_queue.enqueue(pesanan)
+    mutasi = [mutasi_stok("toko", item["produk"], -item["jumlah"]) for item in daftar_pesanan]
 
-    # Simpan perubahan
-    save_data(data)
-    save_antrean()
+    # Simpan perubahan, lalu tambahkan pesanan ke akhir antrean (FIFO)
+    terapkan(mutasi)
+    antrean.enqueue(pesanan)
 
     print("\n=== CHECKOUT BERHASIL ===")
     print("Pesanan Anda telah diterima dan menunggu konfirmasi dari admin.")
@@ -502,7 +371,7 @@ def checkout(keranjang, nama_pelanggan):
     print(f"Nama Pembeli: {nama_pelanggan}")
     print(f"Waktu: {pesanan['waktu']}")
     print("Status: Menunggu konfirmasi")
-    print(f"Posisi dalam antrean: {antrean_queue.size()}")
+    print(f"Posisi dalam antrean: {antrean.jumlah_pending()}")
 
     # Kosongkan keranjang
     keranjang.kosongkan_keranjang()
@@ -512,32 +381,23 @@ def lihat_status_pesanan(nama_pelanggan):
     """
     Melihat status pesanan berdasarkan nama pelanggan.
     """
-    global antrean_queue
     clean_expired_orders()
-    load_antrean()
 
-    pesanan_pelanggan = []
-    queue_list = antrean_queue.to_list()
-
-    for pesanan in queue_list:
-        if pesanan['nama_pembeli'].lower() == nama_pelanggan.lower():
-            pesanan_pelanggan.append(pesanan)
+    # Seluruh riwayat pesanan terkonfirmasi dari arsip, lalu pesanan yang masih menunggu
+    # beserta posisi antreannya, keduanya lewat indeks nama pembeli
+    pesanan_pelanggan = [(pesanan, None) for pesanan in arsip.riwayat_pelanggan(nama_pelanggan)]
+    with antrean.lock:
+        pesanan_pelanggan += [(antrean.lihat(seq), antrean.posisi(seq))
+                              for seq in antrean.pending_pelanggan(nama_pelanggan)]
 
     if not pesanan_pelanggan:
         print(f"Tidak ada pesanan atas nama {nama_pelanggan}.")
         return
 
     print(f"\n=== DAFTAR PESANAN ATAS NAMA {nama_pelanggan.upper()} ===")
-    for idx, pesanan in enumerate(pesanan_pelanggan, 1):
+    for idx, (pesanan, posisi) in enumerate(pesanan_pelanggan, 1):
         status = "Menunggu konfirmasi" if pesanan['status'] == "not confirmed" else "Dikonfirmasi"
-
-        posisi_antrean = ""
-        if pesanan['status'] == "not confirmed":
-            for pos, order in enumerate(queue_list, 1):
-                if (order['nama_pembeli'] == pesanan['nama_pembeli'] and 
-                    order['waktu'] == pesanan['waktu']):
-                    posisi_antrean = f" | Posisi antrean: {pos}"
-                    break
+        posisi_antrean = f" | Posisi antrean: {posisi}" if posisi is not None else ""
 
         print(f"\n{idx}. ID: {pesanan.get('id_pesanan', '-')}")
         print(f"   Waktu: {pesanan['waktu']}")
@@ -559,58 +419,29 @@ def lihat_status_pesanan(nama_pelanggan):
 def clean_expired_orders():
     """
     Remove orders that haven't been confirmed within 12 hours.
-    Uses a temporary queue to maintain FIFO order while filtering.
+    Stops at the first pending order that is still valid; reserved stock is returned to the store.
     """
-    global antrean_queue
-    load_antrean()
-    current_time = datetime.now()
-    
-    # Create a new queue for valid orders
-    new_queue = FIFOQueue()
-    expired_count = 0
-    
-    # Process each order in FIFO order
-    temp_list = antrean_queue.to_list()
-    for order in temp_list:
-        if order['status'] == "not confirmed":
-            # Parse the order timestamp
-            order_time = datetime.strptime(order['waktu'], "%Y-%m-%d %H:%M:%S")
-            
-            # Check if the order is older than 12 hours
-            if current_time - order_time > timedelta(hours=12):
-                expired_count += 1
-                # Order is expired - don't add to new_queue
-                continue
-        
-        # Keep orders that are either confirmed or not expired
-        new_queue.enqueue(order)
-    
-    # Replace the old queue with the new one
-    antrean_queue = new_queue
-    
-    # If any orders were removed, update the file
+    expired_count = len(sapu_pesanan_kedaluwarsa())
+
     if expired_count > 0:
-        save_antrean()
         print(f"{expired_count} pesanan kedaluwarsa telah dihapus.")
-    
+
     return expired_count
 
 def lihat_antrean_admin():
     """
     Admin function to view current queue status.
     """
-    global antrean_queue
     clean_expired_orders()
-    load_antrean()
-    
-    if antrean_queue.is_empty():
+    queue_list = [pesanan for _, pesanan in antrean.pending()]
+
+    if not queue_list:
         print("Tidak ada pesanan dalam antrean.")
         return
-    
-    print(f"\n=== STATUS ANTREAN (Total: {antrean_queue.size()} pesanan) ===")
+
+    print(f"\n=== STATUS ANTREAN (Total: {len(queue_list)} pesanan) ===")
     print("Urutan berdasarkan FIFO (First In, First Out):")
-    
-    queue_list = antrean_queue.to_list()
+
     unconfirmed_count = 0
     
     for idx, pesanan in enumerate(queue_list, 1):
@@ -624,7 +455,6 @@ def lihat_antrean_admin():
               f"{len(pesanan['pesanan'])} item - {status_text}")
     
     print(f"\nPesanan belum dikonfirmasi: {unconfirmed_count}")
-    print(f"Pesanan sudah dikonfirmasi: {antrean_queue.size() - unconfirmed_count}")
 
 
 # -------------------- MENU USER --------------------
@@ -0,0 +1,46 @@
+import os
+import sys
+
+import pytest
+
+# Modul memakai impor datar (from order_queue import ...), sama seperti saat dijalankan dari Modul/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Modul"))
+
+from inventory_store import InventoryStore
+from order_archive import OrderArchive
+from order_queue import SegmentedOrderQueue
+from sales_rollup import RollupPenjualan
+
+
+@pytest.fixture(autouse=True)
+def folder_data(tmp_path, monkeypatch):
+    """Setiap test berjalan di folder kosong sehingga path relatif Data/ tidak menyentuh data asli."""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def buat_store(tmp_path):
+    def buat():
+        return InventoryStore(file_path=str(tmp_path / "inv.json"), journal_path=str(tmp_path / "inv.journal"))
+    return buat
+
+
+@pytest.fixture
+def buat_antrean(tmp_path, buat_store):
+    """Pabrik antrean baru atas folder yang sama, untuk mensimulasikan proses yang dibuka ulang."""
+    def buat(segment_size=1000):
+        arsip = OrderArchive(folder=str(tmp_path / "arsip"))
+        rollup = RollupPenjualan(folder=str(tmp_path / "rollup"), arsip=arsip, store=buat_store())
+        return SegmentedOrderQueue(folder=str(tmp_path / "antrean"), legacy_path=str(tmp_path / "antrean.json"),
+                                   segment_size=segment_size, arsip=arsip, rollup=rollup)
+    return buat
+
+
+def pesanan(id_pesanan, nama="Budi", waktu="2025-05-01 10:00:00", produk="Apel", jumlah=1):
+    return {
+        "id_pesanan": id_pesanan,
+        "nama_pembeli": nama,
+        "waktu": waktu,
+        "pesanan": [{"produk": produk, "jumlah": jumlah, "harga_satuan": 1000.0, "diskon": 0, "harga_modal": 600.0}],
+    }
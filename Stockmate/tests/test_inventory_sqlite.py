@@ -0,0 +1,89 @@
+from inventory_sqlite import SQLiteInventoryStore
+from inventory_store import mutasi_tambah, mutasi_hapus, mutasi_set, mutasi_stok, mutasi_ganti_nama
+from product_index import IndeksProduk
+
+
+def isi_store(store):
+    store.terapkan([
+        mutasi_tambah("toko", "Apel", {"stok": 4, "kategori": "Makanan", "harga_modal": 10, "harga_jual": 15,
+                                       "tanggal_kadaluarsa": "2025-05-02"}),
+        mutasi_tambah("toko", "Susu", {"stok": 2, "kategori": "Minuman", "harga_modal": 5, "harga_jual": 8,
+                                       "tanggal_kadaluarsa": "2025-05-01"}),
+        mutasi_tambah("toko", "Kabel", {"stok": 7, "harga_modal": 3, "harga_jual": 4}),
+        mutasi_tambah("toko", "Teh", {"stok": 1, "kategori": "Minuman", "harga_modal": 2, "harga_jual": 3,
+                                      "tanggal_kadaluarsa": "2025-06-01"}),
+    ])
+    store.terapkan(mutasi_hapus("toko", "Teh"), mutasi_stok("toko", "Apel", 1),
+                   mutasi_set("toko", "Kabel", "kategori", "Elektronik"))
+
+
+def test_lookup_sql_sama_dengan_indeks_memori(tmp_path):
+    store = SQLiteInventoryStore(str(tmp_path / "inv.db"))
+    isi_store(store)
+    indeks = IndeksProduk()
+    indeks.bangun(store.load())
+
+    assert store.cari_nama_asli("toko", "aPEL") == indeks.nama.cari("toko", "aPEL") == "Apel"
+    assert store.cari_nama_asli("toko", "teh") is None
+    for kategori in ("Makanan", "Minuman", "Elektronik", None):
+        assert sorted(store.produk_per_kategori("toko", kategori)) == sorted(indeks.kategori.cari("toko", kategori))
+    assert store.daftar_kategori("toko") == indeks.kategori.daftar("toko")
+    assert store.ringkasan_kategori("toko") == indeks.kategori.ringkasan("toko")
+    assert store.produk_kadaluarsa("toko", "2025-05-02") == indeks.kadaluarsa.kadaluarsa("toko", "2025-05-02") \
+        == ["Susu", "Apel"]
+
+
+def test_lookup_memakai_indeks_sqlite(tmp_path):
+    store = SQLiteInventoryStore(str(tmp_path / "inv.db"))
+    isi_store(store)
+
+    def rencana(sql, *args):
+        return " ".join(row[-1] for row in store.conn.execute("EXPLAIN QUERY PLAN " + sql, args))
+
+    assert "idx_toko_nama_lower" in rencana("SELECT nama FROM toko WHERE nama_lower = ?", "apel")
+    assert "idx_toko_kategori" in rencana("SELECT nama FROM toko WHERE kategori IS ?", "Makanan")
+    assert "idx_toko_kadaluarsa" in rencana(
+        "SELECT nama FROM toko WHERE tanggal_kadaluarsa IS NOT NULL AND tanggal_kadaluarsa != '' "
+        "AND tanggal_kadaluarsa <= ? ORDER BY tanggal_kadaluarsa, nama", "2025-05-02")
+
+
+def test_lookup_melihat_tulisan_koneksi_lain(tmp_path):
+    store = SQLiteInventoryStore(str(tmp_path / "inv.db"))
+    isi_store(store)
+    lain = SQLiteInventoryStore(str(tmp_path / "inv.db"))
+    lain.terapkan(mutasi_tambah("toko", "Roti", {"stok": 1, "kategori": "Makanan", "tanggal_kadaluarsa": "2025-04-30"}))
+
+    assert store.cari_nama_asli("toko", "ROTI") == "Roti"
+    assert store.produk_kadaluarsa("toko", "2025-05-01") == ["Roti", "Susu"]
+
+
+def test_nama_casefold_dan_ganti_nama_sama_dengan_backend_json(tmp_path, buat_store):
+    mutasi = [
+        mutasi_tambah("toko", "Straße Kopi", {"stok": 2}),
+        mutasi_tambah("toko", "Teh", {"stok": 1}),
+        mutasi_tambah("toko", "Teh Melati", {"stok": 4}),
+    ]
+    sqlite_store = SQLiteInventoryStore(str(tmp_path / "inv.db"))
+    json_store = buat_store()
+    for store in (sqlite_store, json_store):
+        store.terapkan(mutasi)
+        # Ganti nama ke nama yang sudah ada menimpa produk tersebut
+        store.terapkan(mutasi_ganti_nama("toko", "Teh Melati", "Teh"))
+        store.terapkan(mutasi_ganti_nama("toko", "Tidak Ada", "Teh"))
+
+    assert sqlite_store.load() == json_store.load() == {
+        "gudang": {}, "toko": {"Straße Kopi": {"stok": 2}, "Teh": {"stok": 4}}}
+    for teks in ("STRASSE KOPI", "straße kopi", "teh"):
+        assert sqlite_store.cari_nama_asli("toko", teks) == json_store.cari_nama_asli("toko", teks)
+    assert sqlite_store.cari_nama_asli("toko", "STRASSE KOPI") == "Straße Kopi"
+
+
+def test_nama_lower_lama_dimigrasi_ke_casefold(tmp_path):
+    path = str(tmp_path / "inv.db")
+    store = SQLiteInventoryStore(path)
+    store.terapkan(mutasi_tambah("toko", "Straße", {"stok": 1}))
+    store.conn.execute("UPDATE toko SET nama_lower = 'straße'")
+    store.conn.execute("PRAGMA user_version = 0")
+    store.conn.commit()
+
+    assert SQLiteInventoryStore(path).cari_nama_asli("toko", "STRASSE") == "Straße"
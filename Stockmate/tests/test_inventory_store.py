@@ -0,0 +1,53 @@
+import pytest
+
+from inventory_store import mutasi_stok, mutasi_tambah
+
+
+def test_baris_jurnal_terpotong_dibuang_sebelum_transaksi_berikutnya(buat_store):
+    store = buat_store()
+    store.terapkan(mutasi_tambah("toko", "Apel", {"stok": 0, "kategori": "Makanan"}))
+    store.terapkan(mutasi_stok("toko", "Apel", 100))
+    # Crash di tengah menulis baris jurnal berikutnya
+    with open(store.journal_path, 'a') as f:
+        f.write('[{"op":"stok","lokasi":"toko","nama":"Ap')
+
+    store = buat_store()
+    assert store.load()["toko"]["Apel"]["stok"] == 100
+    store.terapkan(mutasi_stok("toko", "Apel", 15))
+    assert store.load()["toko"]["Apel"]["stok"] == 115
+
+    store = buat_store()
+    assert store.load()["toko"]["Apel"]["stok"] == 115
+
+
+def test_jurnal_dimuat_ulang_setelah_kompaksi(buat_store):
+    store = buat_store()
+    store.terapkan(mutasi_tambah("gudang", "Susu", {"stok": 5}))
+    store.terapkan(mutasi_stok("gudang", "Susu", -2))
+    assert store.compact()
+
+    store = buat_store()
+    assert store.load()["gudang"]["Susu"]["stok"] == 3
+    assert store.stats()["journal_records"] == 0
+
+
+@pytest.mark.parametrize("titik_crash", ["sebelum_jurnal_dikosongkan", "sebelum_snapshot_diganti"])
+def test_crash_saat_kompaksi_tidak_memutar_ulang_jurnal_dua_kali(buat_store, monkeypatch, titik_crash):
+    store = buat_store()
+    store.terapkan(mutasi_tambah("toko", "Apel", {"stok": 100}))
+    store.terapkan(mutasi_stok("toko", "Apel", -30))
+    store.terapkan(mutasi_stok("toko", "Apel", 5))
+
+    kosongkan = store._kosongkan_jurnal
+    def crash():
+        if titik_crash == "sebelum_snapshot_diganti":
+            kosongkan()
+        raise OSError("crash")
+    monkeypatch.setattr(store, "_kosongkan_jurnal", crash)
+    with pytest.raises(OSError):
+        store.compact()
+
+    pulih = buat_store()
+    assert pulih.load()["toko"]["Apel"]["stok"] == 75
+    pulih.terapkan(mutasi_stok("toko", "Apel", -1))
+    assert buat_store().load()["toko"]["Apel"]["stok"] == 74
@@ -0,0 +1,17 @@
+from conftest import pesanan
+from order_archive import OrderArchive
+
+
+def test_riwayat_pelanggan_lintas_bulan(folder_data):
+    arsip = OrderArchive(folder=str(folder_data / "arsip"))
+    arsip.tambah(pesanan("apr", waktu="2025-04-30 23:00:00"),
+                 pesanan("lain", nama="Sari", waktu="2025-05-01 08:00:00"),
+                 pesanan("mei", nama="budi", waktu="2025-05-02 09:00:00"))
+    assert [p["id_pesanan"] for p in arsip.riwayat_pelanggan("BUDI")] == ["apr", "mei"]
+
+    # Pesanan bulan baru ikut terlihat, riwayat bulan lama tetap ada
+    arsip.tambah(pesanan("jun", waktu="2025-06-01 00:10:00"))
+    assert [p["id_pesanan"] for p in arsip.riwayat_pelanggan("Budi")] == ["apr", "mei", "jun"]
+    assert [p["id_pesanan"] for p in OrderArchive(folder=str(folder_data / "arsip")).riwayat_pelanggan("budi")] \
+        == ["apr", "mei", "jun"]
+    assert arsip.riwayat_pelanggan("Tono") == []
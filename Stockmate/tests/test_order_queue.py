@@ -0,0 +1,177 @@
+import json
+import os
+import random
+
+import pytest
+
+from conftest import pesanan
+from order_queue import PohonFenwick, SegmentedOrderQueue
+
+
+def id_pending(antrean):
+    return [p["id_pesanan"] for _, p in antrean.pending()]
+
+
+def jsonl_segmen(antrean, seg=0):
+    return antrean._seg_paths(seg)[0]
+
+
+def test_baris_tanpa_byte_status_dipotong_sebelum_append(buat_antrean):
+    antrean = buat_antrean()
+    antrean.enqueue(pesanan("id1"))
+    # Crash di antara tulisan jsonl dan tulisan status: baris id2 tanpa byte status
+    with open(jsonl_segmen(antrean), 'a') as f:
+        f.write(json.dumps(pesanan("id2")) + "\n")
+
+    antrean = buat_antrean()
+    assert id_pending(antrean) == ["id1"]
+    antrean.enqueue(pesanan("id3"))
+
+    antrean = buat_antrean()
+    assert id_pending(antrean) == ["id1", "id3"]
+
+
+def test_baris_terpotong_dipotong_sebelum_append(buat_antrean):
+    antrean = buat_antrean()
+    antrean.enqueue(pesanan("id1"))
+    with open(jsonl_segmen(antrean), 'a') as f:
+        f.write('{"id_pesanan": "id2", "nama_pem')
+
+    antrean = buat_antrean()
+    assert id_pending(antrean) == ["id1"]
+    antrean.enqueue(pesanan("id3"))
+
+    antrean = buat_antrean()
+    assert id_pending(antrean) == ["id1", "id3"]
+    assert antrean.lihat(1)["id_pesanan"] == "id3"
+
+
+def test_migrasi_legacy_yang_terhenti_diulang(buat_antrean, tmp_path, monkeypatch):
+    legacy = [pesanan(f"id{i}") for i in range(3)]
+    (tmp_path / "antrean.json").write_text(json.dumps(legacy))
+
+    # Crash di tengah segmen kedua: segmen pertama sudah lengkap, pointer belum ditulis
+    asli = os.fsync
+    jumlah = {"fsync": 0}
+    def fsync_lalu_crash(fd):
+        if jumlah["fsync"] == 2:
+            raise RuntimeError("crash")
+        jumlah["fsync"] += 1
+        return asli(fd)
+    monkeypatch.setattr(os, "fsync", fsync_lalu_crash)
+    with pytest.raises(RuntimeError):
+        buat_antrean(segment_size=2).jumlah_pending()
+    monkeypatch.setattr(os, "fsync", asli)
+
+    antrean = buat_antrean(segment_size=2)
+    assert id_pending(antrean) == ["id0", "id1", "id2"]
+    assert not os.path.exists(tmp_path / "antrean.json")
+    assert os.path.exists(tmp_path / "antrean.json.migrated")
+
+
+def test_pohon_fenwick_sama_dengan_jumlah_langsung():
+    rng = random.Random(16)
+    nilai = [0] * 101
+    for i in rng.sample(range(1, 101), 40):
+        nilai[i] = 1
+    pohon = PohonFenwick(100, [i for i in range(1, 101) if nilai[i]])
+    for _ in range(300):
+        i = rng.randint(1, 100)
+        delta = -1 if nilai[i] else 1
+        nilai[i] += delta
+        pohon.tambah(i, delta)
+        j = rng.randint(0, 100)
+        assert pohon.prefix(j) == sum(nilai[1:j + 1])
+
+
+def test_posisi_mengikuti_antrean_lintas_segmen(buat_antrean):
+    rng = random.Random(4)
+    antrean = buat_antrean(segment_size=7)
+    # Lebih dari 64 pesanan memaksa pohon Fenwick tumbuh dan dibangun ulang
+    for i in range(150):
+        antrean.enqueue(pesanan(f"id{i}", waktu=f"2025-05-01 10:{i // 60:02d}:{i % 60:02d}"))
+        if i % 5 == 4:
+            seqs = [seq for seq, _ in antrean.pending()]
+            pilih = rng.sample(seqs, 2)
+            antrean.konfirmasi(pilih[0])
+            antrean.hapus(pilih[1])
+
+    for antrean in (antrean, buat_antrean(segment_size=7)):
+        seqs = [seq for seq, _ in antrean.pending()]
+        assert [antrean.posisi(seq) for seq in seqs] == list(range(1, len(seqs) + 1))
+        assert antrean.posisi(seqs[-1] + 1) is None
+
+
+def test_hapus_banyak_hanya_menghapus_pesanan_pending(buat_antrean):
+    antrean = buat_antrean(segment_size=3)
+    seqs = [antrean.enqueue(pesanan(f"id{i}")) for i in range(8)]
+    antrean.konfirmasi(seqs[1])
+
+    dihapus = antrean.hapus_banyak([seqs[0], seqs[1], seqs[4], seqs[4], seqs[6], 999])
+    assert dihapus == [seqs[0], seqs[4], seqs[6]]
+    assert antrean.hapus_banyak([seqs[0]]) == []
+
+    sisa = [seqs[i] for i in (2, 3, 5, 7)]
+    for antrean in (antrean, buat_antrean(segment_size=3)):
+        assert [seq for seq, _ in antrean.pending()] == sisa
+        assert [antrean.posisi(seq) for seq in sisa] == [1, 2, 3, 4]
+        assert antrean.posisi(seqs[0]) is None and antrean.cari_id("id0") is None
+        assert antrean.lihat(seqs[1])["status"] == "confirmed"
+
+
+@pytest.mark.parametrize("titik_crash", ["rollup", "status"])
+def test_konfirmasi_ulang_setelah_crash_tidak_menghitung_dua_kali(buat_antrean, monkeypatch, titik_crash):
+    antrean = buat_antrean()
+    antrean.konfirmasi(antrean.enqueue(pesanan("id0", jumlah=2)))
+    seq = antrean.enqueue(pesanan("id1", jumlah=3))
+
+    def crash(*args):
+        raise OSError("crash")
+    if titik_crash == "rollup":
+        monkeypatch.setattr(antrean.rollup, "tambah", crash)   # arsip sudah ditulis, rollup belum
+    else:
+        monkeypatch.setattr(antrean, "set_status", crash)      # arsip dan rollup sudah ditulis
+    with pytest.raises(OSError):
+        antrean.konfirmasi(seq)
+
+    antrean = buat_antrean()
+    assert id_pending(antrean) == ["id1"]
+    antrean.konfirmasi(seq)
+    assert id_pending(antrean) == []
+    assert [p["id_pesanan"] for p in antrean.arsip.semua()] == ["id0", "id1"]
+    ringkasan = antrean.rollup.ringkasan(None, None)
+    assert ringkasan["transaksi"] == 2
+    assert ringkasan["produk"]["Apel"]["jumlah"] == 5
+
+
+def test_konfirmasi_banyak_melewati_pesanan_yang_sudah_terarsip(buat_antrean):
+    antrean = buat_antrean()
+    seqs = [antrean.enqueue(pesanan(f"id{i}")) for i in range(3)]
+    antrean.arsip.tambah(dict(antrean.lihat(seqs[1]), status="confirmed"))   # sisa konfirmasi yang terhenti
+
+    antrean.konfirmasi_banyak(seqs)
+    assert sorted(p["id_pesanan"] for p in antrean.arsip.semua()) == ["id0", "id1", "id2"]
+    assert antrean.rollup.ringkasan(None, None)["transaksi"] == 3
+
+
+def test_migrasi_legacy_satu_fsync_per_file_segmen(buat_antrean, tmp_path, monkeypatch):
+    legacy = [pesanan(f"id{i}") for i in range(25)]
+    legacy[3]["status"] = "confirmed"
+    (tmp_path / "antrean.json").write_text(json.dumps(legacy))
+
+    asli = os.fsync
+    jumlah = {"fsync": 0}
+    def hitung_fsync(fd):
+        jumlah["fsync"] += 1
+        return asli(fd)
+    monkeypatch.setattr(os, "fsync", hitung_fsync)
+    antrean = buat_antrean(segment_size=10)
+    antrean.init_file()
+    jumlah_migrasi = jumlah["fsync"]
+    monkeypatch.setattr(os, "fsync", asli)
+
+    # 3 segmen x (jsonl + status), ditambah satu tulisan arsip untuk pesanan terkonfirmasi
+    assert jumlah_migrasi == 3 * 2 + 1
+    assert len(id_pending(antrean)) == 24
+    assert [p["id_pesanan"] for p in antrean.arsip.semua()] == ["id3"]
+    assert id_pending(buat_antrean(segment_size=10)) == id_pending(antrean)
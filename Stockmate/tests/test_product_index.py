@@ -0,0 +1,89 @@
+import random
+
+from inventory_store import (
+    terapkan_mutasi_terindeks, mutasi_tambah, mutasi_hapus, mutasi_set, mutasi_ganti_nama, mutasi_stok
+)
+from product_index import IndeksProduk, IndeksNama
+
+
+def dokumen(toko):
+    return {"gudang": {}, "toko": toko}
+
+
+def test_hapus_nama_tidak_memindai_lokasi():
+    indeks = IndeksNama()
+    indeks.bangun(dokumen({"Apel": {}, "APEL": {}, "Susu": {}}))
+    assert indeks.cari("toko", "apel") == "Apel"
+    # data=None: penghapusan tidak boleh menyentuh dokumen inventaris sama sekali
+    indeks.perbarui(None, "toko", "Apel", {}, None)
+    assert indeks.cari("toko", "apel") == "APEL"
+    indeks.perbarui(None, "toko", "APEL", {}, None)
+    assert indeks.cari("toko", "apel") is None
+    assert indeks.cari("toko", "susu") == "Susu"
+
+
+def test_indeks_inkremental_sama_dengan_bangun_ulang():
+    acak = random.Random(7)
+    data = dokumen({})
+    indeks = IndeksProduk()
+    indeks.bangun(data)
+    nama_pool = ["Apel", "apel", "Apel Merah", "Susu", "SUSU Coklat", "Teh", "Kopi Susu"]
+    for _ in range(500):
+        nama = acak.choice(nama_pool)
+        ada = nama in data["toko"]
+        pilihan = acak.random()
+        if not ada:
+            info = {"stok": acak.randint(0, 9), "kategori": acak.choice(["Makanan", "Minuman", None]),
+                    "harga_modal": 10, "harga_jual": 15}
+            if acak.random() < 0.5:
+                info["tanggal_kadaluarsa"] = f"2025-05-{acak.randint(1, 28):02d}"
+            mutasi = mutasi_tambah("toko", nama, info)
+        elif pilihan < 0.3:
+            mutasi = mutasi_hapus("toko", nama)
+        elif pilihan < 0.5:
+            mutasi = mutasi_set("toko", nama, "tanggal_kadaluarsa",
+                                acak.choice([None, f"2025-05-{acak.randint(1, 28):02d}"]))
+        elif pilihan < 0.7:
+            mutasi = mutasi_set("toko", nama, "kategori", acak.choice(["Makanan", "Elektronik"]))
+        elif pilihan < 0.8:
+            baru = acak.choice(nama_pool)
+            if baru in data["toko"]:
+                continue
+            mutasi = mutasi_ganti_nama("toko", nama, baru)
+        else:
+            mutasi = mutasi_stok("toko", nama, acak.randint(-3, 3))
+        terapkan_mutasi_terindeks(data, mutasi, indeks)
+
+        segar = IndeksProduk()
+        segar.bangun(data)
+        for teks in ("apel", "susu", "kopi", "teh"):
+            assert (indeks.nama.cari("toko", teks) is None) == (segar.nama.cari("toko", teks) is None)
+            assert set(indeks.pencarian.cari("toko", teks, 50)) == set(segar.pencarian.cari("toko", teks, 50))
+        assert indeks.kategori.ringkasan("toko") == segar.kategori.ringkasan("toko")
+        assert sorted(indeks.kadaluarsa.kadaluarsa("toko", "2025-05-15")) == \
+            sorted(segar.kadaluarsa.kadaluarsa("toko", "2025-05-15"))
+
+
+def test_pencarian_awalan_dan_salah_ketik():
+    indeks = IndeksProduk()
+    indeks.bangun(dokumen({
+        "Apel Merah": {"kategori": "Makanan"},
+        "Apel Hijau": {"kategori": "Makanan"},
+        "Susu Coklat": {"kategori": "Minuman"},
+    }))
+    assert indeks.pencarian.cari("toko", "apel mer")[0] == "Apel Merah"
+    assert set(indeks.pencarian.cari("toko", "ap")) == {"Apel Merah", "Apel Hijau"}
+    assert indeks.pencarian.cari("toko", "coklta")[0] == "Susu Coklat"
+    assert set(indeks.pencarian.cari("toko", "minuman")) == {"Susu Coklat"}
+
+
+def test_kadaluarsa_mengabaikan_entri_usang():
+    data = dokumen({"Roti": {"stok": 1, "tanggal_kadaluarsa": "2025-05-01"},
+                    "Keju": {"stok": 1, "tanggal_kadaluarsa": "2025-05-03"}})
+    indeks = IndeksProduk()
+    indeks.bangun(data)
+    assert indeks.kadaluarsa.kadaluarsa("toko", "2025-05-02") == ["Roti"]
+    terapkan_mutasi_terindeks(data, mutasi_set("toko", "Roti", "tanggal_kadaluarsa", "2025-06-01"), indeks)
+    terapkan_mutasi_terindeks(data, mutasi_hapus("toko", "Keju"), indeks)
+    assert indeks.kadaluarsa.kadaluarsa("toko", "2025-05-31") == []
+    assert indeks.kadaluarsa.kadaluarsa("toko", "2025-06-01") == ["Roti"]
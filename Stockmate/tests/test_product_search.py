@@ -0,0 +1,29 @@
+from inventory_store import mutasi_tambah
+from product_search import pilih_dari_saran
+
+
+def test_pilih_dari_saran_mengembalikan_nama_asli(buat_store, monkeypatch, capsys):
+    store = buat_store()
+    store.terapkan(mutasi_tambah("toko", "Susu Coklat", {"stok": 3, "kategori": "Minuman"}),
+                   mutasi_tambah("toko", "Susu Stroberi", {"stok": 1, "kategori": "Minuman"}))
+
+    monkeypatch.setattr("builtins.input", lambda _: "1")
+    assert pilih_dari_saran("toko", "coklta", store=store) == "Susu Coklat"
+    assert "Mungkin maksud Anda" in capsys.readouterr().out
+
+    monkeypatch.setattr("builtins.input", lambda _: "")
+    assert pilih_dari_saran("toko", "susu", store=store) is None
+    assert pilih_dari_saran("toko", "zzzzzz", store=store) is None
+
+
+def test_pilih_dari_saran_tidak_menyalin_seluruh_lokasi(buat_store, monkeypatch, capsys):
+    store = buat_store()
+    store.terapkan([mutasi_tambah("toko", f"Produk {i}", {"stok": i}) for i in range(200)]
+                   + [mutasi_tambah("toko", "Susu Coklat", {"stok": 3, "kategori": "Minuman"})])
+    def salinan(lokasi):
+        raise AssertionError("salinan seluruh lokasi tidak diperlukan")
+    monkeypatch.setattr(store, "salinan", salinan)
+    monkeypatch.setattr("builtins.input", lambda _: "1")
+
+    assert pilih_dari_saran("toko", "coklta", store=store) == "Susu Coklat"
+    assert "Minuman" in capsys.readouterr().out
@@ -0,0 +1,40 @@
+import pytest
+
+from conftest import pesanan
+from sales_columnar import KolomPenjualan
+
+
+def info_produk(nama):
+    return "Buah", 600.0
+
+
+def isi(kolom, *pesanan_list):
+    for p in pesanan_list:
+        kolom.tambah_pesanan(p, info_produk)
+
+
+@pytest.mark.parametrize("pakai_numpy", [False, True])
+def test_tambah_setelah_kelompokkan(pakai_numpy):
+    if pakai_numpy:
+        pytest.importorskip("numpy")
+    kolom = KolomPenjualan(pakai_numpy=pakai_numpy)
+    isi(kolom, pesanan("id1", jumlah=2), pesanan("id2", produk="Roti", waktu="2025-05-02 09:00:00"))
+    assert kolom.kelompokkan("produk")[("Apel",)]["jumlah"] == 2
+
+    isi(kolom, pesanan("id3", jumlah=3))
+    hasil = kolom.kelompokkan("hari", "produk")
+    assert hasil[("2025-05-01", "Apel")]["jumlah"] == 5
+    assert hasil[("2025-05-01", "Apel")]["margin"] == pytest.approx(5 * 400.0)
+    assert hasil[("2025-05-02", "Roti")]["jumlah"] == 1
+    assert len(kolom) == 3
+
+
+def test_jalur_numpy_sama_dengan_python():
+    pytest.importorskip("numpy")
+    pesanan_list = [pesanan(f"id{i}", produk=("Apel", "Roti", "Susu")[i % 3], jumlah=i % 4 + 1,
+                            waktu=f"2025-05-{i % 28 + 1:02d} 10:00:00") for i in range(200)]
+    murni, numpy = KolomPenjualan(pakai_numpy=False), KolomPenjualan(pakai_numpy=True)
+    isi(murni, *pesanan_list)
+    isi(numpy, *pesanan_list)
+    for dimensi in (("produk",), ("hari", "kategori"), ("hari", "produk")):
+        assert murni.kelompokkan(*dimensi) == numpy.kelompokkan(*dimensi)
@@ -0,0 +1,35 @@
+import sales_report
+from inventory_store import mutasi_tambah
+
+
+def jawab(monkeypatch, *jawaban):
+    antrian = iter(jawaban)
+    monkeypatch.setattr("builtins.input", lambda _: next(antrian))
+
+
+def test_kembali_dibedakan_dari_semua_waktu(monkeypatch):
+    jawab(monkeypatch, "0")
+    assert sales_report.pilih_rentang_waktu() is None
+    jawab(monkeypatch, "8")
+    assert sales_report.pilih_rentang_waktu() == (None, None)
+
+
+def test_produk_terlaris_semua_waktu(monkeypatch, capsys, buat_store):
+    store = buat_store()
+    store.terapkan(mutasi_tambah("toko", "Apel", {"stok": 1}), mutasi_tambah("toko", "Roti", {"stok": 1}))
+    metrik = {"jumlah": 5, "bruto": 5000.0, "diskon": 0.0, "modal": 3000.0, "margin": 2000.0, "total_harga": 5000.0}
+    diminta = []
+
+    def ambil_ringkasan(start_date, end_date):
+        diminta.append((start_date, end_date))
+        return {"produk": {"Apel": metrik}}
+
+    monkeypatch.setattr(sales_report, "ambil_ringkasan", ambil_ringkasan)
+    monkeypatch.setattr(sales_report, "store", store)
+    jawab(monkeypatch, "8", "1", "1")
+    sales_report.lihat_produk_terlaris()
+
+    keluaran = capsys.readouterr().out
+    assert diminta == [(None, None)]
+    assert "1 PRODUK TERLARIS" in keluaran and "Apel" in keluaran
+    assert "Roti" in keluaran.rsplit("PALING LAMBAT", 1)[1]
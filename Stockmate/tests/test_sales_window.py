@@ -0,0 +1,108 @@
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+from conftest import pesanan
+from order_archive import OrderArchive
+from sales_rollup import RollupPenjualan
+from sales_window import JendelaPenjualan
+
+
+@pytest.fixture
+def rollup(tmp_path, buat_store):
+    arsip = OrderArchive(folder=str(tmp_path / "arsip"))
+    return RollupPenjualan(folder=str(tmp_path / "rollup"), arsip=arsip, store=buat_store())
+
+
+def konfirmasi(rollup, *pesanan_list):
+    rollup.arsip.tambah(*pesanan_list)
+    rollup.tambah(*pesanan_list)
+
+
+def rentang(sekarang, panjang):
+    end = datetime.combine(sekarang.date() + timedelta(days=1), datetime.min.time())
+    return end - timedelta(days=panjang), end
+
+
+def ringkasan(jendela, sekarang, panjang):
+    start, end = rentang(sekarang, panjang)
+    return jendela.ringkasan(start, end, sekarang=sekarang)
+
+
+def test_pesanan_setelah_tengah_malam_masuk_jendela(rollup):
+    jendela = JendelaPenjualan(rollup)
+    konfirmasi(rollup, pesanan("id1", waktu="2025-05-01 10:00:00"))
+    assert ringkasan(jendela, datetime(2025, 5, 1, 23, 59), 1)["transaksi"] == 1
+
+    # Jendela masih di 1 Mei saat pesanan 2 Mei dikonfirmasi
+    konfirmasi(rollup, pesanan("id2", waktu="2025-05-02 00:05:00", jumlah=3))
+    sekarang = datetime(2025, 5, 2, 0, 10)
+    hari_ini = ringkasan(jendela, sekarang, 1)
+    assert hari_ini["transaksi"] == 1
+    assert hari_ini["produk"]["Apel"]["jumlah"] == 3
+    assert ringkasan(jendela, sekarang, 8) == rollup.ringkasan(*rentang(sekarang, 8))
+
+
+def test_pesanan_setelah_tengah_malam_di_bulan_baru(rollup):
+    jendela = JendelaPenjualan(rollup)
+    konfirmasi(rollup, pesanan("id1", waktu="2025-05-31 12:00:00"))
+    assert ringkasan(jendela, datetime(2025, 5, 31, 23, 0), 31)["transaksi"] == 1
+
+    konfirmasi(rollup, pesanan("id2", waktu="2025-06-01 00:01:00"))
+    sekarang = datetime(2025, 6, 1, 0, 2)
+    assert ringkasan(jendela, sekarang, 1)["transaksi"] == 1
+    assert ringkasan(jendela, sekarang, 31) == rollup.ringkasan(*rentang(sekarang, 31))
+
+
+def test_jendela_sama_dengan_rollup_saat_hari_bergeser(rollup):
+    jendela = JendelaPenjualan(rollup)
+    awal = datetime(2025, 4, 20, 9, 0)
+    for i in range(25):
+        sekarang = awal + timedelta(days=i)
+        konfirmasi(rollup, pesanan(f"id{i}", waktu=sekarang.strftime("%Y-%m-%d %H:%M:%S"), jumlah=i + 1))
+        for panjang in (1, 8, 31):
+            assert ringkasan(jendela, sekarang, panjang) == rollup.ringkasan(*rentang(sekarang, panjang))
+
+
+def test_rentang_lain_tidak_dijawab_jendela(rollup):
+    jendela = JendelaPenjualan(rollup)
+    sekarang = datetime(2025, 5, 1, 12, 0)
+    start, end = rentang(sekarang, 8)
+    assert jendela.ringkasan(start, end - timedelta(days=1), sekarang=sekarang) is None
+    assert jendela.ringkasan(None, None, sekarang=sekarang) is None
+
+
+def test_bangun_ulang_mereset_jendela(rollup):
+    jendela = JendelaPenjualan(rollup)
+    sekarang = datetime(2025, 5, 1, 12, 0)
+    konfirmasi(rollup, pesanan("id1", waktu="2025-05-01 10:00:00"))
+    assert ringkasan(jendela, sekarang, 1)["transaksi"] == 1
+
+    # Pesanan yang hanya ada di arsip baru terlihat setelah rollup dibangun ulang
+    rollup.arsip.tambah(pesanan("id2", waktu="2025-05-01 11:00:00"))
+    rollup.bangun_ulang()
+    assert ringkasan(jendela, sekarang, 1)["transaksi"] == 2
+
+
+def test_ringkasan_dan_pesanan_baru_bersamaan_tidak_deadlock(rollup):
+    jendela = JendelaPenjualan(rollup)
+    sekarang = datetime(2025, 5, 1, 12, 0)
+    konfirmasi(rollup, pesanan("id0", waktu="2025-05-01 08:00:00"))
+
+    def baca():
+        for i in range(200):
+            jendela._hari_ini = None   # paksa muat ulang dari rollup di bawah lock
+            ringkasan(jendela, sekarang, 8)
+
+    def tulis():
+        for i in range(1, 200):
+            rollup.tambah(pesanan(f"id{i}", waktu="2025-05-01 09:00:00"))
+
+    threads = [threading.Thread(target=baca, daemon=True), threading.Thread(target=tulis, daemon=True)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=30)
+    assert not any(t.is_alive() for t in threads)
+    assert ringkasan(jendela, sekarang, 8) == rollup.ringkasan(*rentang(sekarang, 8))
@@ -0,0 +1,83 @@
+import threading
+from datetime import datetime
+
+import sweeper
+from conftest import pesanan
+from inventory_store import mutasi_tambah, mutasi_hapus
+from product_sort import PengurutProduk
+
+
+def test_penyapu_tetap_hidup_setelah_kesalahan_tak_terduga(monkeypatch, folder_data):
+    penyapu = sweeper.PenyapuLatar(interval_menit=0)
+    panggilan = []
+    def jalankan_sekali():
+        panggilan.append(1)
+        if len(panggilan) == 1:
+            raise KeyError("produk")
+        penyapu.hentikan()
+    monkeypatch.setattr(penyapu, "jalankan_sekali", jalankan_sekali)
+    monkeypatch.setattr(sweeper, "LOG_AKTIVITAS_PATH", str(folder_data / "aktivitas.log"))
+
+    penyapu._loop()
+
+    assert len(panggilan) == 2
+    assert "Sapuan gagal: KeyError" in (folder_data / "aktivitas.log").read_text()
+
+
+def test_salinan_tidak_terpengaruh_penghapusan_dari_thread_lain(buat_store):
+    store = buat_store()
+    store.terapkan([mutasi_tambah("toko", f"Produk {i}", {"stok": 1, "kategori": "Makanan"}) for i in range(2000)])
+    pengurut = PengurutProduk(store)
+
+    salinan = store.salinan("toko")
+    hapus = threading.Thread(target=store.terapkan,
+                             args=([mutasi_hapus("toko", f"Produk {i}") for i in range(0, 2000, 2)],))
+    hapus.start()
+    jumlah = sum(1 for _ in salinan.items())
+    hapus.join()
+
+    assert jumlah == 2000
+    assert len(store.salinan("toko")) == 1000
+    assert pengurut.jumlah("toko", saring=lambda info: info["stok"] > 0) == 1000
+    assert len(pengurut.urutan_nama("toko")) == 1000
+
+
+def test_sapu_pesanan_kedaluwarsa_mengembalikan_stok(monkeypatch, buat_antrean, buat_store):
+    antrean = buat_antrean(segment_size=2)
+    store = buat_store()
+    store.terapkan(mutasi_tambah("toko", "Apel", {"stok": 0}), mutasi_tambah("toko", "Roti", {"stok": 1}))
+    monkeypatch.setattr(sweeper, "antrean", antrean)
+    monkeypatch.setattr(sweeper, "store", store)
+
+    antrean.enqueue(pesanan("lama1", waktu="2025-05-01 06:00:00", jumlah=2))
+    konfirm = antrean.enqueue(pesanan("lama2", waktu="2025-05-01 07:00:00", jumlah=5))
+    antrean.enqueue(pesanan("lama3", waktu="2025-05-01 08:00:00", produk="Roti", jumlah=3))
+    antrean.enqueue(pesanan("baru", waktu="2025-05-01 20:00:00"))
+    antrean.konfirmasi(konfirm)
+
+    sekarang = datetime(2025, 5, 1, 21, 0)   # batas: 09:00, 12 jam sebelumnya
+    dihapus = sweeper.sapu_pesanan_kedaluwarsa(sekarang)
+
+    assert [p["id_pesanan"] for p in dihapus] == ["lama1", "lama3"]
+    assert [p["id_pesanan"] for _, p in antrean.pending()] == ["baru"]
+    assert store.salinan("toko")["Apel"]["stok"] == 2
+    assert store.salinan("toko")["Roti"]["stok"] == 4
+    assert sweeper.sapu_pesanan_kedaluwarsa(sekarang) == []
+
+
+def test_sapu_pesanan_mencatat_stok_produk_yang_sudah_dihapus(monkeypatch, buat_antrean, buat_store, folder_data):
+    antrean = buat_antrean()
+    store = buat_store()
+    store.terapkan(mutasi_tambah("toko", "Apel", {"stok": 0}))
+    monkeypatch.setattr(sweeper, "antrean", antrean)
+    monkeypatch.setattr(sweeper, "store", store)
+    monkeypatch.setattr(sweeper, "LOG_AKTIVITAS_PATH", str(folder_data / "aktivitas.log"))
+
+    antrean.enqueue(pesanan("lama1", waktu="2025-05-01 06:00:00", jumlah=2))
+    antrean.enqueue(pesanan("lama2", waktu="2025-05-01 07:00:00", produk="Roti", jumlah=3))
+    # Roti habis terjual lewat pesanan lain lalu dihapus dari toko sebelum sapuan
+    sweeper.sapu_pesanan_kedaluwarsa(datetime(2025, 5, 1, 21, 0))
+
+    assert store.salinan("toko") == {"Apel": {"stok": 2}}
+    log = (folder_data / "aktivitas.log").read_text(encoding="utf-8")
+    assert "Stok 3 'Roti'" in log